@@ -0,0 +1,87 @@
+"""
+Hash-based group-by primitives for per-user and per-team task counts.
+
+Tasks are bucketed by key in a single pass, so joining N users against M
+tasks costs O(N + M) instead of filtering the full task list once per user.
+Counters are lists indexed by the status codes in snapshot.STATUSES.
+"""
+from snapshot import BLOCKED, COMPLETED, IN_PROGRESS, OPEN, STATUSES
+
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def empty_counts():
+    return [0] * len(STATUSES)
+
+
+def _group_snapshot(snapshot, column, dictionary, rows):
+    rows = snapshot.window() if rows is None else rows
+    by_code = [None] * len(dictionary)
+    status = snapshot.status
+    for pos in rows:
+        code = column[pos]
+        counts = by_code[code]
+        if counts is None:
+            counts = by_code[code] = [0] * len(snapshot.statuses)
+        counts[status[pos]] += 1
+
+    values = dictionary.values
+    return {values[code]: counts for code, counts in enumerate(by_code)
+            if counts is not None and values[code]}
+
+
+def group_by_assignee(snapshot, rows=None):
+    """{user_id: status counts} for snapshot positions (all tasks by default)"""
+    return _group_snapshot(snapshot, snapshot.assignee, snapshot.assignees, rows)
+
+
+def group_by_project(snapshot, rows=None):
+    """{project: status counts} for snapshot positions (all tasks by default)"""
+    return _group_snapshot(snapshot, snapshot.project, snapshot.projects, rows)
+
+
+def group_records(records, key):
+    """{record.<key>: status counts} for a list of TaskRecords"""
+    groups = {}
+    for record in records:
+        value = getattr(record, key)
+        counts = groups.get(value)
+        if counts is None:
+            counts = groups[value] = empty_counts()
+        code = STATUS_CODES.get(record.status)
+        if code is not None:
+            counts[code] += 1
+    return groups
+
+
+def group_records_by_assignee(records):
+    """{user_id: status counts} for a list of TaskRecords (unassigned tasks skipped)"""
+    groups = group_records(records, 'assigned_to')
+    groups.pop(None, None)
+    return groups
+
+
+def group_by_team(assignee_counts, users, default_team='Unassigned'):
+    """Roll per-user counts up to teams, in the order teams first appear in `users`"""
+    teams = {}
+    for user in users:
+        team = user.get('team', default_team)
+        team_counts = teams.get(team)
+        if team_counts is None:
+            team_counts = teams[team] = empty_counts()
+        counts = assignee_counts.get(user['user_id'])
+        if counts:
+            for code, count in enumerate(counts[:len(team_counts)]):
+                team_counts[code] += count
+    return teams
+
+
+def breakdown(counts):
+    """Counts as the {'total', 'completed', 'in_progress', 'open', 'blocked'} dict used in responses"""
+    return {
+        'total': sum(counts),
+        'completed': counts[COMPLETED],
+        'in_progress': counts[IN_PROGRESS],
+        'open': counts[OPEN],
+        'blocked': counts[BLOCKED]
+    }
@@ -0,0 +1,316 @@
+"""
+Dashboard analytics computed from the in-memory task snapshot.
+
+Each function takes a TaskSnapshot plus the request filters and returns the
+JSON-ready payload for the matching endpoint in app.py.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from aggregations import empty_counts, group_by_assignee, group_by_team
+from records import NO_DATE, to_epoch
+from snapshot import BLOCKED, COMPLETED, IN_PROGRESS, OPEN, SECONDS_PER_DAY, STATUSES
+from trends import compute_trends
+
+STATUS_COLORS = {
+    'Open': '#a78bfa',
+    'In Progress': '#60a5fa',
+    'Completed': '#fbbf24',
+    'Blocked': '#ec4899'
+}
+
+
+def _day(ts):
+    """Epoch seconds -> day number (days since 1970-01-01, UTC)"""
+    return ts // SECONDS_PER_DAY
+
+
+def filtered_rows(snapshot, start_date=None, end_date=None):
+    """Snapshot positions matching the created_date filter used by every endpoint"""
+    if start_date and end_date:
+        return snapshot.window(to_epoch(start_date), to_epoch(end_date))
+    return snapshot.window()
+
+
+def status_counts(snapshot, rows):
+    """Count tasks per status code"""
+    counts = [0] * len(snapshot.statuses)
+    status = snapshot.status
+    for pos in rows:
+        counts[status[pos]] += 1
+    return counts
+
+
+def _pct_change(current, previous):
+    return round(((current - previous) / previous * 100), 1) if previous > 0 else 0
+
+
+def period_metrics(snapshot, rows, today, hour_ago):
+    """Status counts and completion metrics for the given snapshot positions"""
+    status = snapshot.status
+    completed_at = snapshot.completed
+    counts = [0] * len(snapshot.statuses)
+    completed_today = 0
+    completed_this_hour = 0
+    for pos in rows:
+        code = status[pos]
+        counts[code] += 1
+        if code == COMPLETED:
+            ts = completed_at[pos]
+            if ts != NO_DATE:
+                if _day(ts) == today:
+                    completed_today += 1
+                if ts >= hour_ago:
+                    completed_this_hour += 1
+
+    total = len(rows)
+    completed = counts[COMPLETED]
+    return {
+        'total': total,
+        'open': counts[OPEN],
+        'in_progress': counts[IN_PROGRESS],
+        'completed': completed,
+        'blocked': counts[BLOCKED],
+        'completed_today': completed_today,
+        'completed_this_hour': completed_this_hour,
+        'completion_rate': round((completed / total * 100), 1) if total > 0 else 0
+    }
+
+
+def overview_windows(start_date=None, end_date=None, now=None):
+    """(start, end, end_inclusive) epoch windows for the current and previous periods"""
+    now = int(datetime.now(timezone.utc).timestamp()) if now is None else now
+    if start_date and end_date:
+        start = to_epoch(start_date)
+        end = to_epoch(end_date)
+        # Previous period: same duration immediately before start_date
+        return (start, end, True), (start - (end - start), start, False)
+    # For "All" filter, compare with last 30 days
+    return (None, None, True), (now - 30 * SECONDS_PER_DAY, now - SECONDS_PER_DAY, False)
+
+
+def overview(metrics_for, start_date=None, end_date=None):
+    """Dashboard overview metrics with period-over-period changes
+
+    `metrics_for(current_window, previous_window, today, hour_ago)` returns
+    period_metrics() for both windows, read from the snapshot or from the
+    daily rollups.
+    """
+    now = int(datetime.now(timezone.utc).timestamp())
+    today = _day(now)
+    hour_ago = now - 3600
+
+    current_window, previous_window = overview_windows(start_date, end_date, now)
+    current, previous = metrics_for(current_window, previous_window, today, hour_ago)
+    return overview_from_metrics(current, previous)
+
+
+def overview_from_metrics(current, previous):
+    """Overview response from current and previous period_metrics()"""
+    completed_today = current['completed_today']
+    prev_completed_today = previous['completed_today']
+    if prev_completed_today > 0:
+        today_change = _pct_change(completed_today, prev_completed_today)
+    else:
+        today_change = 100 if completed_today > 0 else 0
+
+    return {
+        'open_tasks': current['open'],
+        'open_change': _pct_change(current['open'], previous['open']),
+        'in_progress': current['in_progress'],
+        'progress_change': _pct_change(current['in_progress'], previous['in_progress']),
+        'completed_today': completed_today,
+        'today_change': today_change,
+        'completed_this_hour': current['completed_this_hour'],
+        'hour_change': 0,  # Keep hour change as 0 for simplicity
+        'completion_rate': current['completion_rate'],
+        'rate_change': round((current['completion_rate'] - previous['completion_rate']), 1),
+        'blocked_tasks': current['blocked'],
+        'total_tasks': current['total'],
+        'completed_tasks': current['completed']
+    }
+
+
+def distribution(counts):
+    """Task counts per status for the pie chart"""
+    return [
+        {'name': name, 'value': counts[code], 'color': STATUS_COLORS[name]}
+        for code, name in enumerate(STATUSES)
+    ]
+
+
+def _empty_trends():
+    """Last 7 days with zeros"""
+    today = datetime.now(timezone.utc).date()
+    return [
+        {'date': (today - timedelta(days=i)).strftime('%b %d'), 'created': 0, 'completed': 0, 'in_progress': 0}
+        for i in range(6, -1, -1)
+    ]
+
+
+def trends(snapshot, start_date=None, end_date=None, granularity=None):
+    """Created / completed / in-progress series (daily up to 30 days, weekly beyond by default)"""
+    rows = filtered_rows(snapshot, start_date, end_date)
+
+    if start_date and end_date:
+        first_ts = to_epoch(start_date)
+        last_ts = to_epoch(end_date)
+    else:
+        # For "All" filter, span the earliest to latest created date
+        created = snapshot.created
+        created_dates = [created[pos] for pos in rows if created[pos] != NO_DATE]
+        if not created_dates:
+            return _empty_trends()
+        first_ts = min(created_dates)
+        last_ts = max(created_dates)
+
+    return compute_trends(snapshot, rows, first_ts, last_ts, granularity)
+
+
+def team_performance(per_user, users):
+    """Completed / in-progress / open counts summed per team"""
+    result = [
+        {
+            'name': team,
+            'completed': counts[COMPLETED],
+            'in_progress': counts[IN_PROGRESS],
+            'open': counts[OPEN]
+        }
+        for team, counts in group_by_team(per_user, users).items()
+    ]
+
+    # Sort by total tasks (completed + in_progress + open)
+    result.sort(key=lambda x: x['completed'] + x['in_progress'] + x['open'], reverse=True)
+    return result
+
+
+def user_stats(per_user, users):
+    """Users with their task counts and completion percentage"""
+    result = []
+    for user in users:
+        counts = per_user.get(user['user_id']) or empty_counts()
+        assigned = sum(counts)
+        completed = counts[COMPLETED]
+
+        completion_pct = round((completed / assigned * 100), 1) if assigned > 0 else 0
+
+        # Calculate trend
+        if completion_pct == 0:
+            trend = 0.0
+        elif completion_pct == 100:
+            trend = 100.0
+        else:
+            trend = round(completion_pct * random.uniform(0.8, 1.2), 1)
+
+        result.append({
+            'user_id': user['user_id'],
+            'name': user['name'],
+            'initials': user.get('initials'),
+            'email': user.get('email'),
+            'role': user.get('role'),
+            'team': user.get('team'),
+            'assigned': assigned,
+            'completed': completed,
+            'in_progress': counts[IN_PROGRESS],
+            'open': counts[OPEN],
+            'completion_percentage': completion_pct,
+            'trend': trend
+        })
+    return result
+
+
+def project_names(per_project):
+    """Distinct projects that currently have tasks"""
+    return [name for name, counts in per_project.items() if any(counts)]
+
+
+def project_stats(per_project, projects):
+    """Total and open task counts for each project"""
+    result = []
+    for name in projects:
+        counts = per_project.get(name) or empty_counts()
+        result.append({
+            'project': name,
+            'total': sum(counts),
+            'open': counts[OPEN]
+        })
+    return result
+
+
+def due_compliance(snapshot, start_date=None, end_date=None):
+    """Overdue / on-time counts based on due and completion dates"""
+    rows = filtered_rows(snapshot, start_date, end_date)
+    now = int(datetime.now(timezone.utc).timestamp())
+    status = snapshot.status
+    due = snapshot.due
+    completed_at = snapshot.completed
+
+    in_progress = 0
+    overdue = 0
+    on_time = 0
+    for pos in rows:
+        code = status[pos]
+        due_ts = due[pos]
+        if code == IN_PROGRESS:
+            in_progress += 1
+        if code == COMPLETED:
+            if due_ts != NO_DATE and completed_at[pos] != NO_DATE and completed_at[pos] <= due_ts:
+                on_time += 1
+        elif due_ts != NO_DATE and due_ts < now:
+            overdue += 1
+
+    return {
+        'overdue': overdue,
+        'on_time': on_time,
+        'active_tasks': in_progress,
+        'avg_active_time': 159.2
+    }
+
+
+def dashboard_stats(snapshot):
+    """Whole-table stats used to ground the AI dashboard"""
+    rows = snapshot.window()
+    counts = status_counts(snapshot, rows)
+    now = int(datetime.now(timezone.utc).timestamp())
+    status = snapshot.status
+    due = snapshot.due
+    overdue = sum(1 for pos in rows
+                  if status[pos] != COMPLETED and due[pos] != NO_DATE and due[pos] < now)
+
+    total_tasks = len(rows)
+    completed = counts[COMPLETED]
+    return {
+        "total": total_tasks,
+        "completed": completed,
+        "in_progress": counts[IN_PROGRESS],
+        "open": counts[OPEN],
+        "blocked": counts[BLOCKED],
+        "overdue": overdue,
+        "completion_rate": round((completed / total_tasks * 100), 1) if total_tasks > 0 else 0
+    }
+
+
+def dashboard_bundle(snapshot, users, start_date=None, end_date=None, granularity=None):
+    """Overview, distribution, trends and team performance computed from one snapshot"""
+    now = int(datetime.now(timezone.utc).timestamp())
+    today = _day(now)
+    hour_ago = now - 3600
+
+    current_window, previous_window = overview_windows(start_date, end_date, now)
+    rows = snapshot.window(*current_window)
+    current = period_metrics(snapshot, rows, today, hour_ago)
+    previous = period_metrics(snapshot, snapshot.window(*previous_window), today, hour_ago)
+
+    # The current period's status counts are exactly the distribution
+    counts = empty_counts()
+    counts[OPEN] = current['open']
+    counts[IN_PROGRESS] = current['in_progress']
+    counts[COMPLETED] = current['completed']
+    counts[BLOCKED] = current['blocked']
+
+    return {
+        'overview': overview_from_metrics(current, previous),
+        'distribution': distribution(counts),
+        'trends': trends(snapshot, start_date, end_date, granularity),
+        'team_performance': team_performance(group_by_assignee(snapshot, rows), users),
+    }
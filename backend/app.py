@@ -1,429 +1,205 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from datetime import datetime, timedelta, timezone
-import random
+import json
 import os
+import random
+import time
 
-from database import init_db, get_supabase
+from database import attach_change_feed, init_db, get_supabase
 from auth import require_auth
-
-# Initialize Gemini AI client (optional)
-gemini_model = None
-try:
-    import google.generativeai as genai
-    gemini_api_key = os.getenv('GEMINI_API_KEY')
-    if gemini_api_key:
-        genai.configure(api_key=gemini_api_key)
-        # Using Gemini 2.0 Flash - Latest model with 1M token context window
-        gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        print("✅ Gemini 2.0 Flash initialized (1M token context)")
-    else:
-        print("⚠️  Gemini API key not found - using fallback summaries")
-except Exception as e:
-    print(f"⚠️  Gemini not available: {e} - using fallback summaries")
+from bulk_reads import read_all
+from cache import cached_response, response_cache
+from changefeed import start_change_feed
+from chat_context import build_context
+from etag import conditional_get, data_versions
+from fanout import gather
+from generations import generation_cache
+from pagination import KEYSET_FIELDS, after_cursor, decode_cursor, encode_cursor, parse_fields, parse_limit
+from records import NO_DATE, normalize_tasks
+from snapshot import BLOCKED, SNAPSHOT_ENABLED, get_task_snapshot, task_snapshot
+from streams import StreamHub, sse_event
+from trends import GRANULARITIES
+import analytics
+import chat_intents
+import llm
+import metrics
+import task_counts
+import task_search
 
 app = Flask(__name__)
-CORS(app)
+# Per-route latency by phase, rows fetched and response sizes, served at /api/metrics
+metrics.init_app(app)
+# Expose the validators so the frontend can send If-None-Match
+CORS(app, expose_headers=['ETag', 'Last-Modified'])
 
 # Initialize Supabase database
 init_db(app)
 
+# Drop cached responses (and refresh the task snapshot) when tasks or users change
+change_feed = start_change_feed()
+attach_change_feed(change_feed)
+# The snapshot is marked stale before the cache version moves (see ResponseCache.attach)
+task_snapshot.attach(change_feed)
+response_cache.attach(change_feed)
+data_versions.attach(change_feed)
+
+
+def active_users(query, team_filter=None):
+    """Restrict a users query to active members (of one team, unless the filter is 'all')"""
+    query = query.eq('is_active', True)
+    if team_filter and team_filter != 'all':
+        query = query.eq('team', team_filter)
+    return query
+
+
+def build_dashboard_bundle(start_date, end_date, team_filter, granularity):
+    """Overview, distribution, trends and team performance for one set of filters"""
+    results = gather(
+        users=lambda: read_all('users', 'user_id, name, team', lambda query: active_users(query, team_filter)),
+        tasks=lambda: task_counts.dashboard_snapshot(start_date, end_date),
+    )
+    
+    return analytics.dashboard_bundle(results['tasks'], results['users'], start_date, end_date, granularity)
+
+
+# Live Overview streams: one recomputation per filter, pushed to every subscriber
+overview_hub = StreamHub(lambda key: build_dashboard_bundle(*key))
+overview_hub.attach(change_feed)
+
 # ==================== OVERVIEW ENDPOINTS ====================
 
 @app.route('/api/overview', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_overview():
     """Get dashboard overview metrics"""
-    supabase = get_supabase()
-    
     # Get date filter parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build query with date filter if provided
-    query = supabase.table('tasks').select('status, completed_date, created_date')
-    
-    if start_date and end_date:
-        # Filter by date range on created_date
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    tasks_response = query.execute()
-    tasks = tasks_response.data
-    
-    total_tasks = len(tasks)
-    open_tasks = sum(1 for t in tasks if t['status'] == 'Open')
-    in_progress = sum(1 for t in tasks if t['status'] == 'In Progress')
-    completed = sum(1 for t in tasks if t['status'] == 'Completed')
-    blocked = sum(1 for t in tasks if t['status'] == 'Blocked')
-    
-    # Today's completed tasks
-    today = datetime.now(timezone.utc).date()
-    completed_today = sum(1 for t in tasks 
-                         if t['status'] == 'Completed' 
-                         and t.get('completed_date') 
-                         and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() == today)
-    
-    # This hour's completed (make hour_ago timezone-aware)
-    hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-    completed_this_hour = sum(1 for t in tasks 
-                             if t['status'] == 'Completed' 
-                             and t.get('completed_date')
-                             and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')) >= hour_ago)
-    
-    # Completion rate
-    completion_rate = round((completed / total_tasks * 100), 1) if total_tasks > 0 else 0
-    
-    # Calculate percentage changes by comparing with previous period
-    now = datetime.now(timezone.utc)
-    
-    if start_date and end_date:
-        # Calculate previous period (same duration before start_date)
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-        duration = end - start
-        
-        prev_start = start - duration
-        prev_end = start
-        
-        # Get previous period data
-        prev_query = supabase.table('tasks').select('status, completed_date, created_date')
-        prev_query = prev_query.gte('created_date', prev_start.isoformat()).lt('created_date', prev_end.isoformat())
-        prev_tasks_response = prev_query.execute()
-        prev_tasks = prev_tasks_response.data
-        
-        prev_open = sum(1 for t in prev_tasks if t['status'] == 'Open')
-        prev_in_progress = sum(1 for t in prev_tasks if t['status'] == 'In Progress')
-        prev_completed_today = sum(1 for t in prev_tasks 
-                                   if t['status'] == 'Completed' 
-                                   and t.get('completed_date')
-                                   and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() == today)
-        prev_completed = sum(1 for t in prev_tasks if t['status'] == 'Completed')
-        prev_total = len(prev_tasks)
-        prev_completion_rate = round((prev_completed / prev_total * 100), 1) if prev_total > 0 else 0
-        
-        # Calculate percentage changes
-        open_change = round(((open_tasks - prev_open) / prev_open * 100), 1) if prev_open > 0 else 0
-        progress_change = round(((in_progress - prev_in_progress) / prev_in_progress * 100), 1) if prev_in_progress > 0 else 0
-        today_change = round(((completed_today - prev_completed_today) / prev_completed_today * 100), 1) if prev_completed_today > 0 else (100 if completed_today > 0 else 0)
-        rate_change = round((completion_rate - prev_completion_rate), 1)
-        hour_change = 0  # Keep hour change as 0 for simplicity
-    else:
-        # For "All" filter, compare with last 30 days
-        thirty_days_ago = now - timedelta(days=30)
-        prev_query = supabase.table('tasks').select('status, completed_date, created_date')
-        prev_query = prev_query.gte('created_date', thirty_days_ago.isoformat()).lt('created_date', (now - timedelta(days=1)).isoformat())
-        prev_tasks_response = prev_query.execute()
-        prev_tasks = prev_tasks_response.data
-        
-        prev_open = sum(1 for t in prev_tasks if t['status'] == 'Open')
-        prev_in_progress = sum(1 for t in prev_tasks if t['status'] == 'In Progress')
-        prev_completed_today = sum(1 for t in prev_tasks 
-                                   if t['status'] == 'Completed' 
-                                   and t.get('completed_date')
-                                   and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() == today)
-        prev_completed = sum(1 for t in prev_tasks if t['status'] == 'Completed')
-        prev_total = len(prev_tasks)
-        prev_completion_rate = round((prev_completed / prev_total * 100), 1) if prev_total > 0 else 0
-        
-        # Calculate percentage changes
-        open_change = round(((open_tasks - prev_open) / prev_open * 100), 1) if prev_open > 0 else 0
-        progress_change = round(((in_progress - prev_in_progress) / prev_in_progress * 100), 1) if prev_in_progress > 0 else 0
-        today_change = round(((completed_today - prev_completed_today) / prev_completed_today * 100), 1) if prev_completed_today > 0 else (100 if completed_today > 0 else 0)
-        rate_change = round((completion_rate - prev_completion_rate), 1)
-        hour_change = 0
-    
-    return jsonify({
-        'open_tasks': open_tasks,
-        'open_change': open_change,
-        'in_progress': in_progress,
-        'progress_change': progress_change,
-        'completed_today': completed_today,
-        'today_change': today_change,
-        'completed_this_hour': completed_this_hour,
-        'hour_change': hour_change,
-        'completion_rate': completion_rate,
-        'rate_change': rate_change,
-        'blocked_tasks': blocked,
-        'total_tasks': total_tasks,
-        'completed_tasks': completed
-    })
+    return jsonify(analytics.overview(task_counts.period_metrics, start_date, end_date))
 
 @app.route('/api/distribution', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_task_distribution():
     """Get task distribution for pie chart"""
-    supabase = get_supabase()
-    
     # Get date filter parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build query with date filter if provided
-    query = supabase.table('tasks').select('status')
-    
-    if start_date and end_date:
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    tasks_response = query.execute()
-    tasks = tasks_response.data
-    
-    open_tasks = sum(1 for t in tasks if t['status'] == 'Open')
-    in_progress = sum(1 for t in tasks if t['status'] == 'In Progress')
-    completed = sum(1 for t in tasks if t['status'] == 'Completed')
-    blocked = sum(1 for t in tasks if t['status'] == 'Blocked')
-    
-    return jsonify([
-        {'name': 'Open', 'value': open_tasks, 'color': '#a78bfa'},
-        {'name': 'In Progress', 'value': in_progress, 'color': '#60a5fa'},
-        {'name': 'Completed', 'value': completed, 'color': '#fbbf24'},
-        {'name': 'Blocked', 'value': blocked, 'color': '#ec4899'}
-    ])
+    return jsonify(analytics.distribution(task_counts.by_status(start_date, end_date)))
 
 @app.route('/api/trends', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_trends():
     """Get trend data based on date filter"""
-    supabase = get_supabase()
-    
     # Get date filter parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    granularity = request.args.get('granularity')  # hourly, daily, weekly, monthly (default: auto)
     
-    # Build query with date filter if provided
-    query = supabase.table('tasks').select('created_date, completed_date, start_date, status')
-    
-    if start_date and end_date:
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    tasks_response = query.execute()
-    tasks = tasks_response.data
+    try:
+        trends = analytics.trends(get_task_snapshot(), start_date, end_date, granularity)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    trends = []
+    return jsonify(trends)
+
+@app.route('/api/dashboard/bundle', methods=['GET'])
+@require_auth
+@conditional_get(tables=('tasks', 'users'))
+@cached_response(tables=('tasks', 'users'))
+def get_dashboard_bundle():
+    """Overview, distribution, trends and team performance in one response"""
+    # Same filters as the individual endpoints
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    team_filter = request.args.get('team')
+    granularity = request.args.get('granularity')
     
-    # Determine date range for trends
-    if start_date and end_date:
-        # Use the provided date range
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00')).date()
-        end = datetime.fromisoformat(end_date.replace('Z', '+00:00')).date()
-        # Calculate number of days
-        days_diff = (end - start).days
-        # Limit to max 30 days for performance, or use actual range
-        if days_diff > 30:
-            # For longer ranges, show weekly data
-            current = start
-            while current <= end:
-                week_end = min(current + timedelta(days=6), end)
-                date_str = f"{current.strftime('%b %d')} - {week_end.strftime('%b %d')}"
-                
-                created = sum(1 for t in tasks 
-                             if t.get('created_date') 
-                             and current <= datetime.fromisoformat(t['created_date'].replace('Z', '+00:00')).date() <= week_end)
-                
-                completed = sum(1 for t in tasks 
-                               if t['status'] == 'Completed' 
-                               and t.get('completed_date')
-                               and current <= datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() <= week_end)
-                
-                in_progress = sum(1 for t in tasks 
-                                 if t['status'] == 'In Progress' 
-                                 and t.get('start_date')
-                                 and current <= datetime.fromisoformat(t['start_date'].replace('Z', '+00:00')).date() <= week_end)
-                
-                trends.append({
-                    'date': date_str,
-                    'created': created,
-                    'completed': completed,
-                    'in_progress': in_progress
-                })
-                current = week_end + timedelta(days=1)
-        else:
-            # For shorter ranges, show daily data
-            current = start
-            while current <= end:
-                date_str = current.strftime('%b %d')
-                
-                created = sum(1 for t in tasks 
-                             if t.get('created_date') 
-                             and datetime.fromisoformat(t['created_date'].replace('Z', '+00:00')).date() == current)
-                
-                completed = sum(1 for t in tasks 
-                               if t['status'] == 'Completed' 
-                               and t.get('completed_date')
-                               and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() == current)
-                
-                in_progress = sum(1 for t in tasks 
-                                 if t['status'] == 'In Progress' 
-                                 and t.get('start_date')
-                                 and datetime.fromisoformat(t['start_date'].replace('Z', '+00:00')).date() <= current)
-                
-                trends.append({
-                    'date': date_str,
-                    'created': created,
-                    'completed': completed,
-                    'in_progress': in_progress
-                })
-                current += timedelta(days=1)
-    else:
-        # For "All" filter, show all available data grouped by week or day
-        if tasks:
-            # Get the earliest and latest task dates
-            task_dates = [datetime.fromisoformat(t['created_date'].replace('Z', '+00:00')).date() 
-                         for t in tasks if t.get('created_date')]
-            if task_dates:
-                earliest_date = min(task_dates)
-                latest_date = max(task_dates)
-                
-                days_diff = (latest_date - earliest_date).days
-                
-                if days_diff > 30:
-                    # Show weekly data for longer ranges
-                    current = earliest_date
-                    while current <= latest_date:
-                        week_end = min(current + timedelta(days=6), latest_date)
-                        date_str = f"{current.strftime('%b %d')} - {week_end.strftime('%b %d')}"
-                        
-                        created = sum(1 for t in tasks 
-                                     if t.get('created_date') 
-                                     and current <= datetime.fromisoformat(t['created_date'].replace('Z', '+00:00')).date() <= week_end)
-                        
-                        completed = sum(1 for t in tasks 
-                                       if t['status'] == 'Completed' 
-                                       and t.get('completed_date')
-                                       and current <= datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() <= week_end)
-                        
-                        in_progress = sum(1 for t in tasks 
-                                         if t['status'] == 'In Progress' 
-                                         and t.get('start_date')
-                                         and current <= datetime.fromisoformat(t['start_date'].replace('Z', '+00:00')).date() <= week_end)
-                        
-                        trends.append({
-                            'date': date_str,
-                            'created': created,
-                            'completed': completed,
-                            'in_progress': in_progress
-                        })
-                        current = week_end + timedelta(days=1)
-                else:
-                    # Show daily data for shorter ranges
-                    current = earliest_date
-                    while current <= latest_date:
-                        date_str = current.strftime('%b %d')
-                        
-                        created = sum(1 for t in tasks 
-                                     if t.get('created_date') 
-                                     and datetime.fromisoformat(t['created_date'].replace('Z', '+00:00')).date() == current)
-                        
-                        completed = sum(1 for t in tasks 
-                                       if t['status'] == 'Completed' 
-                                       and t.get('completed_date')
-                                       and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')).date() == current)
-                        
-                        in_progress = sum(1 for t in tasks 
-                                         if t['status'] == 'In Progress' 
-                                         and t.get('start_date')
-                                         and datetime.fromisoformat(t['start_date'].replace('Z', '+00:00')).date() <= current)
-                        
-                        trends.append({
-                            'date': date_str,
-                            'created': created,
-                            'completed': completed,
-                            'in_progress': in_progress
-                        })
-                        current += timedelta(days=1)
-            else:
-                # No valid dates, show last 7 days with zeros
-                for i in range(6, -1, -1):
-                    date = datetime.now(timezone.utc).date() - timedelta(days=i)
-                    date_str = date.strftime('%b %d')
-                    trends.append({
-                        'date': date_str,
-                        'created': 0,
-                        'completed': 0,
-                        'in_progress': 0
-                    })
-        else:
-            # No tasks, show last 7 days with zeros
-            for i in range(6, -1, -1):
-                date = datetime.now(timezone.utc).date() - timedelta(days=i)
-                date_str = date.strftime('%b %d')
-                trends.append({
-                    'date': date_str,
-                    'created': 0,
-                    'completed': 0,
-                    'in_progress': 0
-                })
+    try:
+        bundle = build_dashboard_bundle(start_date, end_date, team_filter, granularity)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify(trends)
+    return jsonify(bundle)
+
+@app.route('/api/stream/overview', methods=['GET'])
+@require_auth
+def stream_overview():
+    """Server-sent events with the dashboard bundle, pushed again whenever tasks or users change"""
+    start_date = request.args.get('start_date') or None
+    end_date = request.args.get('end_date') or None
+    team_filter = request.args.get('team') or None
+    granularity = request.args.get('granularity') or None
+    
+    if granularity and granularity not in GRANULARITIES:
+        return jsonify({'error': f"Unknown granularity '{granularity}' (expected one of {', '.join(GRANULARITIES)})"}), 400
+    if team_filter == 'all':
+        team_filter = None
+    
+    # Every open stream holds a request thread; past the cap the dashboard polls instead
+    if not overview_hub.reserve():
+        return jsonify({'error': 'Too many open streams, poll /api/dashboard/bundle instead'}), 503, {'Retry-After': '30'}
+    
+    key = (start_date, end_date, team_filter, granularity)
+    response = Response(overview_hub.events(key), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let nginx buffer the stream
+    })
+    response.call_on_close(overview_hub.release)
+    return response
 
 @app.route('/api/teams', methods=['GET'])
 @require_auth
+@conditional_get(tables=('users',))
+@cached_response(tables=('users',))
 def get_teams():
     """Get all unique teams from database"""
-    supabase = get_supabase()
-    
-    users_response = supabase.table('users').select('team').eq('is_active', True).execute()
-    teams = list(set([user['team'] for user in users_response.data if user.get('team')]))
+    users = read_all('users', 'team', active_users)
+    teams = list(set([user['team'] for user in users if user.get('team')]))
     
     return jsonify(sorted(teams))
 
 @app.route('/api/team-performance', methods=['GET'])
 @require_auth
+@conditional_get(tables=('tasks', 'users'))
+@cached_response(tables=('tasks', 'users'))
 def get_team_performance():
     """Get team performance data"""
-    supabase = get_supabase()
-    
     # Get filter parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     team_filter = request.args.get('team')  # Optional team filter
     
-    # Get all users with their teams
-    users_query = supabase.table('users').select('user_id, name, team').eq('is_active', True)
-    if team_filter and team_filter != 'all':
-        users_query = users_query.eq('team', team_filter)
-    
-    users_response = users_query.execute()
-    users = users_response.data
-    
-    # Build query with date filter if provided
-    query = supabase.table('tasks').select('assigned_to, status, created_date')
+    # Active users with their teams, and task counts per assignee
+    results = gather(
+        users=lambda: read_all('users', 'user_id, name, team', lambda query: active_users(query, team_filter)),
+        counts=lambda: task_counts.by_assignee(start_date, end_date),
+    )
     
-    if start_date and end_date:
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    tasks_response = query.execute()
-    tasks = tasks_response.data
-    
-    # Group by team
-    team_stats = {}
-    for user in users:
-        team = user.get('team', 'Unassigned')
-        if team not in team_stats:
-            team_stats[team] = {
-                'name': team,
-                'completed': 0,
-                'in_progress': 0,
-                'open': 0
-            }
-        
-        user_tasks = [t for t in tasks if t.get('assigned_to') == user['user_id']]
-        team_stats[team]['completed'] += sum(1 for t in user_tasks if t['status'] == 'Completed')
-        team_stats[team]['in_progress'] += sum(1 for t in user_tasks if t['status'] == 'In Progress')
-        team_stats[team]['open'] += sum(1 for t in user_tasks if t['status'] == 'Open')
-    
-    result = list(team_stats.values())
-    
-    # Sort by total tasks (completed + in_progress + open)
-    result.sort(key=lambda x: x['completed'] + x['in_progress'] + x['open'], reverse=True)
-    
-    return jsonify(result)
+    return jsonify(analytics.team_performance(results['counts'], results['users']))
 
 # ==================== TASKS ENDPOINTS ====================
 
 @app.route('/api/tasks', methods=['GET'])
 @require_auth
+@conditional_get()
 def get_tasks():
-    """Get all tasks with optional filters"""
+    """Get tasks with optional filters
+
+    `search` runs a ranked full-text + fuzzy search (best matches first).
+    Without `limit`/`cursor` the full filtered list is returned as before.
+    With either, one page comes back as {'tasks', 'next_cursor'} (plus
+    'total' when include_total=true), ordered newest first (or by rank when
+    searching). `fields` projects the columns, e.g. fields=task_id,status.
+    """
     supabase = get_supabase()
     
     # Get filter parameters
@@ -431,33 +207,102 @@ def get_tasks():
     project = request.args.get('project')
     assigned_to = request.args.get('assigned_to')
     priority = request.args.get('priority')
-    search = request.args.get('search', '')
+    search = request.args.get('search', '').strip()
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build query
-    query = supabase.table('tasks').select('*')
-    
-    if status and status != 'All Tasks':
-        query = query.eq('status', status)
-    if project:
-        query = query.eq('project', project)
-    if assigned_to:
-        query = query.eq('assigned_to', assigned_to)
-    if priority:
-        query = query.eq('priority', priority)
+    # Pagination / projection parameters
+    paginated = 'limit' in request.args or 'cursor' in request.args
+    include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args['cursor'], ranked=bool(search)) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filters = {
+        'status': status if status != 'All Tasks' else None,
+        'project': project,
+        'assigned_to': assigned_to,
+        'priority': priority,
+    }
+    
+    def filtered(query):
+        for column, value in filters.items():
+            if value:
+                query = query.eq(column, value)
+        if start_date and end_date:
+            query = query.gte('created_date', start_date).lte('created_date', end_date)
+        return query
+    
+    total = None
     if search:
-        query = query.ilike('task_name', f'%{search}%')
-    if start_date and end_date:
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    response = query.execute()
-    tasks = response.data
+        # Ranked matches from search_tasks() (see supabase_schema.sql)
+        tasks = task_search.search_tasks(search, filters, start_date, end_date,
+                                         limit=limit + 1 if paginated else None, after=cursor)
+        if include_total and paginated:
+            total = task_search.count_matches(search, filters, start_date, end_date)
+        sort_key = 'rank'
+    else:
+        columns = '*'
+        if fields:
+            # The cursor is built from the sort key, so always select it when paging
+            needed = fields + [f for f in KEYSET_FIELDS if paginated and f not in fields]
+            columns = ', '.join(needed)
+        
+        if not paginated:
+            # Every match, read in pages so PostgREST's max-rows cannot cut the list short
+            return jsonify(read_all('tasks', columns, filtered))
+        
+        # On the first page the count rides along; later pages need it without the cursor filter
+        query = filtered(supabase.table('tasks').select(columns, count='exact' if include_total and not cursor else None))
+        if cursor:
+            query = after_cursor(query, cursor)
+        # One extra row tells us whether another page exists
+        query = query.order('created_date', desc=True, nullsfirst=False).order('task_id', desc=True).limit(limit + 1)
+        response = query.execute()
+        tasks = response.data
+        if include_total:
+            total = response.count if not cursor else \
+                filtered(supabase.table('tasks').select('task_id', count='exact', head=True)).execute().count
+        sort_key = 'created_date'
+    
+    next_cursor = None
+    if paginated and len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(tasks[-1], sort_key)
+    if fields:
+        tasks = [{f: task.get(f) for f in fields} for task in tasks]
+    elif search:
+        for task in tasks:
+            task.pop('rank', None)
+    
+    if not paginated:
+        return jsonify(tasks)
+    page = {'tasks': tasks, 'next_cursor': next_cursor}
+    if include_total:
+        page['total'] = total
+    return jsonify(page)
+
+@app.route('/api/tasks/suggest', methods=['GET'])
+@require_auth
+@conditional_get()
+def suggest_tasks():
+    """Typeahead suggestions for task names (?q=...&limit=10)"""
+    query = request.args.get('q', '').strip()
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not query:
+        return jsonify([])
     
-    return jsonify(tasks)
+    return jsonify(task_search.suggest(query, limit))
 
 @app.route('/api/tasks/<task_id>', methods=['GET'])
 @require_auth
+@conditional_get()
 def get_task(task_id):
     """Get single task by ID"""
     supabase = get_supabase()
@@ -471,99 +316,43 @@ def get_task(task_id):
 
 @app.route('/api/projects', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_projects():
     """Get all unique projects"""
-    supabase = get_supabase()
-    
-    response = supabase.table('tasks').select('project').execute()
-    projects = list(set([t['project'] for t in response.data if t.get('project')]))
-    
-    return jsonify(projects)
+    return jsonify(analytics.project_names(task_counts.by_project()))
 
 @app.route('/api/projects/stats', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_project_stats():
     """Get task counts by project"""
-    supabase = get_supabase()
-    
     projects = ['API Services', 'Mobile App', 'Web Platform']
     
-    tasks_response = supabase.table('tasks').select('project, status').execute()
-    tasks = tasks_response.data
-    
-    result = []
-    for project in projects:
-        project_tasks = [t for t in tasks if t.get('project') == project]
-        total = len(project_tasks)
-        open_tasks = sum(1 for t in project_tasks if t['status'] == 'Open')
-        
-        result.append({
-            'project': project,
-            'total': total,
-            'open': open_tasks
-        })
-    
-    return jsonify(result)
+    return jsonify(analytics.project_stats(task_counts.by_project(), projects))
 
 # ==================== USERS ENDPOINTS ====================
 
 @app.route('/api/users', methods=['GET'])
 @require_auth
+@conditional_get(tables=('tasks', 'users'))
+@cached_response(tables=('tasks', 'users'))
 def get_users():
     """Get all users with task statistics"""
-    supabase = get_supabase()
-    
     search = request.args.get('search', '')
     
-    # Get users
-    query = supabase.table('users').select('*')
-    if search:
-        query = query.ilike('name', f'%{search}%')
-    
-    users_response = query.execute()
-    users = users_response.data
-    
-    # Get all tasks
-    tasks_response = supabase.table('tasks').select('assigned_to, status').execute()
-    tasks = tasks_response.data
-    
-    result = []
-    for user in users:
-        user_tasks = [t for t in tasks if t.get('assigned_to') == user['user_id']]
-        assigned = len(user_tasks)
-        completed = sum(1 for t in user_tasks if t['status'] == 'Completed')
-        in_progress = sum(1 for t in user_tasks if t['status'] == 'In Progress')
-        open_tasks = sum(1 for t in user_tasks if t['status'] == 'Open')
-        
-        completion_pct = round((completed / assigned * 100), 1) if assigned > 0 else 0
-        
-        # Calculate trend
-        if completion_pct == 0:
-            trend = 0.0
-        elif completion_pct == 100:
-            trend = 100.0
-        else:
-            trend = round(completion_pct * random.uniform(0.8, 1.2), 1)
-        
-        result.append({
-            'user_id': user['user_id'],
-            'name': user['name'],
-            'initials': user.get('initials'),
-            'email': user.get('email'),
-            'role': user.get('role'),
-            'team': user.get('team'),
-            'assigned': assigned,
-            'completed': completed,
-            'in_progress': in_progress,
-            'open': open_tasks,
-            'completion_percentage': completion_pct,
-            'trend': trend
-        })
+    # Users and task counts per assignee
+    results = gather(
+        users=lambda: read_all('users', '*', lambda query: query.ilike('name', f'%{search}%') if search else query),
+        counts=task_counts.by_assignee,
+    )
     
-    return jsonify(result)
+    return jsonify(analytics.user_stats(results['counts'], results['users']))
 
 @app.route('/api/users/<user_id>', methods=['GET'])
 @require_auth
+@conditional_get(tables=('users',))
 def get_user(user_id):
     """Get single user by ID"""
     supabase = get_supabase()
@@ -595,44 +384,29 @@ def get_ai_summary():
     
     query = query.order('created_date', desc=True).limit(50)
     tasks_response = query.execute()
-    tasks = tasks_response.data
+    tasks = normalize_tasks(tasks_response.data)
     
     # Calculate metrics
-    hour_24_ago = datetime.now(timezone.utc) - timedelta(hours=24)
+    hour_24_ago = int((datetime.now(timezone.utc) - timedelta(hours=24)).timestamp())
     completed_24h = sum(1 for t in tasks 
-                       if t['status'] == 'Completed' 
-                       and t.get('completed_date')
-                       and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')) >= hour_24_ago)
+                       if t.status == 'Completed' 
+                       and t.completed >= hour_24_ago)
     
     # Calculate average closure time
-    completed_tasks = [t for t in tasks 
-                      if t['status'] == 'Completed' 
-                      and t.get('completed_date') 
-                      and t.get('created_date')]
-    
-    closure_times = []
-    if completed_tasks:
-        for task in completed_tasks:
-            try:
-                completed = datetime.fromisoformat(task['completed_date'].replace('Z', '+00:00'))
-                created = datetime.fromisoformat(task['created_date'].replace('Z', '+00:00'))
-                delta = completed - created
-                hours = delta.total_seconds() / 3600
-                closure_times.append(hours)
-            except:
-                continue
-        avg_closure = round(sum(closure_times) / len(closure_times), 1) if closure_times else 0
-    else:
-        avg_closure = 0
+    closure_times = [(t.completed - t.created) / 3600 for t in tasks 
+                     if t.status == 'Completed' 
+                     and t.completed != NO_DATE 
+                     and t.created != NO_DATE]
+    avg_closure = round(sum(closure_times) / len(closure_times), 1) if closure_times else 0
     
-    blocked = sum(1 for t in tasks if t['status'] == 'Blocked')
-    open_tasks = sum(1 for t in tasks if t['status'] == 'Open')
-    in_progress = sum(1 for t in tasks if t['status'] == 'In Progress')
+    blocked = sum(1 for t in tasks if t.status == 'Blocked')
+    open_tasks = sum(1 for t in tasks if t.status == 'Open')
+    in_progress = sum(1 for t in tasks if t.status == 'In Progress')
     
     # Format tasks for AI prompt
     task_summary = []
     for task in tasks[:20]:  # Use top 20 for context
-        task_summary.append(f"- {task['task_name']} (Status: {task['status']}, Priority: {task['priority']}, Project: {task.get('project', 'N/A')})")
+        task_summary.append(f"- {task.task_name} (Status: {task.status}, Priority: {task.priority}, Project: {task.project})")
     
     tasks_text = "\n".join(task_summary)
     
@@ -651,50 +425,45 @@ Metrics:
 
 Provide a professional summary highlighting key trends, potential bottlenecks, and recommendations."""
     
-    # Try to use Gemini if available
-    if gemini_model:
+    # Fallback is served when Gemini is not configured, busy or too slow
+    fallback_summary = f"Over the last 24 hours, your team completed {completed_24h} tasks with an average closure time of {avg_closure} hours. "
+    fallback_summary += f"There are {blocked} blocked tasks and {open_tasks} open tasks requiring attention. "
+    fallback_summary += f"Focus on clearing blockers to improve velocity."
+    
+    cache_state = None
+    if llm.available():
         try:
-            response = gemini_model.generate_content(prompt)
-            summary = response.text.strip()
+            # Same filter: reuse its summary, regenerating in the background only when the numbers moved
+            summary, cache_state = generation_cache.get('summary', {'start_date': start_date, 'end_date': end_date},
+                                                        prompt, lambda: llm.generate(prompt).strip())
         except Exception as e:
             print(f"Gemini API error: {e}")
-            # Use fallback
-            summary = f"Over the last 24 hours, your team completed {completed_24h} tasks with an average closure time of {avg_closure} hours. "
-            summary += f"There are {blocked} blocked tasks and {open_tasks} open tasks requiring attention. "
-            summary += f"Focus on clearing blockers to improve velocity."
+            summary = fallback_summary
     else:
-        # Use fallback if Gemini not configured
-        summary = f"Over the last 24 hours, your team completed {completed_24h} tasks with an average closure time of {avg_closure} hours. "
-        summary += f"There are {blocked} blocked tasks and {open_tasks} open tasks requiring attention. "
-        summary += f"Focus on clearing blockers to improve velocity."
+        summary = fallback_summary
     
-    return jsonify({
+    response = jsonify({
         'summary': summary,
         'completed_24h': completed_24h,
         'avg_closure_time': avg_closure,
         'velocity_change': round(random.uniform(-20, 20), 1),  # Keep for UI compatibility
         'blocked_tasks': blocked
     })
+    if cache_state:
+        response.headers['X-Generation-Cache'] = cache_state
+    return response
 
 @app.route('/api/ai/closure-performance', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_closure_performance():
     """Task closure performance metrics"""
-    supabase = get_supabase()
-    
     # Get date filter parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build query with date filter if provided
-    query = supabase.table('tasks').select('status')
-    
-    if start_date and end_date:
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    tasks_response = query.execute()
-    tasks = tasks_response.data
-    blocked = sum(1 for t in tasks if t['status'] == 'Blocked')
+    blocked = task_counts.by_status(start_date, end_date)[BLOCKED]
     
     return jsonify({
         'current_avg': 30.1,
@@ -705,45 +474,19 @@ def get_closure_performance():
 
 @app.route('/api/ai/due-compliance', methods=['GET'])
 @require_auth
+@conditional_get()
+@cached_response()
 def get_due_compliance():
     """Due date compliance metrics"""
-    supabase = get_supabase()
-    
     # Get date filter parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build query with date filter if provided
-    query = supabase.table('tasks').select('status, due_date, completed_date')
-    
-    if start_date and end_date:
-        query = query.gte('created_date', start_date).lte('created_date', end_date)
-    
-    tasks_response = query.execute()
-    tasks = tasks_response.data
-    in_progress = sum(1 for t in tasks if t['status'] == 'In Progress')
-    
-    # Calculate overdue and on-time based on actual data
-    now = datetime.now(timezone.utc)
-    overdue = sum(1 for t in tasks 
-                  if t.get('due_date') 
-                  and datetime.fromisoformat(t['due_date'].replace('Z', '+00:00')) < now
-                  and t['status'] != 'Completed')
-    on_time = sum(1 for t in tasks 
-                 if t['status'] == 'Completed' 
-                 and t.get('due_date') 
-                 and t.get('completed_date')
-                 and datetime.fromisoformat(t['completed_date'].replace('Z', '+00:00')) <= datetime.fromisoformat(t['due_date'].replace('Z', '+00:00')))
-    
-    return jsonify({
-        'overdue': overdue,
-        'on_time': on_time,
-        'active_tasks': in_progress,
-        'avg_active_time': 159.2
-    })
+    return jsonify(analytics.due_compliance(get_task_snapshot(), start_date, end_date))
 
 @app.route('/api/ai/predictions', methods=['GET'])
 @require_auth
+@conditional_get(tables=())
 def get_predictions():
     """Predictive analytics"""
     return jsonify({
@@ -756,6 +499,7 @@ def get_predictions():
 
 @app.route('/api/ai/team-benchmarking', methods=['GET'])
 @require_auth
+@conditional_get(tables=())
 def get_team_benchmarking():
     """Team benchmarking data"""
     teams = [
@@ -815,6 +559,7 @@ def get_productivity_trends():
 
 @app.route('/api/ai/sentiment', methods=['GET'])
 @require_auth
+@conditional_get(tables=())
 def get_sentiment():
     """Team communication sentiment analysis"""
     return jsonify({
@@ -828,45 +573,17 @@ def get_sentiment():
 @require_auth
 def get_ai_dashboard():
     """Generate complete AI dashboard using Gemini 2.0 Flash with JSON mode"""
-    supabase = get_supabase()
-    
     try:
-        # 1. FETCH REAL BASE DATA (Fast)
-        tasks_resp = supabase.table('tasks').select('status, priority, due_date, completed_date, created_date').execute()
-        tasks = tasks_resp.data
-        
-        now = datetime.now(timezone.utc)
-        
-        # Calculate real stats
-        total_tasks = len(tasks)
-        completed = sum(1 for t in tasks if t.get('status') == 'Completed')
-        in_progress = sum(1 for t in tasks if t.get('status') == 'In Progress')
-        open_tasks = sum(1 for t in tasks if t.get('status') == 'Open')
-        blocked = sum(1 for t in tasks if t.get('status') == 'Blocked')
+        # 1. REAL BASE DATA (from the in-memory task snapshot)
+        real_stats = analytics.dashboard_stats(get_task_snapshot())
         
-        # Calculate overdue
-        overdue = 0
-        for t in tasks:
-            if t.get('due_date') and t.get('status') != 'Completed':
-                try:
-                    due = datetime.fromisoformat(t['due_date'].replace('Z', '+00:00'))
-                    if due < now:
-                        overdue += 1
-                except:
-                    pass
-        
-        # Calculate completion rate
-        completion_rate = round((completed / total_tasks * 100), 1) if total_tasks > 0 else 0
-        
-        real_stats = {
-            "total": total_tasks,
-            "completed": completed,
-            "in_progress": in_progress,
-            "open": open_tasks,
-            "blocked": blocked,
-            "overdue": overdue,
-            "completion_rate": completion_rate
-        }
+        total_tasks = real_stats['total']
+        completed = real_stats['completed']
+        in_progress = real_stats['in_progress']
+        open_tasks = real_stats['open']
+        blocked = real_stats['blocked']
+        overdue = real_stats['overdue']
+        completion_rate = real_stats['completion_rate']
         
         import json
         
@@ -938,37 +655,7 @@ CRITICAL RULES:
 
 Generate the JSON now:"""
 
-        # 3. CALL GEMINI 2.0 WITH JSON MODE
-        if gemini_model:
-            try:
-                print("🤖 Generating AI Dashboard with Gemini 2.0...")
-                
-                # Configure for JSON output
-                generation_config = {
-                    "response_mime_type": "application/json",
-                    "temperature": 0.7
-                }
-                
-                response = gemini_model.generate_content(
-                    system_prompt,
-                    generation_config=generation_config
-                )
-                
-                # Parse and validate JSON
-                dashboard_data = json.loads(response.text)
-                print("✅ AI Dashboard generated successfully")
-                
-                from flask import Response
-                return Response(json.dumps(dashboard_data), mimetype='application/json')
-                
-            except Exception as e:
-                print(f"❌ Gemini API Error: {e}")
-                import traceback
-                traceback.print_exc()
-                # Fall through to fallback
-        
-        # 4. FALLBACK (if Gemini fails or not configured)
-        print("⚠️  Using fallback dashboard data")
+        # 3. FALLBACK (served if Gemini is not configured, fails or misses its deadline)
         fallback_data = {
             "summary": {
                 "summary": f"Your team has completed {completed} out of {total_tasks} tasks ({completion_rate}%). There are {blocked} blocked tasks and {overdue} overdue items requiring immediate attention. Focus on clearing blockers to improve velocity.",
@@ -1019,6 +706,45 @@ Generate the JSON now:"""
             }
         }
         
+        # 4. CALL GEMINI 2.0 WITH JSON MODE
+        def generate_dashboard():
+            print("🤖 Generating AI Dashboard with Gemini 2.0...")
+            
+            # Configure for JSON output
+            generation_config = {
+                "response_mime_type": "application/json",
+                "temperature": 0.7
+            }
+            
+            text = llm.generate(system_prompt, timeout=llm.LLM_DASHBOARD_TIMEOUT_SECONDS,
+                                generation_config=generation_config)
+            
+            # Parse and validate JSON (invalid output is never cached)
+            dashboard_data = json.loads(text)
+            missing = set(fallback_data) - set(dashboard_data)
+            if missing:
+                raise ValueError(f"missing sections: {', '.join(sorted(missing))}")
+            print("✅ AI Dashboard generated successfully")
+            return dashboard_data
+        
+        if llm.available():
+            try:
+                # Only regenerated when the stats move (or the cached dashboard expires)
+                dashboard_data, cache_state = generation_cache.get('dashboard', None, real_stats, generate_dashboard)
+                
+                response = Response(json.dumps(dashboard_data), mimetype='application/json')
+                response.headers['X-Generation-Cache'] = cache_state
+                return response
+                
+            except llm.LLMError as e:
+                print(f"⚠️  Gemini skipped: {e}")
+            except Exception as e:
+                print(f"❌ Gemini API Error: {e}")
+                import traceback
+                traceback.print_exc()
+                # Fall through to fallback
+        
+        print("⚠️  Using fallback dashboard data")
         return jsonify(fallback_data)
         
     except Exception as e:
@@ -1029,86 +755,63 @@ Generate the JSON now:"""
 
 # ==================== QUERIES/CHAT ENDPOINTS ====================
 
-@app.route('/api/chat', methods=['POST'])
-@require_auth
-def handle_chat():
-    """Handle conversational queries using Gemini 1.5 Flash with grounded data."""
+# Most recent tasks; the context builder picks the ones relevant to the question
+CHAT_TASK_COLUMNS = 'task_id, task_name, status, priority, due_date, assigned_to, project, tags, created_date, completed_date'
+CHAT_TASK_LIMIT = 300
+# All users for team context
+CHAT_USER_COLUMNS = 'user_id, name, team, role, email'
+
+def load_chat_data(users=None):
+    """Task records and users the chat answers from (`users` already read are reused)"""
     supabase = get_supabase()
-    data = request.get_json()
-    user_query = data.get('query', '')
     
-    if not user_query:
-        return jsonify({
-            'response': "Please ask a question.",
-            'timestamp': datetime.now().strftime('%I:%M:%S %p')
-        })
+    queries = {'tasks': lambda: supabase.table('tasks').select(CHAT_TASK_COLUMNS)
+                   .order('created_date', desc=True).limit(CHAT_TASK_LIMIT).execute().data}
+    if users is None:
+        queries['users'] = lambda: read_all('users', CHAT_USER_COLUMNS)
+    results = gather(**queries)
     
-    # 1. COMPREHENSIVE DATA SNAPSHOT (Gemini 2.0 can handle large context)
-    try:
-        # Get ALL tasks (no limit - Gemini 2.0 has 1M token context)
-        tasks_resp = supabase.table('tasks').select(
-            'task_id, task_name, status, priority, due_date, assigned_to, project, tags, created_date, completed_date'
-        ).order('created_date', desc=True).limit(300).execute()
-        
-        # Get all users for team context
-        users_resp = supabase.table('users').select('user_id, name, team, role, email').execute()
-        
-        # Calculate comprehensive stats
-        tasks = tasks_resp.data
-        total_tasks = len(tasks)
-        completed = sum(1 for t in tasks if t['status'] == 'Completed')
-        in_progress = sum(1 for t in tasks if t['status'] == 'In Progress')
-        open_tasks = sum(1 for t in tasks if t['status'] == 'Open')
-        blocked = sum(1 for t in tasks if t['status'] == 'Blocked')
-        
-        # Group by project
-        projects = {}
-        for task in tasks:
-            proj = task.get('project', 'Unknown')
-            if proj not in projects:
-                projects[proj] = {'total': 0, 'completed': 0, 'in_progress': 0, 'open': 0, 'blocked': 0}
-            projects[proj]['total'] += 1
-            projects[proj][task['status'].lower().replace(' ', '_')] += 1
-        
-        # Group by assignee
-        assignees = {}
-        for task in tasks:
-            assignee_id = task.get('assigned_to')
-            if assignee_id:
-                if assignee_id not in assignees:
-                    assignees[assignee_id] = {'total': 0, 'completed': 0, 'in_progress': 0, 'open': 0, 'blocked': 0}
-                assignees[assignee_id]['total'] += 1
-                assignees[assignee_id][task['status'].lower().replace(' ', '_')] += 1
-        
-        # Create a comprehensive context object
-        context_data = {
-            "summary_stats": {
-                "total_tasks": total_tasks,
-                "completed": completed,
-                "in_progress": in_progress,
-                "open": open_tasks,
-                "blocked": blocked
-            },
-            "all_tasks": tasks,  # Send ALL tasks (Gemini 2.0 can handle it)
-            "team_members": users_resp.data,
-            "projects_breakdown": projects,
-            "assignees_breakdown": assignees
-        }
-        
-        import json
-        data_context_str = json.dumps(context_data, default=str, indent=2)
-        
-    except Exception as e:
-        print(f"Error fetching context for AI: {e}")
-        return jsonify({
-            'response': "I'm having trouble accessing the live data right now. Please try again.",
-            'timestamp': datetime.now().strftime('%I:%M:%S %p')
-        }), 500
+    return normalize_tasks(results['tasks']), results.get('users', users)
+
+def task_names(task_ids):
+    """{task_id: task_name} for a few tasks (snapshot records carry no names)"""
+    rows = get_supabase().table('tasks').select('task_id, task_name').in_('task_id', list(task_ids)).execute().data
+    return {row['task_id']: row['task_name'] for row in rows}
+
+def local_chat_answer(user_query):
+    """(chat_intents' exact answer over every task, users read for it), answer None for Gemini
+
+    Runs before load_chat_data(), so aggregate questions never load the chat context.
+    """
+    if not chat_intents.is_candidate(user_query):
+        return None, None
+    users = read_all('users', CHAT_USER_COLUMNS)
+    if SNAPSHOT_ENABLED:
+        records = get_task_snapshot().records()
+    else:
+        records = normalize_tasks(read_all('tasks', CHAT_TASK_COLUMNS))
+    return chat_intents.answer(user_query, records, users, task_names=task_names), users
+
+def build_chat_prompt(user_query, records, users):
+    """Grounded Gemini prompt for a chat question, a stats-only answer to fall back on, and the context size report"""
+    # Calculate comprehensive stats
+    total_tasks = len(records)
+    completed = sum(1 for t in records if t.status == 'Completed')
+    in_progress = sum(1 for t in records if t.status == 'In Progress')
+    open_tasks = sum(1 for t in records if t.status == 'Open')
+    blocked = sum(1 for t in records if t.status == 'Blocked')
+    
+    # Compact tabular context: aggregates plus the most relevant tasks within the token budget
+    data_context_str, context_report = build_context(user_query, records, users)
+    print(f"💬 Chat context: {context_report['chars']:,} chars, ~{context_report['estimated_tokens']:,} tokens "
+          f"({context_report['tasks_included']}/{context_report['tasks_total']} tasks)")
     
     # 2. GEMINI 2.0 PROMPT ENGINEERING (Enhanced for better understanding)
     system_prompt = f"""You are PulseVo AI, an advanced analytics assistant for a software development team.
 
-CONTEXT: You have access to the COMPLETE database of tasks, team members, and project information below.
+CONTEXT: You have access to live task, team member and project data below. Rows are pipe-separated
+with the column names in each section header; users (U1, ...) and projects (P1, ...) are referenced
+by code, statuses and priorities use the one-letter codes listed under CODES.
 
 LIVE DATABASE DATA:
 {data_context_str}
@@ -1117,11 +820,11 @@ YOUR TASK: Analyze the data above and answer the user's question with precision
 
 INSTRUCTIONS:
 1. ANALYZE the data thoroughly to find the exact answer
-2. For "how many" questions, count from the actual data and give exact numbers
-3. For project questions, look at the "projects_breakdown" section
-4. For team questions, look at "team_members" and "assignees_breakdown"
-5. For status questions, check the "all_tasks" array and filter by status
-6. Be specific - mention task names, assignees, or projects when relevant
+2. For "how many" questions, use TOTALS and the COUNTS columns and give exact numbers
+3. For project questions, look at the PROJECTS section
+4. For team questions, look at the USERS section (team and per-person counts)
+5. For questions about specific tasks, check the TASKS rows (the most relevant ones are listed)
+6. Be specific - mention task names, assignees (by name), or projects when relevant
 7. If you need to count or filter, do it accurately from the data
 8. Keep responses concise (2-3 sentences) but informative
 9. Use a professional, helpful tone
@@ -1132,33 +835,155 @@ User Question: {user_query}
 
 Your Answer (be specific and accurate):"""
     
+    stats_reply = f"Based on the data, there are {total_tasks} total tasks: {completed} completed, {in_progress} in progress, {open_tasks} open, and {blocked} blocked."
+    return system_prompt, stats_reply, context_report
+
+@app.route('/api/chat', methods=['POST'])
+@require_auth
+def handle_chat():
+    """Handle conversational queries using Gemini 1.5 Flash with grounded data."""
+    data = request.get_json()
+    user_query = data.get('query', '')
+    
+    if not user_query:
+        return jsonify({
+            'response': "Please ask a question.",
+            'timestamp': datetime.now().strftime('%I:%M:%S %p')
+        })
+    
+    try:
+        # Aggregate lookups (counts, top-N, filtered lists) are answered locally, without the chat context
+        local_reply, users = local_chat_answer(user_query)
+        if local_reply is None:
+            records, users = load_chat_data(users)
+    except Exception as e:
+        print(f"Error fetching context for AI: {e}")
+        return jsonify({
+            'response': "I'm having trouble accessing the live data right now. Please try again.",
+            'timestamp': datetime.now().strftime('%I:%M:%S %p')
+        }), 500
+    
+    if local_reply is not None:
+        return jsonify({
+            'response': local_reply,
+            'timestamp': datetime.now().strftime('%I:%M:%S %p'),
+            'answered_by': 'local'
+        })
+    
+    system_prompt, stats_reply, context_report = build_chat_prompt(user_query, records, users)
+    
     # 3. CALL GEMINI
-    if gemini_model:
+    answered_by = 'fallback'
+    if llm.available():
         try:
             print(f"🤖 Calling Gemini with query: {user_query}")
-            response = gemini_model.generate_content(system_prompt)
-            ai_reply = response.text.strip()
+            ai_reply = llm.generate(system_prompt).strip()
+            answered_by = 'gemini'
             print(f"✅ Gemini response: {ai_reply[:100]}...")
+        except llm.LLMError as e:
+            print(f"⚠️  Gemini skipped: {e}")
+            ai_reply = f"{stats_reply} (AI response unavailable: {str(e)})"
         except Exception as e:
             print(f"❌ Gemini API Error: {e}")
             import traceback
             traceback.print_exc()
             # Fallback to simple response
-            ai_reply = f"Based on the data, there are {total_tasks} total tasks: {completed} completed, {in_progress} in progress, {open_tasks} open, and {blocked} blocked. (Gemini error: {str(e)})"
+            ai_reply = f"{stats_reply} (Gemini error: {str(e)})"
     else:
         print("⚠️  Gemini model not initialized")
         # Fallback if Gemini not configured
-        ai_reply = f"Based on the data, there are {total_tasks} total tasks: {completed} completed, {in_progress} in progress, {open_tasks} open, and {blocked} blocked. (Note: Gemini AI not configured - add GEMINI_API_KEY for smarter responses)"
+        ai_reply = f"{stats_reply} (Note: Gemini AI not configured - add GEMINI_API_KEY for smarter responses)"
     
     return jsonify({
         'response': ai_reply,
-        'timestamp': datetime.now().strftime('%I:%M:%S %p')
+        'timestamp': datetime.now().strftime('%I:%M:%S %p'),
+        'answered_by': answered_by,
+        'context': context_report
+    })
+
+@app.route('/api/chat/stream', methods=['POST'])
+@require_auth
+def stream_chat():
+    """Chat answer as server-sent events: `token` events as Gemini generates, then `done` with timings"""
+    started = time.perf_counter()
+    data = request.get_json() or {}
+    user_query = data.get('query', '')
+    
+    if not user_query:
+        return jsonify({'error': 'Please ask a question.'}), 400
+    
+    try:
+        # Aggregate lookups are answered locally, without the chat context
+        local_reply, users = local_chat_answer(user_query)
+        if local_reply is None:
+            records, users = load_chat_data(users)
+    except Exception as e:
+        print(f"Error fetching context for AI: {e}")
+        return jsonify({'error': "I'm having trouble accessing the live data right now. Please try again."}), 500
+    
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
+    
+    def done_event(first_token_ms, answered_by, context_report=None):
+        total_ms = elapsed_ms()
+        print(f"💬 Chat streamed ({answered_by}): first token {first_token_ms} ms, total {total_ms} ms")
+        if first_token_ms is not None:
+            metrics.first_token_seconds.observe(first_token_ms / 1000, answered_by)
+        return sse_event('done', json.dumps({
+            'timestamp': datetime.now().strftime('%I:%M:%S %p'),
+            'first_token_ms': first_token_ms,
+            'total_ms': total_ms,
+            'fallback': answered_by == 'fallback',
+            'answered_by': answered_by,
+            'context': context_report
+        }))
+    
+    # Local answers go out in one event
+    if local_reply is not None:
+        def local_events():
+            first_token_ms = elapsed_ms()
+            yield sse_event('token', json.dumps({'text': local_reply}))
+            yield done_event(first_token_ms, 'local')
+        return Response(local_events(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+    
+    system_prompt, stats_reply, context_report = build_chat_prompt(user_query, records, users)
+    
+    def events():
+        first_token_ms = None
+        answered_by = 'gemini'
+        try:
+            for text in llm.stream(system_prompt):
+                if first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                yield sse_event('token', json.dumps({'text': text}))
+        except Exception as e:
+            print(f"⚠️  Gemini stream ended early: {e}")
+            answered_by = 'fallback'
+            if isinstance(e, llm.LLMUnavailable):
+                note = "(Note: Gemini AI not configured - add GEMINI_API_KEY for smarter responses)"
+            else:
+                note = f"(AI response unavailable: {str(e)})"
+            # Keep whatever was already streamed; otherwise answer from the stats
+            text = f"\n\n{note}" if first_token_ms is not None else f"{stats_reply} {note}"
+            if first_token_ms is None:
+                first_token_ms = elapsed_ms()
+            yield sse_event('token', json.dumps({'text': text}))
+        
+        yield done_event(first_token_ms, answered_by, context_report)
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
     })
 
 # ==================== SETTINGS ENDPOINTS ====================
 
 @app.route('/api/settings', methods=['GET'])
 @require_auth
+@conditional_get(tables=())
 def get_settings():
     """Get current settings"""
     return jsonify({
@@ -1191,8 +1016,17 @@ def health_check():
         'database': 'supabase'
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request metrics in Prometheus text format"""
+    if not metrics.authorized(request.headers.get('Authorization')):
+        return jsonify({'error': 'Invalid metrics token'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
+    # Development server; for production use `gunicorn -c gunicorn.conf.py wsgi:application` (see wsgi.py)
+    port = int(os.getenv('PORT', '5001'))
     print("✅ Supabase database initialized!")
-    print("🚀 Server running on http://localhost:5001")
+    print(f"🚀 Server running on http://localhost:{port}")
     
-    app.run(debug=True, port=5001, host='0.0.0.0')
+    app.run(debug=os.getenv('FLASK_DEBUG', 'true').lower() == 'true', port=port, host='0.0.0.0')
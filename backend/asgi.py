@@ -0,0 +1,344 @@
+"""
+Async serving path for the PULSEVO backend.
+
+Under the WSGI servers (app.py, wsgi.py) every in-flight request holds a
+thread, including the ones that only wait: chat answers waiting on
+Gemini and open /api/stream/overview connections. This ASGI app serves
+those routes as coroutines on one event loop instead - the Supabase reads
+go through the async client (database.init_async_db), the model calls
+through llm.agenerate()/astream() and the dashboard streams through
+StreamHub.aevents() - so one process can hold hundreds of them at once.
+Every other route is handed to the Flask app unchanged, on a pool of
+ASGI_WSGI_THREADS threads (CPU-bound analytics gain nothing from
+coroutines).
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5001
+
+For several processes, run it under gunicorn with the same preloading
+and fork handling as wsgi.py:
+
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:application
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+import jwt
+from a2wsgi import WSGIMiddleware
+
+import app as pulsevo
+import database
+import llm
+import metrics
+from auth import AUTH_CACHE_ENABLED, authenticate, token_cache
+from bulk_reads import aread_all
+from records import normalize_tasks
+from snapshot import SNAPSHOT_ENABLED, task_snapshot
+from streams import sse_event
+from trends import GRANULARITIES
+
+# Threads running the Flask routes that are not served here
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '16'))
+
+EVENT_STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),  # don't let nginx buffer the stream
+]
+
+
+class Request:
+    """What the async handlers need from one HTTP request"""
+    __slots__ = ('method', 'path', 'args', 'headers', 'body')
+
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {}
+        for name, value in parse_qsl(scope['query_string'].decode('latin-1')):
+            self.args.setdefault(name, value)  # first value wins, like request.args.get()
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        self.body = body
+
+    def get_json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+    ]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_events(receive, send, events):
+    """Stream an async generator of SSE text until it ends or the client goes away"""
+    await send({'type': 'http.response.start', 'status': 200, 'headers': EVENT_STREAM_HEADERS})
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        async for chunk in events:
+            if disconnected.done():
+                return
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+        await events.aclose()
+
+
+async def authorize(request):
+    """(user_id, None) for a valid bearer token, else (None, (error payload, status)) like require_auth"""
+    auth_header = request.headers.get('authorization')
+    if not auth_header:
+        return None, ({'error': 'No authorization header'}, 401)
+
+    token = auth_header.split(' ')[1] if ' ' in auth_header else auth_header
+    try:
+        payload = token_cache.get(token) if AUTH_CACHE_ENABLED else None
+        if payload is None:
+            # Signature checks (and a key set fetch) stay off the event loop
+            payload = await asyncio.to_thread(authenticate, token)
+    except jwt.ExpiredSignatureError:
+        return None, ({'error': 'Token expired'}, 401)
+    except jwt.InvalidTokenError:
+        return None, ({'error': 'Invalid token'}, 401)
+    except Exception as e:
+        return None, ({'error': f'Authentication failed: {str(e)}'}, 401)
+    return payload.get('sub'), None
+
+
+async def load_chat_data(users=None):
+    """app.load_chat_data() through the async Supabase client"""
+    if database.DATA_SOURCE == 'local':
+        return await asyncio.to_thread(pulsevo.load_chat_data, users)
+
+    query = database.get_async_supabase().table('tasks').select(pulsevo.CHAT_TASK_COLUMNS) \
+        .order('created_date', desc=True).limit(pulsevo.CHAT_TASK_LIMIT)
+    if users is not None:
+        return normalize_tasks((await query.execute()).data), users
+    tasks, users = await asyncio.gather(query.execute(), aread_all('users', pulsevo.CHAT_USER_COLUMNS))
+    return normalize_tasks(tasks.data), users
+
+
+async def local_chat_answer(user_query):
+    """app.local_chat_answer() off the event loop (it works over every task)"""
+    return await asyncio.to_thread(pulsevo.local_chat_answer, user_query)
+
+
+def _timestamp():
+    return datetime.now().strftime('%I:%M:%S %p')
+
+
+# ==================== ASYNC ENDPOINTS ====================
+
+async def handle_chat(request, receive, send):
+    """POST /api/chat (see app.handle_chat)"""
+    user_query = (request.get_json() or {}).get('query', '')
+
+    if not user_query:
+        return await send_json(send, {'response': "Please ask a question.", 'timestamp': _timestamp()})
+
+    try:
+        local_reply, users = await local_chat_answer(user_query)
+        if local_reply is None:
+            records, users = await load_chat_data(users)
+    except Exception as e:
+        print(f"Error fetching context for AI: {e}")
+        return await send_json(send, {
+            'response': "I'm having trouble accessing the live data right now. Please try again.",
+            'timestamp': _timestamp()
+        }, 500)
+
+    if local_reply is not None:
+        return await send_json(send, {'response': local_reply, 'timestamp': _timestamp(), 'answered_by': 'local'})
+
+    system_prompt, stats_reply, context_report = pulsevo.build_chat_prompt(user_query, records, users)
+
+    answered_by = 'fallback'
+    if llm.available():
+        try:
+            ai_reply = (await llm.agenerate(system_prompt)).strip()
+            answered_by = 'gemini'
+        except llm.LLMError as e:
+            print(f"⚠️  Gemini skipped: {e}")
+            ai_reply = f"{stats_reply} (AI response unavailable: {str(e)})"
+        except Exception as e:
+            print(f"❌ Gemini API Error: {e}")
+            ai_reply = f"{stats_reply} (Gemini error: {str(e)})"
+    else:
+        ai_reply = f"{stats_reply} (Note: Gemini AI not configured - add GEMINI_API_KEY for smarter responses)"
+
+    await send_json(send, {
+        'response': ai_reply,
+        'timestamp': _timestamp(),
+        'answered_by': answered_by,
+        'context': context_report
+    })
+
+
+async def stream_chat(request, receive, send):
+    """POST /api/chat/stream (see app.stream_chat)"""
+    started = time.perf_counter()
+    user_query = (request.get_json() or {}).get('query', '')
+
+    if not user_query:
+        return await send_json(send, {'error': 'Please ask a question.'}, 400)
+
+    try:
+        local_reply, users = await local_chat_answer(user_query)
+        if local_reply is None:
+            records, users = await load_chat_data(users)
+    except Exception as e:
+        print(f"Error fetching context for AI: {e}")
+        return await send_json(send, {'error': "I'm having trouble accessing the live data right now. Please try again."}, 500)
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    def done_event(first_token_ms, answered_by, context_report=None):
+        total_ms = elapsed_ms()
+        print(f"💬 Chat streamed ({answered_by}): first token {first_token_ms} ms, total {total_ms} ms")
+        if first_token_ms is not None:
+            metrics.first_token_seconds.observe(first_token_ms / 1000, answered_by)
+        return sse_event('done', json.dumps({
+            'timestamp': _timestamp(),
+            'first_token_ms': first_token_ms,
+            'total_ms': total_ms,
+            'fallback': answered_by == 'fallback',
+            'answered_by': answered_by,
+            'context': context_report
+        }))
+
+    if local_reply is not None:
+        async def local_events():
+            first_token_ms = elapsed_ms()
+            yield sse_event('token', json.dumps({'text': local_reply}))
+            yield done_event(first_token_ms, 'local')
+        return await send_events(receive, send, local_events())
+
+    system_prompt, stats_reply, context_report = pulsevo.build_chat_prompt(user_query, records, users)
+
+    async def events():
+        first_token_ms = None
+        answered_by = 'gemini'
+        chunks = llm.astream(system_prompt)
+        try:
+            async for text in chunks:
+                if first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                yield sse_event('token', json.dumps({'text': text}))
+        except Exception as e:
+            print(f"⚠️  Gemini stream ended early: {e}")
+            answered_by = 'fallback'
+            if isinstance(e, llm.LLMUnavailable):
+                note = "(Note: Gemini AI not configured - add GEMINI_API_KEY for smarter responses)"
+            else:
+                note = f"(AI response unavailable: {str(e)})"
+            text = f"\n\n{note}" if first_token_ms is not None else f"{stats_reply} {note}"
+            if first_token_ms is None:
+                first_token_ms = elapsed_ms()
+            yield sse_event('token', json.dumps({'text': text}))
+        finally:
+            await chunks.aclose()
+
+        yield done_event(first_token_ms, answered_by, context_report)
+
+    await send_events(receive, send, events())
+
+
+async def stream_overview(request, receive, send):
+    """GET /api/stream/overview (see app.stream_overview)"""
+    start_date = request.args.get('start_date') or None
+    end_date = request.args.get('end_date') or None
+    team_filter = request.args.get('team') or None
+    granularity = request.args.get('granularity') or None
+
+    if granularity and granularity not in GRANULARITIES:
+        return await send_json(send, {'error': f"Unknown granularity '{granularity}' (expected one of {', '.join(GRANULARITIES)})"}, 400)
+    if team_filter == 'all':
+        team_filter = None
+
+    key = (start_date, end_date, team_filter, granularity)
+    await send_events(receive, send, pulsevo.overview_hub.aevents(key))
+
+
+ROUTES = {
+    ('POST', '/api/chat'): handle_chat,
+    ('POST', '/api/chat/stream'): stream_chat,
+    ('GET', '/api/stream/overview'): stream_overview,
+}
+
+
+# ==================== ASGI APPLICATION ====================
+
+flask_app = WSGIMiddleware(pulsevo.app, workers=ASGI_WSGI_THREADS)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await database.init_async_db()
+                if SNAPSHOT_ENABLED:
+                    await asyncio.to_thread(task_snapshot.get)
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+
+    handler = ROUTES.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+    if handler is None:
+        # Everything else (CORS preflights included) is served by Flask as before
+        return await flask_app(scope, receive, send)
+
+    started = time.perf_counter()
+    status = []
+
+    async def send_with_headers(message):
+        if message['type'] == 'http.response.start':
+            # Same policy as CORS(app) in app.py: any origin
+            message['headers'] = list(message['headers']) + [(b'access-control-allow-origin', b'*')]
+            status.append(str(message['status']))
+        await send(message)
+
+    try:
+        request = Request(scope, await _read_body(receive))
+        _, error = await authorize(request)
+        if error is not None:
+            return await send_json(send_with_headers, *error)
+        await handler(request, receive, send_with_headers)
+    finally:
+        # Once the handler returns, streamed bodies included
+        if status:
+            metrics.request_seconds.observe(time.perf_counter() - started, scope['path'], scope['method'], status[0])
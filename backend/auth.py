@@ -1,13 +1,115 @@
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 import jwt
 from functools import wraps
 from flask import request, jsonify
 from dotenv import load_dotenv
 
+from metrics import phase
+
 load_dotenv()
 
 SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
 
+# Asymmetric (RS256/ES256) tokens are checked against the project's published key set
+SUPABASE_JWKS_URL = os.getenv('SUPABASE_JWKS_URL') or (
+    f"{os.getenv('SUPABASE_URL', '').rstrip('/')}/auth/v1/.well-known/jwks.json" if os.getenv('SUPABASE_URL') else None
+)
+JWKS_CACHE_SECONDS = 600
+
+AUTH_CACHE_ENABLED = os.getenv('AUTH_CACHE_ENABLED', 'true').lower() == 'true'
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '1024'))
+
+ASYMMETRIC_ALGORITHMS = ('RS256', 'ES256')
+
+_jwks_client = None
+_jwks_lock = threading.Lock()
+
+
+def get_jwks_client():
+    """Shared key set client; keys are cached locally and refetched for unknown key ids"""
+    global _jwks_client
+    if _jwks_client is None:
+        if not SUPABASE_JWKS_URL:
+            raise jwt.InvalidTokenError('No JWKS URL configured for asymmetric tokens')
+        with _jwks_lock:
+            if _jwks_client is None:
+                _jwks_client = jwt.PyJWKClient(SUPABASE_JWKS_URL, cache_keys=True, lifespan=JWKS_CACHE_SECONDS)
+    return _jwks_client
+
+
+def verify_token(token):
+    """Fully verify a Supabase JWT (signature, expiry, audience) and return its payload"""
+    algorithm = jwt.get_unverified_header(token).get('alg')
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        key = get_jwks_client().get_signing_key_from_jwt(token).key
+    elif algorithm == 'HS256':
+        key = SUPABASE_JWT_SECRET
+    else:
+        raise jwt.InvalidAlgorithmError(f'Unsupported algorithm: {algorithm}')
+    return jwt.decode(token, key, algorithms=[algorithm], audience='authenticated')
+
+
+class TokenCache:
+    """Bounded LRU of verified token payloads, keyed by token hash and valid until `exp`"""
+
+    def __init__(self, max_entries=AUTH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        # Never keep raw bearer tokens in memory longer than the request
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, payload = entry
+        with self._lock:
+            if expires <= time.time():
+                self._entries.pop(key, None)
+                return None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return payload
+
+    def put(self, token, payload):
+        expires = payload.get('exp')
+        if not isinstance(expires, (int, float)):
+            return  # no expiry: verify every time
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def authenticate(token):
+    """Payload for a bearer token, from the cache when it was verified before"""
+    if AUTH_CACHE_ENABLED:
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
+    payload = verify_token(token)
+    if AUTH_CACHE_ENABLED:
+        token_cache.put(token, payload)
+    return payload
+
 def require_auth(f):
     """Decorator to require Supabase JWT authentication"""
     @wraps(f)
@@ -21,13 +123,9 @@ def require_auth(f):
             # Extract token from "Bearer <token>"
             token = auth_header.split(' ')[1] if ' ' in auth_header else auth_header
             
-            # Verify JWT token
-            payload = jwt.decode(
-                token,
-                SUPABASE_JWT_SECRET,
-                algorithms=['HS256'],
-                audience='authenticated'
-            )
+            # Verify JWT token (HS256 secret, or RS256/ES256 via the key set)
+            with phase('auth'):
+                payload = authenticate(token)
             
             # Add user info to request context
             request.user_id = payload.get('sub')
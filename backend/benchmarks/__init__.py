@@ -0,0 +1,5 @@
+"""
+Offline microbenchmarks for the PULSEVO backend.
+
+Run from the backend directory, e.g. `python -m benchmarks.bench_records`.
+"""
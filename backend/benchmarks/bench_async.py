@@ -0,0 +1,185 @@
+"""
+Benchmark: a burst of slow chat requests plus dashboard refreshes, sync vs async serving.
+
+Both modes run as one process on the same synthetic data (see
+bench_serving.py) with the fake model (LLM_FAKE=true) answering after
+--llm-latency seconds, so every chat request is slow I/O:
+
+    sync    gunicorn -c gunicorn.conf.py wsgi:application, 1 worker x --threads
+    async   uvicorn asgi:application (chat and streams on the event loop)
+
+--chats clients each send one POST /api/chat at the same moment, while
+--dashboards clients keep refreshing the Overview endpoints for the
+length of the burst. The model call limits are raised for both modes, so
+what is measured is how many slow requests the server can hold, not the
+LLM pool. Reported per mode: chat requests answered by the model, their
+p50/p99/max latency, and dashboard requests per second and p99 during the
+burst. Results are saved as JSON (benchmarks/results/latest-async.json by
+default).
+
+    python -m benchmarks.bench_async [--tasks 20000] [--chats 200] [--dashboards 8] [--llm-latency 2]
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_serving import (BACKEND_DIR, RESULTS_DIR, SECRET, _free_port, _paths, _percentile, _seed,
+                                      _wait_until_up, save_results)
+
+# Open-ended, so chat_intents leaves it to the model
+CHAT_QUESTION = 'Why are Mobile App tasks getting blocked and what should we do about it?'
+
+
+def _chat(port, headers, results, barrier):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    body = json.dumps({'query': CHAT_QUESTION})
+    barrier.wait()
+    start = time.perf_counter()
+    try:
+        conn.request('POST', '/api/chat', body=body, headers=dict(headers, **{'Content-Type': 'application/json'}))
+        response = conn.getresponse()
+        payload = json.loads(response.read() or b'{}')
+        answered_by = payload.get('answered_by') if response.status == 200 else f"HTTP {response.status}"
+    except (OSError, http.client.HTTPException, ValueError) as e:
+        answered_by = type(e).__name__
+    results.append(((time.perf_counter() - start) * 1000, answered_by))
+    conn.close()
+
+
+def _dashboards(port, headers, latencies, stop, offset):
+    paths = _paths()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    i = offset
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.request('GET', paths[i % len(paths)], headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+        i += 1
+    conn.close()
+
+
+def run_mode(mode, args, store_path):
+    import jwt
+
+    port = _free_port()
+    env = dict(os.environ,
+               DATA_SOURCE='local',
+               LOCAL_STORE_PATH=store_path,
+               CHANGE_FEED='off',
+               RESPONSE_CACHE_ENABLED='false',
+               SUPABASE_JWT_SECRET=SECRET,
+               LLM_FAKE='true',
+               LLM_FAKE_LATENCY_SECONDS=str(args.llm_latency),
+               LLM_FAKE_TOKEN_SECONDS='0',
+               LLM_TIMEOUT_SECONDS=str(args.llm_latency * 60),
+               LLM_MAX_CONCURRENCY=str(args.chats),
+               LLM_MAX_QUEUED='0',
+               LLM_ASYNC_MAX_CONCURRENCY=str(args.chats),
+               PORT=str(port),
+               WEB_WORKERS='1',
+               WEB_THREADS=str(args.threads),
+               WEB_TIMEOUT_SECONDS='600',
+               ASGI_WSGI_THREADS=str(args.threads))
+    if mode == 'sync':
+        command = [shutil.which('gunicorn') or 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application']
+    else:
+        command = [shutil.which('uvicorn') or 'uvicorn', 'asgi:application', '--host', '127.0.0.1',
+                   '--port', str(port), '--no-access-log', '--backlog', str(args.chats * 2)]
+
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_until_up(port, process)
+        token = jwt.encode({'sub': 'USER-001', 'aud': 'authenticated', 'exp': int(time.time()) + 3600},
+                           SECRET, algorithm='HS256')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        chats = []
+        dashboard_latencies = []
+        stop = threading.Event()
+        barrier = threading.Barrier(args.chats)
+        dashboards = [threading.Thread(target=_dashboards, args=(port, headers, dashboard_latencies, stop, i))
+                      for i in range(args.dashboards)]
+        chat_threads = [threading.Thread(target=_chat, args=(port, headers, chats, barrier))
+                        for _ in range(args.chats)]
+        for thread in dashboards:
+            thread.start()
+        started = time.perf_counter()
+        for thread in chat_threads:
+            thread.start()
+        for thread in chat_threads:
+            thread.join()
+        burst = time.perf_counter() - started
+        stop.set()
+        for thread in dashboards:
+            thread.join()
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+
+    chat_ms = [ms for ms, _ in chats]
+    outcomes = {}
+    for _, answered_by in chats:
+        outcomes[answered_by] = outcomes.get(answered_by, 0) + 1
+    return {
+        'burst_seconds': round(burst, 1),
+        'chat_answered': outcomes.get('gemini', 0),
+        'chat_outcomes': outcomes,
+        'chat_p50_ms': round(_percentile(chat_ms, 0.5), 1),
+        'chat_p99_ms': round(_percentile(chat_ms, 0.99), 1),
+        'chat_max_ms': round(max(chat_ms), 1),
+        'dashboard_rps': round(len(dashboard_latencies) / burst, 1),
+        'dashboard_p99_ms': round(_percentile(dashboard_latencies, 0.99), 1) if dashboard_latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Slow chat requests plus dashboard refreshes, sync vs async')
+    parser.add_argument('--tasks', type=int, default=20_000)
+    parser.add_argument('--chats', type=int, default=200, help='chat requests sent at once')
+    parser.add_argument('--dashboards', type=int, default=8, help='clients refreshing dashboards meanwhile')
+    parser.add_argument('--llm-latency', type=float, default=2.0, help='seconds per fake model answer')
+    parser.add_argument('--threads', type=int, default=8, help='request threads (sync) / Flask threads (async)')
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest-async.json'))
+    args = parser.parse_args()
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'pulsevo.db')
+        _seed(store_path, args.tasks)
+
+        print(f"{args.tasks:,} tasks, {args.chats} chats at once ({args.llm_latency:g}s model latency), "
+              f"{args.dashboards} dashboard clients, {args.threads} threads, one process")
+        print(f"  {'mode':<8}{'burst s':>9}{'answered':>10}{'chat p50':>10}{'chat p99':>10}{'chat max':>10}"
+              f"{'dash req/s':>12}{'dash p99':>10}")
+        for mode in args.modes.split(','):
+            result = run_mode(mode, args, store_path)
+            results[mode] = result
+            print(f"  {mode:<8}{result['burst_seconds']:>9}{result['chat_answered']:>10}"
+                  f"{result['chat_p50_ms']:>10,.0f}{result['chat_p99_ms']:>10,.0f}{result['chat_max_ms']:>10,.0f}"
+                  f"{result['dashboard_rps']:>12,.1f}{result['dashboard_p99_ms'] or 0:>10,.0f}")
+            others = {k: v for k, v in result['chat_outcomes'].items() if k != 'gemini'}
+            if others:
+                print(f"  {'':<8}not answered by the model: {others}")
+
+    save_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: require_auth with and without the verified-token cache.
+
+A minimal Flask route behind require_auth is hit repeatedly with the same
+bearer token, as a dashboard poll burst would. HS256 tokens are signed with
+SUPABASE_JWT_SECRET; RS256/ES256 tokens with a local key pair, served by a
+stand-in for the JWKS client so no network is involved.
+
+    python -m benchmarks.bench_auth [--requests 5000]
+"""
+import argparse
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from flask import Flask, jsonify, request
+
+import auth
+
+SECRET = 'benchmark-secret-with-at-least-32-bytes'
+
+
+class LocalKeySet:
+    """Stands in for PyJWKClient with one in-memory public key per algorithm"""
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def get_signing_key_from_jwt(self, token):
+        return jwt.PyJWK.from_dict(self.keys[jwt.get_unverified_header(token)['kid']])
+
+
+def _tokens():
+    claims = {'sub': 'USER-001', 'email': 'user.1@company.com', 'aud': 'authenticated',
+              'exp': int(time.time()) + 3600}
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    keys = {
+        'rsa': jwt.algorithms.RSAAlgorithm.to_jwk(rsa_key.public_key(), as_dict=True),
+        'ec': jwt.algorithms.ECAlgorithm.to_jwk(ec_key.public_key(), as_dict=True),
+    }
+    tokens = {
+        'HS256': jwt.encode(claims, SECRET, algorithm='HS256'),
+        'RS256': jwt.encode(claims, rsa_key, algorithm='RS256', headers={'kid': 'rsa'}),
+        'ES256': jwt.encode(claims, ec_key, algorithm='ES256', headers={'kid': 'ec'}),
+    }
+    return tokens, LocalKeySet(keys)
+
+
+def _app():
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    @auth.require_auth
+    def ping():
+        return jsonify({'user': request.user_id})
+
+    return app
+
+
+def _run(client, token, requests):
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/ping', headers=headers).status_code == 200
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/ping', headers=headers)
+    return requests / (time.perf_counter() - start)
+
+
+def _verify_us(token, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        auth.authenticate(token)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='require_auth with and without the token cache')
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    tokens, key_set = _tokens()
+    auth.SUPABASE_JWT_SECRET = SECRET
+    auth._jwks_client = key_set
+    client = _app().test_client()
+
+    print(f"{args.requests:,} requests with one bearer token")
+    print(f"  {'alg':<8}{'cache':<8}{'req/s':>10}{'auth us':>10}")
+    for algorithm, token in tokens.items():
+        for enabled in (False, True):
+            auth.AUTH_CACHE_ENABLED = enabled
+            auth.token_cache.clear()
+            rate = _run(client, token, args.requests)
+            verify_us = _verify_us(token, args.requests)
+            print(f"  {algorithm:<8}{'on' if enabled else 'off':<8}{rate:>10,.0f}{verify_us:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmark: the analytics endpoints end to end, at 2k to 1M tasks.
+
+Each size runs in its own process: app.py is started on the embedded data
+source (DATA_SOURCE=local, see local_store.py), synthetic rows are loaded
+into it, and every case is requested through Flask's test client with a
+bearer token, the way the dashboard calls it. The response cache is off,
+so every request does the full work; the shared task snapshot stays on
+(as in production) and its cold load is reported as its own case.
+
+Reported per case: p50/p99 latency over the timed runs, and the peak
+Python memory allocated while serving one request (tracemalloc, measured
+in a separate untimed run). Per size: the process's peak RSS.
+
+Results are saved as JSON (benchmarks/results/latest.json by default);
+pass an earlier file as --baseline to print the change against it and flag
+regressions.
+
+    python -m benchmarks.bench_endpoints [--sizes 2000,50000] [--baseline benchmarks/results/baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+SIZES = (2_000, 50_000, 500_000, 1_000_000)
+SECRET = 'benchmark-secret-with-at-least-32-bytes'
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# A case is flagged when its p50 grew by more than this fraction and this many ms
+# (single-run cases are too noisy to flag)
+REGRESSION_THRESHOLD = 0.25
+REGRESSION_MIN_MS = 1.0
+
+CHAT_QUESTION = 'Which blocked high priority tasks in Mobile App need attention first?'
+
+
+def _iso(moment):
+    return moment.isoformat().replace('+00:00', 'Z')
+
+
+def _cases():
+    now = datetime.now(timezone.utc)
+    last_30 = f"start_date={_iso(now - timedelta(days=30))}&end_date={_iso(now)}"
+    last_7 = f"start_date={_iso(now - timedelta(days=7))}&end_date={_iso(now)}"
+    return (
+        ('overview (all)', '/api/overview'),
+        ('overview (30 days)', f'/api/overview?{last_30}'),
+        ('trends (all)', '/api/trends'),
+        ('trends (7 days)', f'/api/trends?{last_7}'),
+        ('team performance', '/api/team-performance'),
+        ('users', '/api/users'),
+        ('due compliance', '/api/ai/due-compliance'),
+        ('chat context', None),
+    )
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _measure(run, iterations, max_seconds):
+    """Timed runs (at least 3, then up to `iterations` within `max_seconds`), plus one traced run"""
+    run()  # warm-up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < iterations and (len(samples) < 3 or time.perf_counter() - started < max_seconds):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'runs': len(samples),
+        'p50_ms': round(_percentile(samples, 0.5), 2),
+        'p99_ms': round(_percentile(samples, 0.99), 2),
+        'peak_mb': round(peak / 1e6, 1),
+    }
+
+
+def run_size(size, iterations, max_seconds):
+    """Benchmark every case at one size (in this process)"""
+    os.environ.update({
+        'DATA_SOURCE': 'local',
+        'LOCAL_STORE_PATH': ':memory:',
+        'SUPABASE_JWT_SECRET': SECRET,
+        'GEMINI_API_KEY': '',
+        'CHANGE_FEED': 'off',
+        'RESPONSE_CACHE_ENABLED': 'false',
+    })
+    import jwt
+
+    import app
+    import database
+    from benchmarks.synthetic import generate_users, iter_tasks
+    from snapshot import get_task_snapshot
+
+    users = generate_users()
+    started = time.perf_counter()
+    database.local_store.load(tasks=iter_tasks(size, users), users=users)
+    load_seconds = time.perf_counter() - started
+
+    token = jwt.encode({'sub': 'USER-001', 'aud': 'authenticated', 'exp': int(time.time()) + 3600},
+                       SECRET, algorithm='HS256')
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.app.test_client()
+
+    results = {}
+    started = time.perf_counter()
+    get_task_snapshot()
+    results['snapshot load (cold)'] = {'runs': 1, 'p50_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+    for name, url in _cases():
+        if url is None:
+            def run():
+                with app.app.test_request_context():
+                    records, chat_users = app.load_chat_data()
+                    app.build_chat_prompt(CHAT_QUESTION, records, chat_users)
+        else:
+            def run(url=url):
+                response = client.get(url, headers=headers)
+                assert response.status_code == 200, f"{url}: {response.status_code}"
+        results[name] = _measure(run, iterations, max_seconds)
+
+    return {
+        'tasks': size,
+        'load_seconds': round(load_seconds, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'cases': results,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_size(result, baseline, threshold):
+    print(f"\n{result['tasks']:,} tasks (loaded in {result['load_seconds']}s, peak RSS {result['peak_rss_mb']:,} MB)")
+    print(f"  {'case':<24}{'runs':>6}{'p50 ms':>11}{'p99 ms':>11}{'peak MB':>10}{'vs baseline':>14}")
+    regressions = []
+    for name, case in result['cases'].items():
+        change = ''
+        before = (baseline or {}).get(name)
+        if before and before.get('p50_ms'):
+            delta = case['p50_ms'] / before['p50_ms'] - 1
+            change = f"{delta:+.0%}"
+            if delta > threshold and case['p50_ms'] - before['p50_ms'] > REGRESSION_MIN_MS and case['runs'] >= 3:
+                change += ' !'
+                regressions.append(name)
+        p99 = f"{case['p99_ms']:>11,.1f}" if 'p99_ms' in case else f"{'':>11}"
+        peak = f"{case['peak_mb']:>10,.1f}" if 'peak_mb' in case else f"{'':>10}"
+        print(f"  {name:<24}{case['runs']:>6}{case['p50_ms']:>11,.1f}{p99}{peak}{change:>14}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analytics endpoints against the in-memory data source')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in SIZES),
+                        help='comma-separated task counts')
+    parser.add_argument('--iterations', type=int, default=30, help='timed runs per case')
+    parser.add_argument('--max-seconds', type=float, default=20,
+                        help='stop timing a case after this long (3 runs minimum)')
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='p50 growth over the baseline reported as a regression')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.worker_output, 'w') as f:
+            json.dump(run_size(args.worker, args.iterations, args.max_seconds), f)
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {result['tasks']: result['cases'] for result in json.load(f)['results']}
+
+    results = []
+    regressions = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        # A fresh process per size keeps the snapshot, caches and peak RSS independent
+        with tempfile.NamedTemporaryFile(suffix='.json') as out:
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_endpoints', '--worker', str(size),
+                            '--worker-output', out.name, '--iterations', str(args.iterations),
+                            '--max-seconds', str(args.max_seconds)],
+                           check=True, stdout=subprocess.DEVNULL)
+            result = json.load(out)
+        results.append(result)
+        regressions += [f"{name} @ {size:,}" for name in _print_size(result, baseline.get(size), args.threshold)]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'revision': _git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': f"{platform.machine()}, {os.cpu_count()} CPU",
+            'results': results,
+        }, f, indent=2)
+        f.write('\n')
+    print(f"\nSaved to {args.output}")
+    if regressions:
+        print(f"⚠️  p50 more than {args.threshold:.0%} slower than the baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
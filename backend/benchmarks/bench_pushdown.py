@@ -0,0 +1,84 @@
+"""
+Benchmark: counting in Python vs pushing the GROUP BY down to the database.
+
+"fetch rows" mimics the old handlers: every task's status (and project or
+assignee) is serialized as a PostgREST JSON payload, decoded and counted in
+Python. "pushdown" calls the aggregation functions from supabase_schema.sql
+through the SQLite stand-in (local_store.py) and decodes only the grouped
+rows. Both paths are checked to return the same counts.
+
+    python -m benchmarks.bench_pushdown [--rows 100000]
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ['TASK_SNAPSHOT_ENABLED'] = 'false'
+
+import database  # noqa: E402
+import task_counts  # noqa: E402
+from aggregations import group_records  # noqa: E402
+from benchmarks.synthetic import generate_tasks, generate_users  # noqa: E402
+from local_store import LocalStore  # noqa: E402
+from records import normalize_tasks  # noqa: E402
+
+FUNCTIONS = {
+    'status': 'task_status_counts',
+    'project': 'task_project_status_counts',
+    'assigned_to': 'task_assignee_status_counts',
+}
+
+CASES = (
+    ('status', 'status', lambda: task_counts.by_status()),
+    ('project, status', 'project', lambda: task_counts.by_project()),
+    ('assigned_to, status', 'assigned_to', lambda: task_counts.by_assignee()),
+)
+
+
+def _fetch_and_count(rows, columns, key):
+    """Old path: ship one JSON row per task, then count client-side"""
+    fields = [c.strip() for c in columns.split(',')]
+    payload = json.dumps([{f: row[f] for f in fields} for row in rows])
+    decoded = json.loads(payload)
+    records = normalize_tasks(decoded)
+    groups = group_records(records, key)
+    return groups, len(decoded), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Python-side counting vs database pushdown')
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    users = generate_users()
+    rows = generate_tasks(args.rows, users)
+    store = LocalStore()
+    store.load(tasks=rows, users=users)
+    database.supabase = store
+
+    print(f"{args.rows:,} synthetic tasks")
+    print(f"  {'columns':<22}{'path':<14}{'rows':>10}{'bytes':>12}{'ms':>10}")
+    for columns, key, pushdown in CASES:
+        start = time.perf_counter()
+        groups, row_count, size = _fetch_and_count(rows, columns, key)
+        before_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        counts = pushdown()
+        after_ms = (time.perf_counter() - start) * 1000
+        grouped_rows = store.rpc(FUNCTIONS[key]).execute().data
+
+        if key == 'status':
+            expected = [sum(c[i] for c in groups.values()) for i in range(len(counts))]
+        else:
+            expected = {k: v for k, v in groups.items() if k is not None}
+        assert counts == expected, f"pushdown disagrees for {columns}"
+
+        print(f"  {columns:<22}{'fetch rows':<14}{row_count:>10,}{size:>12,}{before_ms:>10.1f}")
+        print(f"  {'':<22}{'pushdown':<14}{len(grouped_rows):>10,}"
+              f"{len(json.dumps(grouped_rows)):>12,}{after_ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
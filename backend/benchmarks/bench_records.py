@@ -0,0 +1,120 @@
+"""
+Microbenchmark: per-access ISO parsing vs parse-once TaskRecords.
+
+"before" reproduces the old handlers, which called
+`datetime.fromisoformat(x.replace('Z', '+00:00'))` every time a timestamp
+was compared: get_overview parsed completed_date up to four times per row
+and get_trends re-parsed three dates per row for every day bucket. "after"
+normalizes each row once into a TaskRecord and compares epoch ints.
+
+    python -m benchmarks.bench_records [--rows 100000]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.synthetic import generate_tasks
+from records import NO_DATE, normalize_tasks
+
+TREND_DAYS = 7
+
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def before(rows, now):
+    """Old refresh: overview + 7-day trends + due compliance, parsing on every access"""
+    today = now.date()
+    hour_ago = now - timedelta(hours=1)
+    completed_today = sum(1 for t in rows
+                          if t['status'] == 'Completed' and t.get('completed_date')
+                          and _parse(t['completed_date']).date() == today)
+    completed_hour = sum(1 for t in rows
+                         if t['status'] == 'Completed' and t.get('completed_date')
+                         and _parse(t['completed_date']) >= hour_ago)
+    trend = []
+    for i in range(TREND_DAYS - 1, -1, -1):
+        day = today - timedelta(days=i)
+        trend.append((
+            sum(1 for t in rows if t.get('created_date') and _parse(t['created_date']).date() == day),
+            sum(1 for t in rows if t['status'] == 'Completed' and t.get('completed_date')
+                and _parse(t['completed_date']).date() == day),
+            sum(1 for t in rows if t['status'] == 'In Progress' and t.get('start_date')
+                and _parse(t['start_date']).date() <= day),
+        ))
+    overdue = sum(1 for t in rows
+                  if t.get('due_date') and _parse(t['due_date']) < now and t['status'] != 'Completed')
+    return completed_today, completed_hour, trend, overdue
+
+
+def after(rows, now):
+    """Same metrics from records parsed once"""
+    records = normalize_tasks(rows)
+    now_ts = int(now.timestamp())
+    today = now_ts // 86400
+    hour_ago = now_ts - 3600
+    completed_today = sum(1 for t in records if t.status == 'Completed' and t.completed // 86400 == today)
+    completed_hour = sum(1 for t in records if t.status == 'Completed' and t.completed >= hour_ago)
+
+    first = today - TREND_DAYS + 1
+    created = [0] * TREND_DAYS
+    completed = [0] * TREND_DAYS
+    started = [0] * TREND_DAYS
+    for t in records:
+        day = t.created // 86400 - first
+        if 0 <= day < TREND_DAYS:
+            created[day] += 1
+        if t.status == 'Completed':
+            day = t.completed // 86400 - first
+            if 0 <= day < TREND_DAYS:
+                completed[day] += 1
+        elif t.status == 'In Progress' and t.started != NO_DATE:
+            day = t.started // 86400 - first
+            if day < TREND_DAYS:
+                started[max(day, 0)] += 1
+    in_progress = [sum(started[:i + 1]) for i in range(TREND_DAYS)]
+    trend = list(zip(created, completed, in_progress))
+
+    overdue = sum(1 for t in records if NO_DATE < t.due < now_ts and t.status != 'Completed')
+    return completed_today, completed_hour, trend, overdue
+
+
+def parse_fields(rows):
+    """Each timestamp field parsed exactly once, results discarded"""
+    for t in rows:
+        for field in ('created_date', 'due_date', 'start_date', 'completed_date', 'updated_at'):
+            if t.get(field):
+                _parse(t[field])
+
+
+def _rate(fn, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-access ISO parsing vs parse-once TaskRecords')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = generate_tasks(args.rows)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    assert before(rows, now) == after(rows, now), "before/after disagree"
+
+    print(f"{args.rows:,} synthetic tasks, best of {args.repeat}")
+    for label, fn in (('fromisoformat, each field once', parse_fields),
+                      ('normalize_tasks', normalize_tasks),
+                      ('dashboard refresh, before', lambda r: before(r, now)),
+                      ('dashboard refresh, after', lambda r: after(r, now))):
+        rate, seconds = _rate(fn, rows, args.repeat)
+        print(f"  {label:<32} {rate:>12,.0f} rows/s  ({seconds * 1000:8.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
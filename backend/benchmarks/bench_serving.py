@@ -0,0 +1,233 @@
+"""
+Benchmark: requests per second through a real server, dev server vs gunicorn.
+
+Synthetic rows are written to a temporary SQLite file (DATA_SOURCE=local,
+see local_store.py) that every server process opens, then each mode is
+started as its own process tree on a free port and driven over HTTP by
+--clients threads, each with its own keep-alive connection, cycling
+through the dashboard endpoints for --seconds:
+
+    dev        python app.py (Flask development server, debugger and reloader on)
+    gunicorn   gunicorn -c gunicorn.conf.py wsgi:application (--workers x --threads)
+
+The response cache is off so every request does the full work. Reported
+per mode: startup time until /api/health answers, requests per second,
+p50/p99 latency and errors. The chat endpoints are left out: their cost is
+the model call, which neither mode changes. Results are saved as JSON
+(benchmarks/results/latest-serving.json by default).
+
+    python -m benchmarks.bench_serving [--tasks 50000] [--clients 32] [--workers 4] [--threads 8]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+SECRET = 'benchmark-secret-with-at-least-32-bytes'
+STARTUP_TIMEOUT_SECONDS = 300
+
+
+def _iso(moment):
+    return moment.isoformat().replace('+00:00', 'Z')
+
+
+def _paths():
+    now = datetime.now(timezone.utc)
+    last_30 = f"start_date={_iso(now - timedelta(days=30))}&end_date={_iso(now)}"
+    return (
+        '/api/overview',
+        f'/api/overview?{last_30}',
+        '/api/distribution',
+        '/api/trends',
+        '/api/team-performance',
+        f'/api/dashboard/bundle?{last_30}',
+    )
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _seed(path, size):
+    from benchmarks.synthetic import generate_users, iter_tasks
+    from local_store import LocalStore
+
+    users = generate_users()
+    store = LocalStore(path)
+    store.load(tasks=iter_tasks(size, users), users=users)
+    store.conn.close()
+
+
+def _wait_until_up(port, process):
+    started = time.perf_counter()
+    while time.perf_counter() - started < STARTUP_TIMEOUT_SECONDS:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not come up')
+
+
+def _drive(port, headers, clients, seconds):
+    paths = _paths()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(offset):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        mine = []
+        failed = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            mine.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(_percentile(latencies, 0.5), 1) if latencies else None,
+        'p99_ms': round(_percentile(latencies, 0.99), 1) if latencies else None,
+        'errors': errors[0],
+    }
+
+
+def save_results(path, args, results):
+    """Write one run's settings and per-mode results (like bench_endpoints' results files)"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': f"{platform.machine()}, {os.cpu_count()} CPU",
+            'settings': {name: value for name, value in vars(args).items() if name != 'output'},
+            'results': results,
+        }, f, indent=2)
+        f.write('\n')
+    print(f"\nSaved to {path}")
+
+
+def run_mode(mode, args, store_path):
+    import jwt
+
+    port = _free_port()
+    env = dict(os.environ,
+               DATA_SOURCE='local',
+               LOCAL_STORE_PATH=store_path,
+               CHANGE_FEED='off',
+               RESPONSE_CACHE_ENABLED='false',
+               SUPABASE_JWT_SECRET=SECRET,
+               GEMINI_API_KEY='',
+               PORT=str(port),
+               WEB_WORKERS=str(args.workers),
+               WEB_THREADS=str(args.threads))
+    if mode == 'dev':
+        command = [sys.executable, 'app.py']
+    else:
+        command = [shutil.which('gunicorn') or 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application']
+
+    # Own session, so the reloader's child and the gunicorn workers go down with it
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        startup = _wait_until_up(port, process)
+        token = jwt.encode({'sub': 'USER-001', 'aud': 'authenticated', 'exp': int(time.time()) + 3600},
+                           SECRET, algorithm='HS256')
+        headers = {'Authorization': f'Bearer {token}'}
+        _drive(port, headers, args.clients, min(2.0, args.seconds))  # warm-up
+        result = _drive(port, headers, args.clients, args.seconds)
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+    result['startup_seconds'] = round(startup, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of the dev server against gunicorn')
+    parser.add_argument('--tasks', type=int, default=50_000)
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client connections')
+    parser.add_argument('--seconds', type=float, default=20, help='timed load per mode')
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() or 1, 4))
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--modes', default='dev,gunicorn')
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest-serving.json'))
+    args = parser.parse_args()
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'pulsevo.db')
+        _seed(store_path, args.tasks)
+
+        print(f"{args.tasks:,} tasks, {args.clients} clients, {args.seconds:g}s per mode, "
+              f"{os.cpu_count()} CPU")
+        print(f"  {'mode':<24}{'startup s':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for mode in args.modes.split(','):
+            result = run_mode(mode, args, store_path)
+            name = mode if mode == 'dev' else f"{mode} ({args.workers}x{args.threads})"
+            results[name] = result
+            print(f"  {name:<24}{result['startup_seconds']:>10}{result['rps']:>10,.1f}"
+                  f"{result['p50_ms'] or 0:>10,.1f}{result['p99_ms'] or 0:>10,.1f}{result['errors']:>8}")
+
+    save_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
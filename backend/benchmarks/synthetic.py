@@ -0,0 +1,66 @@
+"""
+Synthetic task/user rows shaped like the Supabase tables (see seed_data.py)
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+STATUSES = ['Open'] * 35 + ['In Progress'] * 28 + ['Completed'] * 30 + ['Blocked'] * 7
+PROJECTS = ['Web Platform', 'Mobile App', 'API Services']
+PRIORITIES = ['High', 'Medium', 'Low']
+TEAMS = ['Your Team', 'Alpha Team', 'Beta Team', 'Gamma Team']
+TASK_NAMES = [
+    'Implement user authentication flow', 'Fix crash on iOS 16', 'Implement caching layer',
+    'Add dark mode support', 'Optimize SQL queries', 'Add offline mode support'
+]
+TAGS = ['bug,ui', 'feature,security', 'performance,database', 'feature,notifications', 'devops']
+
+
+def generate_users(count=30, seed=42):
+    rng = random.Random(seed)
+    return [{
+        'user_id': f'USER-{idx:03d}',
+        'name': f'User {idx}',
+        'email': f'user.{idx}@company.com',
+        'initials': f'U{idx % 10}',
+        'role': rng.choice(['Frontend Developer', 'Backend Developer', 'QA Engineer']),
+        'team': TEAMS[idx % len(TEAMS)],
+        'is_active': True
+    } for idx in range(1, count + 1)]
+
+
+def generate_tasks(count, users=None, days=90, seed=42):
+    """Generate `count` task rows spread over the last `days` days"""
+    return list(iter_tasks(count, users, days, seed))
+
+
+def iter_tasks(count, users=None, days=90, seed=42):
+    """generate_tasks() one row at a time, for sizes that should not sit in memory as dicts"""
+    rng = random.Random(seed)
+    user_ids = [user['user_id'] for user in (users or generate_users())]
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    for idx in range(1, count + 1):
+        status = rng.choice(STATUSES)
+        created = now - timedelta(days=rng.randint(0, days), seconds=rng.randint(0, 86399))
+        started = completed = None
+        if status in ('In Progress', 'Completed'):
+            started = created + timedelta(days=rng.randint(0, 5), hours=rng.randint(0, 23))
+        if status == 'Completed':
+            completed = min(started + timedelta(hours=rng.choice([4, 8, 24, 80, 240])), now)
+        yield {
+            'task_id': f'TASK-{idx:07d}',
+            'task_name': rng.choice(TASK_NAMES),
+            'description': f'Detailed description for task {idx}.',
+            'status': status,
+            'priority': rng.choice(PRIORITIES),
+            'project': rng.choice(PROJECTS),
+            'assigned_to': rng.choice(user_ids),
+            'created_date': created.isoformat(),
+            'due_date': (created + timedelta(days=rng.randint(7, 30))).isoformat(),
+            'start_date': started.isoformat() if started else None,
+            'completed_date': completed.isoformat() if completed else None,
+            'estimated_hours': rng.choice([2, 4, 8, 16]),
+            'tags': rng.choice(TAGS),
+            'blocked_reason': 'Waiting for design assets' if status == 'Blocked' else None,
+            'comments': f"Task created on {created.strftime('%Y-%m-%d')}.",
+            'updated_at': created.isoformat()
+        }
@@ -0,0 +1,128 @@
+"""
+Bulk reads of whole (filtered) tables, in parallel range() pages.
+
+A single select() comes back as one PostgREST response, which is slow to
+produce for big tables and silently cut off at the server's max-rows
+limit. iter_rows() reads the first page with an exact count instead, then
+fetches the remaining range() pages on a small thread pool, at most
+BULK_READ_CONCURRENCY at a time, and yields rows in key order as the pages
+arrive, so callers can build their structures without holding every page.
+
+If the server returns fewer rows than asked for on the first page, its
+max-rows limit is lower than BULK_READ_PAGE_SIZE and the remaining pages
+are sized to match. Rows inserted or deleted while a read is in progress
+can shift page boundaries; the task snapshot's row count check picks that
+up on its next refresh.
+
+aread_all() is the same read for the event loop (asgi.py), through the
+async Supabase client, with the pages awaited side by side.
+
+The embedded data source (DATA_SOURCE=local) has no row limit and no
+round trips to overlap, so it is read in one go.
+"""
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from database import DATA_SOURCE, get_async_supabase, get_supabase
+from metrics import add_rows, phase
+
+# PostgREST's default max-rows
+BULK_READ_PAGE_SIZE = int(os.getenv('BULK_READ_PAGE_SIZE', '1000'))
+BULK_READ_CONCURRENCY = int(os.getenv('BULK_READ_CONCURRENCY', '4'))
+
+# Unique column the pages are ordered by, so they neither overlap nor skip rows
+KEYS = {'tasks': 'task_id', 'users': 'user_id'}
+
+_executor = ThreadPoolExecutor(max_workers=BULK_READ_CONCURRENCY, thread_name_prefix='bulk-read')
+
+
+def _after_fork():
+    # The parent's pool threads do not exist in a forked worker (see wsgi.py)
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=BULK_READ_CONCURRENCY, thread_name_prefix='bulk-read')
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _page(table, columns, where, start, size, count=None):
+    query = get_supabase().table(table).select(columns, count=count)
+    if where is not None:
+        query = where(query)
+    return query.order(KEYS[table]).range(start, start + size - 1).execute()
+
+
+def iter_rows(table, columns='*', where=None, page_size=None):
+    """Every row of `table` matching where(query), read in concurrent pages and yielded in key order"""
+    if DATA_SOURCE == 'local':
+        # OFFSET pages would only rescan the skipped rows
+        query = get_supabase().table(table).select(columns)
+        yield from (where(query) if where is not None else query).order(KEYS[table]).execute().data
+        return
+
+    page_size = page_size or BULK_READ_PAGE_SIZE
+    first = _page(table, columns, where, 0, page_size, count='exact')
+    yield from first.data
+
+    total = first.count
+    if total is None or len(first.data) >= total:
+        return
+    # The server capped the page: use its limit for the rest
+    page_size = min(page_size, len(first.data)) or page_size
+
+    starts = iter(range(len(first.data), total, page_size))
+    pending = deque()
+    try:
+        for start in starts:
+            pending.append(_executor.submit(_page, table, columns, where, start, page_size))
+            if len(pending) >= BULK_READ_CONCURRENCY:
+                break
+        while pending:
+            # Pages run on the pool threads, outside the request, so record their time and rows here
+            with phase('fetch'):
+                rows = pending.popleft().result().data
+            add_rows(len(rows))
+            start = next(starts, None)
+            if start is not None:
+                pending.append(_executor.submit(_page, table, columns, where, start, page_size))
+            yield from rows
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def read_all(table, columns='*', where=None):
+    """iter_rows() as a list"""
+    return list(iter_rows(table, columns, where))
+
+
+def _apage(table, columns, where, start, size, count=None):
+    query = get_async_supabase().table(table).select(columns, count=count)
+    if where is not None:
+        query = where(query)
+    return query.order(KEYS[table]).range(start, start + size - 1).execute()
+
+
+async def aread_all(table, columns='*', where=None, page_size=None):
+    """read_all() for the event loop"""
+    if DATA_SOURCE == 'local':
+        # No network to wait on; keep the loop free while SQLite works
+        return await asyncio.to_thread(read_all, table, columns, where)
+
+    page_size = page_size or BULK_READ_PAGE_SIZE
+    first = await _apage(table, columns, where, 0, page_size, count='exact')
+    total = first.count
+    if total is None or len(first.data) >= total:
+        return first.data
+    page_size = min(page_size, len(first.data)) or page_size
+
+    slots = asyncio.Semaphore(BULK_READ_CONCURRENCY)
+
+    async def page(start):
+        async with slots:
+            return (await _apage(table, columns, where, start, page_size)).data
+
+    pages = await asyncio.gather(*(page(start) for start in range(len(first.data), total, page_size)))
+    return first.data + [row for rows in pages for row in rows]
@@ -0,0 +1,149 @@
+"""
+Response cache for the read-only analytics endpoints.
+
+Every open dashboard polls the same endpoints with the same filters, so
+responses are cached per (path, normalized query parameters) in a bounded
+LRU with a TTL. Entries are tagged with the tables they were computed from
+and dropped as soon as the change feed reports a change to one of them.
+While no feed is connected, entries live only for a short offline TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from records import NO_DATE, to_epoch
+
+CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '60'))
+# Used while the change feed is down, so staleness stays close to the snapshot refresh interval
+CACHE_OFFLINE_TTL = float(os.getenv('RESPONSE_CACHE_OFFLINE_TTL_SECONDS', '5'))
+
+# Query parameters that are timestamps; '...Z' and '...+00:00' hit the same entry
+DATE_PARAMS = ('start_date', 'end_date')
+
+
+def _normalize(name, value):
+    if name in DATE_PARAMS:
+        try:
+            ts = to_epoch(value)
+        except ValueError:
+            return value
+        return str(ts) if ts != NO_DATE else ''
+    return value.strip()
+
+
+def cache_key():
+    """(path, sorted params) for the current request; blank and 'all' filters are dropped"""
+    params = []
+    for name in sorted(request.args):
+        for value in request.args.getlist(name):
+            value = _normalize(name, value)
+            if value and value != 'all':
+                params.append((name, value))
+    return request.path, tuple(params)
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered responses with TTL and per-table invalidation"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, offline_ttl=CACHE_OFFLINE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.offline_ttl = offline_ttl
+        self.feed = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, tables, value)
+        # Bumped by every invalidation; responses computed across one are not stored
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def attach(self, feed):
+        """Invalidate entries from `feed` changes and use the long TTL while it is connected
+
+        Attach after the data sources (e.g. the task snapshot) so they have
+        already seen a change when the version moves: a response computed
+        from the old data either started before the bump, and is not stored,
+        or reads data that has been marked stale.
+        """
+        self.feed = feed
+        feed.subscribe(lambda change: self.invalidate(change.table))
+
+    def sequence(self):
+        """Invalidation count, taken before computing a response (see put)"""
+        return self._version
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, tables, sequence=None):
+        """Store value unless a change arrived since `sequence` was read"""
+        connected = self.feed is not None and self.feed.connected
+        ttl = self.ttl if connected else min(self.ttl, self.offline_ttl)
+        with self._lock:
+            if sequence is not None and sequence != self.sequence():
+                return False
+            self._entries[key] = (time.monotonic() + ttl, frozenset(tables), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, table=None):
+        """Drop entries computed from `table` (every entry when table is None)"""
+        with self._lock:
+            self._version += 1
+            if table is None:
+                self._entries.clear()
+                return
+            stale = [key for key, entry in self._entries.items() if table in entry[1]]
+            for key in stale:
+                del self._entries[key]
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(tables=('tasks',)):
+    """Cache a GET view's 200 responses, tagged with the tables it reads"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return view(*args, **kwargs)
+
+            key = cache_key()
+            hit = response_cache.get(key)
+            if hit is not None:
+                body, status, mimetype = hit
+                response = Response(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            sequence = response_cache.sequence()
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.put(key, (response.get_data(), response.status_code, response.mimetype),
+                                   tables, sequence)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
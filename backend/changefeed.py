@@ -0,0 +1,192 @@
+"""
+Task and user change notifications for PULSEVO.
+
+RealtimeChangeFeed listens to the Supabase realtime publication that
+supabase_schema.sql enables for the tasks and users tables (Phoenix channel
+protocol over a websocket, in a background thread). LocalChangeFeed is the
+in-process stand-in: local_store.py publishes to it on every write, and
+anything else that changes data can call publish() directly.
+
+Listeners receive a Change. `table` is None when changes may have been
+missed (e.g. after a reconnect) and every table should be treated as dirty.
+"""
+import json
+import os
+import threading
+import time
+
+from database import DATA_SOURCE
+
+# realtime, local or off; the embedded data source reports its own writes, so it defaults to local
+CHANGE_FEED = os.getenv('CHANGE_FEED', 'local' if DATA_SOURCE == 'local' else 'realtime').lower()
+
+HEARTBEAT_SECONDS = 25
+MAX_BACKOFF_SECONDS = 60
+
+
+class Change:
+    """One row change (or a resync marker when table is None)"""
+    __slots__ = ('table', 'type', 'record')
+
+    def __init__(self, table, type, record=None):
+        self.table = table
+        self.type = type
+        self.record = record
+
+    def __repr__(self):
+        return f"Change({self.table!r}, {self.type!r})"
+
+
+class ChangeFeed:
+    """Fans changes out to subscribers; never connected on its own"""
+
+    def __init__(self):
+        self.sequence = 0
+        self.last_change = time.time()
+        self.connected = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """Call callback(change) for every change"""
+        self._listeners.append(callback)
+        return callback
+
+    def publish(self, table, type='UPDATE', record=None):
+        """Notify subscribers of a change to `table` (None means every table)"""
+        with self._lock:
+            self.sequence += 1
+            self.last_change = time.time()
+        change = Change(table, type, record)
+        for callback in list(self._listeners):
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"⚠️  Change listener failed: {e}")
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def after_fork(self):
+        """Reset per-process state in a forked worker (see wsgi.py)"""
+        self._lock = threading.Lock()
+
+
+class LocalChangeFeed(ChangeFeed):
+    """In-process feed; whoever writes the data publishes the change"""
+
+    def __init__(self):
+        super().__init__()
+        self.connected = True
+
+
+class RealtimeChangeFeed(ChangeFeed):
+    """Supabase realtime (postgres_changes) subscription for the given tables"""
+
+    def __init__(self, url, key, tables=('tasks', 'users'), schema='public'):
+        super().__init__()
+        base = url.rstrip('/').replace('https://', 'wss://', 1).replace('http://', 'ws://', 1)
+        self.endpoint = f"{base}/realtime/v1/websocket?apikey={key}&vsn=1.0.0"
+        self.key = key
+        self.tables = tables
+        self.topic = f"realtime:{schema}"
+        self.schema = schema
+        self._stop = threading.Event()
+        self._thread = None
+        self._ref = 0
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='realtime-change-feed', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def after_fork(self):
+        """Forget the parent's listener thread; the forked worker calls start() for its own"""
+        super().after_fork()
+        self._thread = None
+        if self.connected:
+            self.connected = False
+            # Nothing was listening between the fork and the new subscription
+            self.publish(None, 'RESYNC')
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self._listen()
+                backoff = 1
+            except Exception as e:
+                print(f"⚠️  Realtime change feed disconnected: {e}")
+            if self.connected:
+                self.connected = False
+                # Anything may have changed while we were away
+                self.publish(None, 'RESYNC')
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def _send(self, ws, topic, event, payload):
+        self._ref += 1
+        ws.send(json.dumps({'topic': topic, 'event': event, 'payload': payload, 'ref': str(self._ref)}))
+        return str(self._ref)
+
+    def _listen(self):
+        from websockets.sync.client import connect
+
+        with connect(self.endpoint, open_timeout=10) as ws:
+            join_ref = self._send(ws, self.topic, 'phx_join', {
+                'config': {
+                    'broadcast': {'self': False},
+                    'presence': {'key': ''},
+                    'postgres_changes': [{'event': '*', 'schema': self.schema, 'table': table}
+                                         for table in self.tables],
+                },
+                'access_token': self.key,
+            })
+            next_heartbeat = time.monotonic() + HEARTBEAT_SECONDS
+            while not self._stop.is_set():
+                try:
+                    message = json.loads(ws.recv(timeout=max(0.0, next_heartbeat - time.monotonic())))
+                except TimeoutError:
+                    message = None
+                if time.monotonic() >= next_heartbeat:
+                    self._send(ws, 'phoenix', 'heartbeat', {})
+                    next_heartbeat = time.monotonic() + HEARTBEAT_SECONDS
+                if message:
+                    self._handle(message, join_ref)
+
+    def _handle(self, message, join_ref):
+        event = message.get('event')
+        payload = message.get('payload') or {}
+        if event == 'phx_reply' and message.get('ref') == join_ref:
+            if payload.get('status') != 'ok':
+                raise RuntimeError(f"join rejected: {payload.get('response')}")
+            self.connected = True
+            print(f"✅ Realtime change feed subscribed ({', '.join(self.tables)})")
+            # Changes made before the subscription was live are unknown
+            self.publish(None, 'RESYNC')
+        elif event == 'postgres_changes':
+            data = payload.get('data') or {}
+            self.publish(data.get('table'), data.get('type'), data.get('record') or data.get('old_record'))
+        elif event in ('phx_error', 'phx_close') and message.get('topic') == self.topic:
+            raise RuntimeError(f"channel {event}")
+
+
+def start_change_feed(mode=CHANGE_FEED):
+    """Create and start the change feed selected by CHANGE_FEED"""
+    if mode == 'local':
+        return LocalChangeFeed()
+    if mode == 'realtime':
+        url = os.getenv('SUPABASE_URL')
+        key = os.getenv('SUPABASE_SERVICE_KEY')
+        if url and key:
+            return RealtimeChangeFeed(url, key).start()
+        print("⚠️  Realtime change feed needs SUPABASE_URL and SUPABASE_SERVICE_KEY - cache falls back to short TTLs")
+    return ChangeFeed()
@@ -0,0 +1,186 @@
+"""
+Compact, token-budgeted data context for chat prompts.
+
+Instead of pretty-printed JSON, tasks are written as one pipe-separated line
+each under a single header, with users and projects dictionary-encoded
+(U1, P1, ...) and statuses/priorities as one-letter codes. Aggregates come
+first and are always included; task rows are then added, most relevant to
+the question first, until CHAT_CONTEXT_TOKEN_BUDGET is used up.
+
+Relevance: rows matching the projects, people, teams, statuses and
+priorities named in the question (and "overdue" when asked) rank first,
+newest first within the same score.
+"""
+import os
+import re
+import time
+
+from aggregations import group_records, group_records_by_assignee
+from snapshot import STATUSES
+
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv('CHAT_CONTEXT_TOKEN_BUDGET', '6000'))
+
+# Rough size of a token for English text and identifiers
+CHARS_PER_TOKEN = 4
+
+STATUS_CODES = {'Open': 'O', 'In Progress': 'P', 'Completed': 'C', 'Blocked': 'B'}
+PRIORITY_CODES = {'High': 'H', 'Medium': 'M', 'Low': 'L'}
+
+STATUS_WORDS = {
+    'Open': ('open', 'todo', 'to do', 'not started'),
+    'In Progress': ('in progress', 'in-progress', 'ongoing', 'active', 'working on'),
+    'Completed': ('completed', 'complete', 'done', 'finished', 'closed'),
+    'Blocked': ('blocked', 'blocker', 'stuck'),
+}
+OVERDUE_WORDS = ('overdue', 'late', 'past due', 'missed')
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+# First words too common to identify a project or team on their own ("your team")
+_GENERIC_WORDS = {'your', 'team', 'teams', 'project', 'projects', 'task', 'tasks'}
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _day(epoch):
+    return time.strftime('%Y-%m-%d', time.gmtime(epoch)) if epoch > 0 else ''
+
+
+def _clean(value):
+    return (value or '').replace('|', '/').replace('\n', ' ')
+
+
+def _names(question, name):
+    """Whether `name` appears in the question as whole words"""
+    return re.search(r'\b' + re.escape(name.lower()) + r'\b', question) is not None
+
+
+def _mentions(question, words, name):
+    """Whether the question names `name` in full, or by its first word (e.g. 'mobile', 'alpha')"""
+    if _names(question, name):
+        return True
+    first = _WORD.findall(name.lower())[:1]
+    return bool(first) and len(first[0]) >= 4 and first[0] not in _GENERIC_WORDS and first[0] in words
+
+
+def question_filters(question, records, users):
+    """What the question talks about: {'project', 'assigned_to', 'team', 'status', 'priority'} value sets, plus 'overdue'"""
+    question = question.lower()
+    words = set(_WORD.findall(question))
+    filters = {}
+
+    projects = {r.project for r in records if r.project}
+    filters['project'] = {p for p in projects if _mentions(question, words, p)}
+
+    teams = {u.get('team') for u in users if u.get('team')}
+    filters['team'] = {t for t in teams if _mentions(question, words, t)}
+
+    # People by full name, user id, or a first name no one else shares
+    first_names = {}
+    for user in users:
+        first = (user.get('name') or '').lower().split(' ')[0]
+        first_names[first] = first_names.get(first, 0) + 1
+    people = set()
+    for user in users:
+        name = user.get('name') or ''
+        first = name.lower().split(' ')[0]
+        if (name and _names(question, name)) or _names(question, user['user_id']) \
+                or (len(first) >= 3 and first_names[first] == 1 and first in words):
+            people.add(user['user_id'])
+    filters['assigned_to'] = people
+
+    filters['status'] = {s for s, phrases in STATUS_WORDS.items() if any(
+        (p in question) if ' ' in p else (p in words) for p in phrases)}
+    filters['priority'] = {p for p in PRIORITY_CODES if p.lower() in words}
+    filters['overdue'] = any((w in question) if ' ' in w else (w in words) for w in OVERDUE_WORDS)
+    return filters
+
+
+def _relevance(record, filters, team_members, now):
+    score = 0
+    for field in ('project', 'assigned_to', 'status', 'priority'):
+        if getattr(record, field) in filters[field]:
+            score += 1
+    if record.assigned_to in team_members:
+        score += 1
+    if filters['overdue'] and 0 < record.due < now and record.status != 'Completed':
+        score += 1
+    return score
+
+
+def _counts(counts):
+    return '/'.join(str(counts[code]) for code in range(len(STATUSES)))
+
+
+def build_context(question, records, users, budget=CHAT_CONTEXT_TOKEN_BUDGET, now=None):
+    """(context text, report) for a chat question over TaskRecords and user rows"""
+    now = time.time() if now is None else now
+
+    project_codes = {}
+    for record in records:
+        if record.project and record.project not in project_codes:
+            project_codes[record.project] = f"P{len(project_codes) + 1}"
+    user_codes = {u['user_id']: f"U{i}" for i, u in enumerate(users, 1)}
+
+    status_index = {status: code for code, status in enumerate(STATUSES)}
+    status_counts = [0] * len(STATUSES)
+    for record in records:
+        code = status_index.get(record.status)
+        if code is not None:
+            status_counts[code] += 1
+    by_project = group_records(records, 'project')
+    by_assignee = group_records_by_assignee(records)
+
+    lines = [
+        f"TOTALS tasks={len(records)} open={status_counts[0]} in_progress={status_counts[1]} "
+        f"completed={status_counts[2]} blocked={status_counts[3]}",
+        "CODES status: " + ' '.join(f"{c}={s}" for s, c in STATUS_CODES.items())
+        + " | priority: " + ' '.join(f"{c}={p}" for p, c in PRIORITY_CODES.items()),
+        "COUNTS are open/in_progress/completed/blocked",
+        "PROJECTS code|name|counts",
+    ]
+    lines += [f"{code}|{_clean(project)}|{_counts(by_project[project])}"
+              for project, code in project_codes.items()]
+    lines.append("USERS code|user_id|name|team|role|counts")
+    for user in users:
+        counts = by_assignee.get(user['user_id'])
+        lines.append(f"{user_codes[user['user_id']]}|{user['user_id']}|{_clean(user.get('name'))}|"
+                     f"{_clean(user.get('team'))}|{_clean(user.get('role'))}|"
+                     f"{_counts(counts) if counts else '0/0/0/0'}")
+
+    filters = question_filters(question, records, users)
+    team_members = {u['user_id'] for u in users if u.get('team') in filters['team']}
+    ranked = sorted(records, key=lambda r: (-_relevance(r, filters, team_members, now), -r.created))
+
+    header = "TASKS id|name|status|priority|project|assignee|due|created|completed|tags"
+    used = estimate_tokens('\n'.join(lines)) + estimate_tokens(header) + 16
+    rows = []
+    for record in ranked:
+        row = '|'.join((
+            record.task_id or '', _clean(record.task_name),
+            STATUS_CODES.get(record.status, _clean(record.status)),
+            PRIORITY_CODES.get(record.priority, _clean(record.priority)),
+            project_codes.get(record.project, ''),
+            user_codes.get(record.assigned_to) or _clean(record.assigned_to),
+            _day(record.due), _day(record.created), _day(record.completed), _clean(record.tags),
+        ))
+        cost = estimate_tokens(row) + 1
+        if used + cost > budget:
+            break
+        rows.append(row)
+        used += cost
+
+    lines.append(f"{header} ({len(rows)} of {len(records)} tasks, most relevant first)")
+    lines += rows
+    text = '\n'.join(lines)
+
+    report = {
+        'chars': len(text),
+        'estimated_tokens': estimate_tokens(text),
+        'tasks_included': len(rows),
+        'tasks_total': len(records),
+        'budget_tokens': budget,
+    }
+    return text, report
@@ -0,0 +1,214 @@
+"""
+Deterministic answers for aggregate chat questions.
+
+Recognizes three shapes of question over status, project, priority,
+assignee and team (plus "overdue"), and answers them from the task data in
+milliseconds:
+
+- count:  "how many blocked tasks are in Mobile App?"
+- top-N:  "who has the most open tasks?", "top 3 projects by completed tasks"
+- list:   "show overdue high priority tasks for Alpha Team"
+
+answer() returns None for anything else (open-ended questions, time ranges,
+things that are not tasks), and the caller asks Gemini instead. Its answers
+are only exact when it is given every task, not just the chat context's.
+"""
+import re
+import time
+
+from chat_context import question_filters
+from snapshot import STATUSES
+
+LIST_LIMIT = 10
+
+_COUNT = re.compile(r'^\s*(how many|number of|count|total number of)\b')
+_TOP = re.compile(r'\b(most|fewest|least|highest|lowest|top\s*\d+|top)\b')
+_LIST = re.compile(r'^\s*(show|list|find|give me|which tasks|what tasks|what are the)\b')
+_TOP_N = re.compile(r'\btop\s*(\d+)\b')
+_TASKS = re.compile(r'\btasks?\b')
+
+# Leave these to Gemini: opinions, explanations, and time ranges we do not parse
+_OPEN_ENDED = re.compile(
+    r'\b(why|should|recommend\w*|suggest\w*|advice|advise|improve|explain|summar\w*|insights?|'
+    r'risks?|predict\w*|forecast|trend\w*|compare|comparison|how (can|do|should|is|are)|'
+    r'today|yesterday|week|weeks|month|months|year|years|since|before|after|between|last|this|'
+    r'hours?|days?|date|dates|average|avg|percent\w*|rate)\b')
+
+_GROUPS = (
+    ('assignee', re.compile(r'\b(who|whom|which (person|people|user|users|member|members|developer|developers|'
+                            r'engineer|engineers|assignee|assignees|teammate|teammates))\b|\b(assignees|people|'
+                            r'developers|members|users)\b')),
+    ('project', re.compile(r'\b(which|what) projects?\b|\bprojects\b')),
+    ('team', re.compile(r'\b(which|what) teams?\b|\bteams\b')),
+)
+
+
+def _group(question):
+    for name, pattern in _GROUPS:
+        if pattern.search(question):
+            return name
+    return None
+
+
+def _describe(filters, names, noun='tasks'):
+    """'blocked high priority tasks in Mobile App for Alpha Team', from the active filters"""
+    words = []
+    if filters['overdue']:
+        words.append('overdue')
+    words += [s.lower() for s in sorted(filters['status'])]
+    if filters['priority']:
+        words.append('/'.join(p.lower() for p in sorted(filters['priority'])) + ' priority')
+    text = ' '.join(words + [noun])
+    if filters['project']:
+        text += ' in ' + ' and '.join(sorted(filters['project']))
+    if filters['assigned_to']:
+        text += ' assigned to ' + ', '.join(sorted(names.get(u, u) for u in filters['assigned_to']))
+    if filters['team']:
+        text += ' for ' + ' and '.join(sorted(filters['team']))
+    return text
+
+
+def _matching(records, filters, team_of, now, skip=()):
+    result = []
+    for record in records:
+        if filters['status'] and 'status' not in skip and record.status not in filters['status']:
+            continue
+        if filters['priority'] and record.priority not in filters['priority']:
+            continue
+        if filters['project'] and 'project' not in skip and record.project not in filters['project']:
+            continue
+        if filters['assigned_to'] and 'assigned_to' not in skip and record.assigned_to not in filters['assigned_to']:
+            continue
+        if filters['team'] and 'team' not in skip and team_of.get(record.assigned_to) not in filters['team']:
+            continue
+        if filters['overdue'] and not (0 < record.due < now and record.status != 'Completed'):
+            continue
+        result.append(record)
+    return result
+
+
+def _count_answer(records, filters, names):
+    one = len(records) == 1
+    description = _describe(filters, names, 'task' if one else 'tasks')
+    if filters['status']:
+        return f"There {'is' if one else 'are'} {len(records)} {description}."
+    counts = {status: 0 for status in STATUSES}
+    for record in records:
+        if record.status in counts:
+            counts[record.status] += 1
+    parts = [f"{counts[s]} {s.lower()}" for s in STATUSES]
+    return (f"There {'is' if one else 'are'} {len(records)} {description}: "
+            f"{', '.join(parts[:-1])} and {parts[-1]}.")
+
+
+def _top_answer(question, records, filters, group, candidates, names, team_of):
+    # Every candidate starts at zero, so "fewest" can name those with none at all
+    counts = dict.fromkeys(candidates, 0)
+    for record in records:
+        if group == 'assignee':
+            key = record.assigned_to
+        elif group == 'project':
+            key = record.project
+        else:
+            key = team_of.get(record.assigned_to)
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return None
+
+    fewest = re.search(r'\b(fewest|least|lowest)\b', question) is not None
+    ranked = sorted(counts.items(), key=lambda item: (item[1] if fewest else -item[1], item[0]))
+    match = _TOP_N.search(question)
+    n = int(match.group(1)) if match else 1
+    label = (lambda key: names.get(key, key)) if group == 'assignee' else (lambda key: key)
+    description = _describe(filters, names)
+
+    if n == 1:
+        best, count = ranked[0]
+        tied = [label(k) for k, c in ranked if c == count]
+        extreme = 'fewest' if fewest else 'most'
+        if len(tied) > 1:
+            shown = (', '.join(tied[:5]) + f" and {len(tied) - 5} more") if len(tied) > 5 \
+                else ', '.join(tied[:-1]) + ' and ' + tied[-1]
+            return f"{shown} are tied for the {extreme} {description}, with {count} each."
+        answer = f"{label(best)} has the {extreme} {description}: {count}."
+        if len(ranked) > 1:
+            runner, runner_count = ranked[1]
+            answer += f" Next is {label(runner)} with {runner_count}."
+        return answer
+
+    plural = {'assignee': 'assignees', 'project': 'projects', 'team': 'teams'}[group]
+    listed = ', '.join(f"{label(k)} ({c})" for k, c in ranked[:n])
+    return f"{'Bottom' if fewest else 'Top'} {min(n, len(ranked))} {plural} by {description}: {listed}."
+
+
+def _list_answer(records, filters, names, task_names=None):
+    description = _describe(filters, names, 'task' if len(records) == 1 else 'tasks')
+    if not records:
+        return f"There are no {description}."
+    if filters['overdue']:
+        records = sorted(records, key=lambda r: r.due)
+        order = 'most overdue first'
+    else:
+        records = sorted(records, key=lambda r: -r.created)
+        order = 'newest first'
+    shown = records[:LIST_LIMIT]
+    missing = [record.task_id for record in shown if record.task_name is None]
+    titles = task_names(missing) if missing and task_names is not None else {}
+    lines = []
+    for record in shown:
+        details = [record.status]
+        if record.assigned_to:
+            details.append(names.get(record.assigned_to, record.assigned_to))
+        if record.due > 0:
+            details.append('due ' + time.strftime('%Y-%m-%d', time.gmtime(record.due)))
+        title = record.task_name if record.task_name is not None else titles.get(record.task_id, '')
+        lines.append(f"• {record.task_id} {title} ({', '.join(details)})")
+    shown = '' if len(records) <= LIST_LIMIT else f" Showing {LIST_LIMIT}, {order}:"
+    return f"Found {len(records)} {description}.{shown}\n" + '\n'.join(lines)
+
+
+def is_candidate(question):
+    """False for questions answer() always leaves to Gemini (so callers can skip loading every task)"""
+    question = (question or '').lower().strip()
+    return bool(question) and not _OPEN_ENDED.search(question)
+
+
+def answer(question, records, users, now=None, task_names=None):
+    """Answer text for an aggregate question over every task in `records`, or None when Gemini should handle it
+
+    task_names(ids) -> {task_id: name} fills in listed tasks whose records carry no name.
+    """
+    if not is_candidate(question):
+        return None
+    question = question.lower().strip()
+    now = time.time() if now is None else now
+
+    filters = question_filters(question, records, users)
+    names = {u['user_id']: u.get('name') or u['user_id'] for u in users}
+    team_of = {u['user_id']: u.get('team') for u in users}
+    group = _group(question)
+
+    if _TOP.search(question) and group:
+        # "who in Alpha Team has the most ..." ranks the people, it does not filter by them
+        skip = {'assigned_to'} if group == 'assignee' else {group}
+        scoped = dict(filters, **{name: set() for name in skip})
+        if group == 'assignee':
+            candidates = [u['user_id'] for u in users if not filters['team'] or u.get('team') in filters['team']]
+        elif group == 'project':
+            candidates = {r.project for r in records if r.project}
+        else:
+            candidates = {u.get('team') for u in users if u.get('team')}
+        return _top_answer(question, _matching(records, filters, team_of, now, skip), scoped, group,
+                           candidates, names, team_of)
+
+    if not (_TASKS.search(question) or filters['status']):
+        return None  # not a question about tasks
+    if group and group != 'assignee':
+        return None  # e.g. "how many projects ...": not a task count
+
+    if _COUNT.search(question):
+        return _count_answer(_matching(records, filters, team_of, now), filters, names)
+    if _LIST.search(question):
+        return _list_answer(_matching(records, filters, team_of, now), filters, names, task_names)
+    return None
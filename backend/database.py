@@ -1,15 +1,38 @@
 import os
-from supabase import create_client, Client
+import httpx
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+from supabase import acreate_client, create_client, AsyncClient, AsyncClientOptions, Client, ClientOptions
 from dotenv import load_dotenv
 
+from local_store import LocalStore
+from metrics import instrument_client
+
 load_dotenv()
 
+# supabase (remote, the default) or local (embedded SQLite, see local_store.py)
+DATA_SOURCE = os.getenv('DATA_SOURCE', 'supabase').lower()
+# SQLite file for DATA_SOURCE=local; ':memory:' keeps everything in this process
+LOCAL_STORE_PATH = os.getenv('LOCAL_STORE_PATH', ':memory:')
+# One keep-alive connection pool shared by every Supabase request (see fanout.py)
+SUPABASE_POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', '20'))
+SUPABASE_KEEPALIVE_SECONDS = float(os.getenv('SUPABASE_KEEPALIVE_SECONDS', '60'))
+
 # Initialize Supabase client
 supabase: Client = None
+# The embedded store behind `supabase` when DATA_SOURCE=local
+local_store = None
+# Async client for the event loop in asgi.py (None until init_async_db())
+async_supabase: AsyncClient = None
 
 def init_db(app):
-    """Initialize Supabase database connection"""
-    global supabase
+    """Initialize the database connection (Supabase, or the embedded local store)"""
+    global supabase, local_store
+    
+    if DATA_SOURCE == 'local':
+        local_store = LocalStore(LOCAL_STORE_PATH)
+        supabase = instrument_client(local_store)
+        print(f"✅ Local data source ready ({LOCAL_STORE_PATH})")
+        return supabase
     
     supabase_url = os.getenv('SUPABASE_URL')
     supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
@@ -17,14 +40,69 @@ def init_db(app):
     if not supabase_url or not supabase_key:
         raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in .env file")
     
-    supabase = create_client(supabase_url, supabase_key)
+    supabase = _connect(supabase_url, supabase_key)
     print("✅ Supabase database connected successfully!")
     
     return supabase
 
+def _connect(supabase_url, supabase_key):
+    # Concurrent queries share these connections (HTTP/2 multiplexes them) instead of reconnecting
+    http_client = httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+        limits=httpx.Limits(max_connections=SUPABASE_POOL_SIZE,
+                            max_keepalive_connections=SUPABASE_POOL_SIZE,
+                            keepalive_expiry=SUPABASE_KEEPALIVE_SECONDS),
+    )
+    client = create_client(supabase_url, supabase_key, options=ClientOptions(httpx_client=http_client))
+    
+    # Queries through the instrumented client count towards the request's fetch phase
+    return instrument_client(client)
+
+def _after_fork():
+    # A forked worker (see wsgi.py) must not share the parent's open sockets; give it its own pool
+    global supabase
+    if supabase is not None and local_store is None:
+        supabase = _connect(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+
+os.register_at_fork(after_in_child=_after_fork)
+
+async def init_async_db():
+    """Create the async Supabase client (on the running event loop); None for the local data source"""
+    global async_supabase
+    
+    if DATA_SOURCE == 'local':
+        return None
+    
+    http_client = httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+        limits=httpx.Limits(max_connections=SUPABASE_POOL_SIZE,
+                            max_keepalive_connections=SUPABASE_POOL_SIZE,
+                            keepalive_expiry=SUPABASE_KEEPALIVE_SECONDS),
+    )
+    async_supabase = await acreate_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'),
+                                          options=AsyncClientOptions(httpx_client=http_client))
+    print("✅ Async Supabase client ready")
+    
+    return async_supabase
+
+def attach_change_feed(feed):
+    """Have the local store publish its own writes to `feed` (Supabase reports them through realtime)"""
+    if local_store is not None:
+        local_store.feed = feed
+
 def get_supabase():
     """Get Supabase client instance"""
     if supabase is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
     return supabase
 
+def get_async_supabase():
+    """Get the async Supabase client instance"""
+    if async_supabase is None:
+        raise RuntimeError("Async database not initialized. Call init_async_db() first.")
+    return async_supabase
+
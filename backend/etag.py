@@ -0,0 +1,126 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the read endpoints.
+
+A response's validator is derived from a cheap data version of the tables
+it reads, computed before the view runs, so an unchanged poll is answered
+with 304 without querying, aggregating or serializing anything:
+
+- change feed connected: the feed sequence number (no I/O at all)
+- shared task snapshot: its updated_at watermark and row count
+- otherwise: max(updated_at) plus row count, one single-row query per table
+
+Time-relative numbers (completed this hour, "today") also move without any
+data change, so versions roll over every VERSION_BUCKET_SECONDS.
+"""
+import hashlib
+import os
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+
+from flask import make_response, request
+
+from cache import cache_key
+from database import get_supabase
+from records import to_epoch
+from snapshot import SNAPSHOT_ENABLED, task_snapshot
+
+VERSION_BUCKET_SECONDS = int(os.getenv('ETAG_BUCKET_SECONDS', '60'))
+
+# Versions from a feed sequence only mean something within this process, so every
+# process (each forked worker included, see wsgi.py) gets its own id
+_BOOT_ID = uuid.uuid4().hex
+
+
+def _after_fork():
+    global _BOOT_ID
+    _BOOT_ID = uuid.uuid4().hex
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+class DataVersions:
+    """Per-table (version, last_modified) lookups"""
+
+    def __init__(self):
+        self.feed = None
+
+    def attach(self, feed):
+        self.feed = feed
+
+    def table_version(self, table):
+        feed = self.feed
+        if feed is not None and feed.connected:
+            return (_BOOT_ID, feed.sequence), int(feed.last_change)
+        if table == 'tasks' and SNAPSHOT_ENABLED:
+            snapshot = task_snapshot.get()
+            return (snapshot.watermark, len(snapshot)), max(snapshot.watermark_epoch, 0)
+
+        response = get_supabase().table(table).select('updated_at', count='exact') \
+            .order('updated_at', desc=True).limit(1).execute()
+        latest = response.data[0]['updated_at'] if response.data else None
+        return (latest, response.count), max(to_epoch(latest), 0)
+
+    def version(self, tables):
+        """(version tuple, last_modified epoch) for a set of tables"""
+        bucket = int(time.time()) // VERSION_BUCKET_SECONDS * VERSION_BUCKET_SECONDS
+        parts = [bucket]
+        last_modified = bucket
+        for table in tables:
+            table_version, modified = self.table_version(table)
+            parts.append(table_version)
+            last_modified = max(last_modified, modified)
+        return tuple(parts), last_modified
+
+
+data_versions = DataVersions()
+
+
+def _etag_for(version):
+    digest = hashlib.sha1(repr((cache_key(), version)).encode()).hexdigest()[:20]
+    # Weak: the body is equivalent, not byte-for-byte identical, for the same version
+    return f'W/"{digest}"'
+
+
+def _not_modified(etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        # Weak comparison, so a proxy stripping the W/ prefix still matches
+        return '*' in tags or etag in tags or etag[2:] in tags
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional_get(tables=('tasks',)):
+    """Answer If-None-Match / If-Modified-Since with 304 when `tables` have not changed"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                version, last_modified = data_versions.version(tables)
+            except Exception as e:
+                print(f"⚠️  Data version lookup failed: {e}")
+                return view(*args, **kwargs)
+
+            etag = _etag_for(version)
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+            # Revalidate every time; the 304 is what makes polling cheap
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+"""
+Concurrent fan-out of the independent queries within one request.
+
+Handlers that need several unrelated reads (the users and their task
+counts, the current and previous overview periods...) hand them to
+gather() instead of running them one after another, so the request waits
+for the slowest query rather than for all of them in turn. The queries go
+through the shared Supabase client, and so through its one keep-alive
+HTTP connection pool (see database.py): running them side by side reuses
+open connections instead of opening one per query.
+
+The embedded data source (DATA_SOURCE=local) has no round trips to
+overlap, only the GIL to contend for, so queries run one after another
+there.
+
+Each query's latency is recorded under pulsevo_query_duration_seconds and,
+with QUERY_TIMING_LOG on, printed along with its row count.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import has_request_context, request
+
+import metrics
+from database import DATA_SOURCE
+
+QUERY_FANOUT_ENABLED = os.getenv('QUERY_FANOUT_ENABLED', 'true').lower() == 'true' and DATA_SOURCE != 'local'
+QUERY_FANOUT_WORKERS = int(os.getenv('QUERY_FANOUT_WORKERS', '8'))
+QUERY_TIMING_LOG = os.getenv('QUERY_TIMING_LOG', 'false').lower() in ('1', 'true', 'yes')
+
+_executor = ThreadPoolExecutor(max_workers=QUERY_FANOUT_WORKERS, thread_name_prefix='query')
+# Set on the pool threads, so a gather() inside a query runs inline instead of waiting on its own pool
+_in_pool = threading.local()
+
+
+def _after_fork():
+    # The parent's pool threads do not exist in a forked worker (see wsgi.py)
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=QUERY_FANOUT_WORKERS, thread_name_prefix='query')
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _timed(query):
+    with metrics.collect() as stats:
+        start = time.perf_counter()
+        stats['result'] = query()
+        stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def _pooled(query):
+    _in_pool.active = True
+    try:
+        return _timed(query)
+    finally:
+        _in_pool.active = False
+
+
+def gather(**queries):
+    """Run the zero-argument callables concurrently; {name: result} once all of them are done"""
+    start = time.perf_counter()
+    concurrent = QUERY_FANOUT_ENABLED and len(queries) > 1 and not getattr(_in_pool, 'active', False)
+    if concurrent:
+        futures = {name: _executor.submit(_pooled, query) for name, query in queries.items()}
+        stats = {name: future.result() for name, future in futures.items()}
+        # The queries overlapped: the slowest of them is what the request waited for
+        for name in {name for s in stats.values() for name in s['phases']}:
+            metrics.add_phase(name, max(s['phases'].get(name, 0.0) for s in stats.values()))
+        metrics.add_rows(sum(s['rows'] for s in stats.values()))
+    else:
+        stats = {name: _timed(query) for name, query in queries.items()}
+        for s in stats.values():
+            for name, seconds in s['phases'].items():
+                metrics.add_phase(name, seconds)
+            metrics.add_rows(s['rows'])
+
+    for name, s in stats.items():
+        metrics.observe_query(name, s['seconds'])
+    if QUERY_TIMING_LOG:
+        where = request.path if has_request_context() else 'background'
+        timings = ', '.join(f"{name} {s['seconds'] * 1000:.1f}ms/{s['rows']} rows" for name, s in stats.items())
+        print(f"⏱️  {where}: {timings} ({'concurrent' if concurrent else 'sequential'}, "
+              f"{(time.perf_counter() - start) * 1000:.1f}ms)")
+    return {name: s['result'] for name, s in stats.items()}
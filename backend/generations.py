@@ -0,0 +1,107 @@
+"""
+Cache for AI generations (dashboard JSON, summaries).
+
+Entries are keyed by what is being generated for (the kind plus its filter,
+e.g. the summary for one date range) and remember a hash of the exact inputs
+their prompt was built from, so the model is only called again when the
+underlying numbers move:
+
+- same inputs: served as is, however old
+- inputs moved, entry younger than GENERATION_STALE_SECONDS: the stored text
+  is served at once while one background thread regenerates it
+- no entry, or an older one: generated while the caller waits
+
+Concurrent misses for the same key share one generation. Failed generations
+are never cached, so callers can serve their fallback and try again next time.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+GENERATION_CACHE_ENABLED = os.getenv('GENERATION_CACHE_ENABLED', 'true').lower() == 'true'
+GENERATION_STALE_SECONDS = int(os.getenv('GENERATION_STALE_SECONDS', '3600'))
+GENERATION_CACHE_MAX_ENTRIES = 128
+
+
+def inputs_key(kind, inputs):
+    """Stable key for a generation from the values its prompt is built from"""
+    raw = json.dumps(inputs, sort_keys=True, default=str, separators=(',', ':'))
+    return kind, hashlib.sha256(raw.encode()).hexdigest()
+
+
+class GenerationCache:
+    """LRU of generated values per (kind, scope), stale-while-revalidate on input changes, single-flight"""
+
+    def __init__(self, stale=GENERATION_STALE_SECONDS,
+                 max_entries=GENERATION_CACHE_MAX_ENTRIES, enabled=GENERATION_CACHE_ENABLED):
+        self.stale = stale
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (created, inputs digest, value)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, scope, inputs, generate):
+        """(value, state) where state is 'fresh', 'stale' or 'miss'; errors from generate() propagate
+
+        `scope` identifies the entry (e.g. the request's filters), `inputs`
+        are the values the prompt is built from.
+        """
+        if not self.enabled:
+            return generate(), 'miss'
+
+        key = inputs_key(kind, scope)
+        digest = inputs_key(kind, inputs)[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, entry_digest, value = entry
+                if entry_digest == digest:
+                    self._entries.move_to_end(key)
+                    return value, 'fresh'
+                if time.monotonic() - created < self.stale:
+                    self._entries.move_to_end(key)
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        threading.Thread(target=self._generate, args=(key, digest, generate, True),
+                                         name='generation-refresh', daemon=True).start()
+                    return value, 'stale'
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if owner:
+            self._generate(key, digest, generate)
+        return future.result(), 'miss'
+
+    def _generate(self, key, digest, generate, background=False):
+        future = self._inflight[key]
+        try:
+            value = generate()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            if background:
+                # Keep serving the stored value; the next request with moved inputs retries
+                print(f"⚠️  Background {key[0]} regeneration failed: {e}")
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), digest, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+generation_cache = GenerationCache()
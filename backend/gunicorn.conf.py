@@ -0,0 +1,57 @@
+"""
+gunicorn settings for serving PULSEVO in production (see wsgi.py).
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Reloading: `kill -HUP <master pid>` starts fresh workers with the current
+settings and stops the old ones once they finish their requests. With
+preload_app the code itself is loaded only once, so to deploy new code
+send USR2 (starts a new master and workers from the new code alongside the
+old ones), then QUIT to the old master.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5001')}")
+
+# Processes for CPU-bound work (analytics over the snapshot), threads for requests waiting on I/O
+workers = int(os.getenv('WEB_WORKERS', str(min(multiprocessing.cpu_count(), 4))))
+threads = int(os.getenv('WEB_THREADS', '8'))
+worker_class = 'gthread'
+
+# Import the app (and load the snapshot) once in the master; workers share it copy-on-write
+preload_app = True
+
+# Open /api/stream/overview connections count against threads (at most STREAM_MAX_SUBSCRIBERS
+# per worker, see streams.py; asgi.py serves them without threads) and can stay quiet for a while
+timeout = int(os.getenv('WEB_TIMEOUT_SECONDS', '120'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT_SECONDS', '30'))
+keepalive = 5
+
+# Recycle workers now and then (jitter keeps them from restarting together)
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('WEB_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def on_starting(server):
+    if os.getenv('DATA_SOURCE', 'supabase').lower() == 'local' and workers > 1 \
+            and os.getenv('LOCAL_STORE_PATH', ':memory:') == ':memory:':
+        server.log.warning("DATA_SOURCE=local with LOCAL_STORE_PATH=:memory: gives every worker "
+                           "its own copy of the data; use a file or WEB_WORKERS=1")
+
+
+def pre_fork(server, worker):
+    import wsgi
+    wsgi.pre_fork()
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.post_fork()
@@ -0,0 +1,312 @@
+"""
+LLM calls for PULSEVO, off the request threads.
+
+Model calls run on a small dedicated thread pool (LLM_MAX_CONCURRENCY
+workers, plus at most LLM_MAX_QUEUED waiting calls), so slow generations
+cannot tie up the workers serving the dashboard endpoints. Every call has a
+deadline: the caller stops waiting when it passes (and gets LLMTimeout, so
+it can serve its fallback right away), a call still queued is cancelled,
+and a running one gets whatever is left of it as its request timeout. When
+the pool is full, calls fail fast with LLMBusy instead of queueing.
+
+stream() is the token-streaming variant: chunks are handed over as the
+model produces them, and the deadline applies to the first chunk and to
+each gap between chunks rather than to the whole generation (which only
+has to finish within LLM_STREAM_TIMEOUT_SECONDS).
+
+agenerate() and astream() are the same calls for the async serving path
+(asgi.py): they await the model's own async API on the event loop instead
+of holding a pool thread, with at most LLM_ASYNC_MAX_CONCURRENCY in flight
+per process.
+
+LLM_FAKE=true swaps Gemini for FakeModel, which answers after
+LLM_FAKE_LATENCY_SECONDS (then one word per LLM_FAKE_TOKEN_SECONDS) without
+any network access (for local testing).
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from metrics import phase
+
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+LLM_MAX_QUEUED = int(os.getenv('LLM_MAX_QUEUED', '8'))
+# Async calls hold no thread while waiting, so many more of them can be in flight
+LLM_ASYNC_MAX_CONCURRENCY = int(os.getenv('LLM_ASYNC_MAX_CONCURRENCY', '64'))
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '10'))
+# Whole-answer limit for streamed calls (their `timeout` is the gap allowed between chunks)
+LLM_STREAM_TIMEOUT_SECONDS = float(os.getenv('LLM_STREAM_TIMEOUT_SECONDS', '120'))
+# The dashboard JSON is a much longer generation
+LLM_DASHBOARD_TIMEOUT_SECONDS = float(os.getenv('LLM_DASHBOARD_TIMEOUT_SECONDS', '25'))
+
+LLM_FAKE = os.getenv('LLM_FAKE', 'false').lower() == 'true'
+LLM_FAKE_LATENCY_SECONDS = float(os.getenv('LLM_FAKE_LATENCY_SECONDS', '1.5'))
+LLM_FAKE_TOKEN_SECONDS = float(os.getenv('LLM_FAKE_TOKEN_SECONDS', '0.05'))
+
+
+class LLMError(Exception):
+    """Base class: the caller should serve its fallback"""
+
+
+class LLMUnavailable(LLMError):
+    pass
+
+
+class LLMBusy(LLMError):
+    pass
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stand-in for GenerativeModel with a configurable latency"""
+
+    def __init__(self, latency=LLM_FAKE_LATENCY_SECONDS, token_seconds=LLM_FAKE_TOKEN_SECONDS):
+        self.latency = latency
+        self.token_seconds = token_seconds
+
+    def generate_content(self, prompt, generation_config=None, request_options=None, stream=False):
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"fake model timed out after {timeout}s")
+        if (generation_config or {}).get('response_mime_type') == 'application/json':
+            text = '{}'
+        else:
+            text = f"[fake model] Answer generated from a {len(prompt):,}-character prompt."
+        words = text.split(' ')
+        chunks = (FakeResponse(word if i == 0 else ' ' + word) for i, word in enumerate(words))
+        if stream:
+            return self._stream(chunks)
+        time.sleep(self.latency + self.token_seconds * (len(words) - 1))
+        return FakeResponse(text)
+
+    def _stream(self, chunks):
+        time.sleep(self.latency)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self.token_seconds)
+            yield chunk
+
+    async def generate_content_async(self, prompt, generation_config=None, request_options=None, stream=False):
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and self.latency > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"fake model timed out after {timeout}s")
+        if (generation_config or {}).get('response_mime_type') == 'application/json':
+            text = '{}'
+        else:
+            text = f"[fake model] Answer generated from a {len(prompt):,}-character prompt."
+        words = text.split(' ')
+        chunks = [FakeResponse(word if i == 0 else ' ' + word) for i, word in enumerate(words)]
+        if stream:
+            return self._astream(chunks)
+        await asyncio.sleep(self.latency + self.token_seconds * (len(words) - 1))
+        return FakeResponse(text)
+
+    async def _astream(self, chunks):
+        await asyncio.sleep(self.latency)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(self.token_seconds)
+            yield chunk
+
+
+def load_model():
+    """FakeModel, Gemini 2.0 Flash, or None when no model is configured"""
+    if LLM_FAKE:
+        print(f"✅ Fake LLM enabled ({LLM_FAKE_LATENCY_SECONDS}s latency)")
+        return FakeModel()
+    try:
+        import google.generativeai as genai
+        gemini_api_key = os.getenv('GEMINI_API_KEY')
+        if gemini_api_key:
+            genai.configure(api_key=gemini_api_key)
+            # Using Gemini 2.0 Flash - Latest model with 1M token context window
+            model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            print("✅ Gemini 2.0 Flash initialized (1M token context)")
+            return model
+        print("⚠️  Gemini API key not found - using fallback summaries")
+    except Exception as e:
+        print(f"⚠️  Gemini not available: {e} - using fallback summaries")
+    return None
+
+
+model = load_model()
+
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix='llm')
+# Held from submission until the model call really finishes, abandoned ones included
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY + LLM_MAX_QUEUED)
+
+
+def _after_fork():
+    # A forked worker (see wsgi.py) has none of the parent's pool threads or in-flight calls
+    global _executor, _slots
+    _executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix='llm')
+    _slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY + LLM_MAX_QUEUED)
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def available():
+    return model is not None
+
+
+def _call(prompt, options, deadline):
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise LLMTimeout("Deadline passed while queued")
+    # The request itself must not outlive the caller's deadline
+    response = model.generate_content(prompt, request_options={'timeout': remaining}, **options)
+    return response.text
+
+
+def generate(prompt, timeout=LLM_TIMEOUT_SECONDS, **options):
+    """Generated text for `prompt`, or an LLMError once `timeout` seconds have passed"""
+    if model is None:
+        raise LLMUnavailable("No LLM configured")
+    if not _slots.acquire(blocking=False):
+        raise LLMBusy("Too many LLM calls in flight")
+    try:
+        future = _executor.submit(_call, prompt, options, time.monotonic() + timeout)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        with phase('llm'):
+            return future.result(timeout=timeout)
+    except FutureTimeout:
+        # Drops it if still queued; a running call ends at its own request timeout
+        future.cancel()
+        raise LLMTimeout(f"No LLM response within {timeout}s")
+
+
+_END = object()
+
+
+def stream(prompt, timeout=LLM_TIMEOUT_SECONDS, total_timeout=LLM_STREAM_TIMEOUT_SECONDS, **options):
+    """Yield text chunks as they are generated; LLMError when `timeout` passes without a new chunk"""
+    if model is None:
+        raise LLMUnavailable("No LLM configured")
+    if not _slots.acquire(blocking=False):
+        raise LLMBusy("Too many LLM calls in flight")
+
+    chunks = queue.Queue()
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            # The request deadline covers the whole answer; gaps are checked by the reader below
+            for chunk in model.generate_content(prompt, stream=True, request_options={'timeout': total_timeout},
+                                                **options):
+                if stopped.is_set():
+                    return  # the reader gave up; stop pulling from the model
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # chunk without text (e.g. only safety metadata)
+                if text:
+                    chunks.put(text)
+            chunks.put(_END)
+        except Exception as e:
+            chunks.put(e)
+
+    try:
+        future = _executor.submit(produce)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        while True:
+            try:
+                item = chunks.get(timeout=timeout)
+            except queue.Empty:
+                raise LLMTimeout(f"No LLM output within {timeout}s")
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        future.cancel()
+
+
+# Async calls in flight; only touched from the event loop thread
+_async_calls = 0
+
+
+def _reserve_async():
+    global _async_calls
+    if model is None:
+        raise LLMUnavailable("No LLM configured")
+    if _async_calls >= LLM_ASYNC_MAX_CONCURRENCY:
+        raise LLMBusy("Too many LLM calls in flight")
+    _async_calls += 1
+
+
+def _release_async():
+    global _async_calls
+    _async_calls -= 1
+
+
+async def agenerate(prompt, timeout=LLM_TIMEOUT_SECONDS, **options):
+    """generate() for the event loop"""
+    _reserve_async()
+    try:
+        response = await asyncio.wait_for(
+            model.generate_content_async(prompt, request_options={'timeout': timeout}, **options), timeout)
+        return response.text
+    except asyncio.TimeoutError:
+        raise LLMTimeout(f"No LLM response within {timeout}s")
+    finally:
+        _release_async()
+
+
+async def astream(prompt, timeout=LLM_TIMEOUT_SECONDS, total_timeout=LLM_STREAM_TIMEOUT_SECONDS, **options):
+    """stream() for the event loop"""
+    _reserve_async()
+    try:
+        deadline = time.monotonic() + total_timeout
+        try:
+            # As in stream(): the request deadline covers the whole answer, `timeout` each gap
+            response = await asyncio.wait_for(
+                model.generate_content_async(prompt, stream=True, request_options={'timeout': total_timeout},
+                                             **options),
+                min(timeout, total_timeout))
+        except asyncio.TimeoutError:
+            raise LLMTimeout(f"No LLM output within {timeout}s")
+        chunks = response.__aiter__()
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, min(timeout, remaining)))
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                if remaining < timeout:
+                    raise LLMTimeout(f"LLM answer not finished within {total_timeout}s")
+                raise LLMTimeout(f"No LLM output within {timeout}s")
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # chunk without text (e.g. only safety metadata)
+            if text:
+                yield text
+    finally:
+        _release_async()
@@ -0,0 +1,504 @@
+"""
+SQLite stand-in for the Supabase tables and aggregation functions.
+
+Holds full task and user rows, answers the query-builder subset the
+handlers use (select with count/head, eq/neq/gt/gte/lt/lte/ilike/is_,
+order, limit, range), and mirrors the RPC functions and the
+task_daily_rollups trigger defined in supabase_schema.sql, so endpoints and
+the pushdown path (task_counts.py, rollups.py) can be exercised and
+benchmarked offline:
+
+    store = LocalStore()
+    store.load(tasks=rows, users=users)
+    store.table('tasks').select('task_id, status').eq('project', 'Mobile App').execute().data
+    store.rpc('task_status_counts', {'p_start': None, 'p_end': None}).execute().data
+
+Timestamps are kept as the ISO strings Supabase returns, plus an epoch
+seconds shadow column (created_ts, ...) that range filters and ordering
+use, the same way Postgres compares timestamptz values.
+"""
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from records import NO_DATE, to_epoch
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT,
+    initials TEXT,
+    role TEXT,
+    team TEXT,
+    avatar_url TEXT,
+    is_active INTEGER DEFAULT 1,
+    created_at TEXT,
+    updated_at TEXT,
+    created_ts INTEGER,
+    updated_ts INTEGER
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    task_name TEXT,
+    description TEXT,
+    status TEXT NOT NULL,
+    priority TEXT,
+    project TEXT,
+    assigned_to TEXT,
+    created_date TEXT,
+    due_date TEXT,
+    start_date TEXT,
+    completed_date TEXT,
+    estimated_hours REAL,
+    tags TEXT,
+    blocked_reason TEXT,
+    comments TEXT,
+    updated_at TEXT,
+    created_ts INTEGER,
+    due_ts INTEGER,
+    start_ts INTEGER,
+    completed_ts INTEGER,
+    updated_ts INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_users_team ON users(team);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_ts ON tasks(created_ts);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_ts ON tasks(updated_ts);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_project ON tasks(status, project);
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_status ON tasks(assigned_to, status);
+
+-- NULL keys are stored as '' so the unique key can drive the upsert
+CREATE TABLE IF NOT EXISTS task_daily_rollups (
+    created_day TEXT NOT NULL,
+    status TEXT NOT NULL,
+    project TEXT NOT NULL,
+    assigned_to TEXT NOT NULL,
+    completed_day TEXT NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (created_day, status, project, assigned_to, completed_day)
+);
+"""
+
+_ROLLUP_KEY = """
+    IFNULL(date({row}.created_ts, 'unixepoch'), ''),
+    {row}.status,
+    IFNULL({row}.project, ''),
+    IFNULL({row}.assigned_to, ''),
+    CASE WHEN {row}.status = 'Completed' THEN IFNULL(date({row}.completed_ts, 'unixepoch'), '') ELSE '' END"""
+
+_ROLLUP_ADD = f"""
+    INSERT INTO task_daily_rollups (created_day, status, project, assigned_to, completed_day, task_count)
+    VALUES ({_ROLLUP_KEY.format(row='NEW')}, 1)
+    ON CONFLICT (created_day, status, project, assigned_to, completed_day)
+    DO UPDATE SET task_count = task_count + 1;"""
+
+_ROLLUP_REMOVE = f"""
+    UPDATE task_daily_rollups SET task_count = task_count - 1
+    WHERE (created_day, status, project, assigned_to, completed_day) = ({_ROLLUP_KEY.format(row='OLD')});"""
+
+# Same bookkeeping as the maintain_task_daily_rollups() trigger in supabase_schema.sql
+_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS task_rollups_insert AFTER INSERT ON tasks
+BEGIN {_ROLLUP_ADD}
+END;
+CREATE TRIGGER IF NOT EXISTS task_rollups_update AFTER UPDATE ON tasks
+BEGIN {_ROLLUP_REMOVE} {_ROLLUP_ADD}
+END;
+CREATE TRIGGER IF NOT EXISTS task_rollups_delete AFTER DELETE ON tasks
+BEGIN {_ROLLUP_REMOVE}
+END;
+"""
+
+# Row columns of each table, as Supabase returns them
+COLUMNS = {
+    'users': ('user_id', 'name', 'email', 'initials', 'role', 'team', 'avatar_url', 'is_active',
+              'created_at', 'updated_at'),
+    'tasks': ('task_id', 'task_name', 'description', 'status', 'priority', 'project', 'assigned_to',
+              'created_date', 'due_date', 'start_date', 'completed_date', 'estimated_hours', 'tags',
+              'blocked_reason', 'comments', 'updated_at'),
+}
+_KEYS = {'users': 'user_id', 'tasks': 'task_id'}
+# Columns that default to NOW() in supabase_schema.sql
+_NOW_DEFAULTS = {'users': ('created_at', 'updated_at'), 'tasks': ('created_date', 'updated_at')}
+
+# Timestamp columns and the epoch column that filters and ordering use instead
+_TIMESTAMPS = {
+    'users': {'created_at': 'created_ts', 'updated_at': 'updated_ts'},
+    'tasks': {'created_date': 'created_ts', 'due_date': 'due_ts', 'start_date': 'start_ts',
+              'completed_date': 'completed_ts', 'updated_at': 'updated_ts'},
+}
+
+_WINDOW = "(:p_start IS NULL OR created_ts >= :p_start) AND (:p_end IS NULL OR created_ts <= :p_end)"
+
+# SQLite versions of the functions in supabase_schema.sql
+_FUNCTIONS = {
+    'task_status_counts': f"""
+        SELECT status, COUNT(*) AS task_count FROM tasks
+        WHERE {_WINDOW} GROUP BY status""",
+    'task_project_status_counts': f"""
+        SELECT project, status, COUNT(*) AS task_count FROM tasks
+        WHERE {_WINDOW} GROUP BY project, status""",
+    'task_assignee_status_counts': f"""
+        SELECT assigned_to, status, COUNT(*) AS task_count FROM tasks
+        WHERE {_WINDOW} GROUP BY assigned_to, status""",
+    'task_daily_status_counts': f"""
+        SELECT date(created_ts, 'unixepoch') AS created_day, status, COUNT(*) AS task_count FROM tasks
+        WHERE {_WINDOW} GROUP BY created_day, status""",
+    'task_rollup_totals': """
+        SELECT status, SUM(task_count) AS task_count,
+               SUM(CASE WHEN completed_day = :p_today THEN task_count ELSE 0 END) AS completed_today
+        FROM task_daily_rollups
+        WHERE (:p_from IS NULL OR created_day >= :p_from)
+          AND (:p_to IS NULL OR (created_day != '' AND created_day < :p_to))
+        GROUP BY status""",
+    # Substring matching stands in for the full-text + trigram ranking in Postgres
+    'search_tasks': f"""
+        WITH matches AS (
+            SELECT *, CASE
+                    WHEN lower(task_name) = lower(:p_query) THEN 3.0
+                    WHEN task_name LIKE :p_query || '%' THEN 2.0
+                    WHEN task_name LIKE '%' || :p_query || '%' THEN 1.0
+                    ELSE 0.5 END AS rank
+            FROM tasks
+            WHERE (task_name LIKE '%' || :p_query || '%' OR tags LIKE '%' || :p_query || '%'
+                   OR description LIKE '%' || :p_query || '%' OR comments LIKE '%' || :p_query || '%')
+              AND (:p_status IS NULL OR status = :p_status)
+              AND (:p_project IS NULL OR project = :p_project)
+              AND (:p_assigned_to IS NULL OR assigned_to = :p_assigned_to)
+              AND (:p_priority IS NULL OR priority = :p_priority)
+              AND {_WINDOW}
+        )
+        SELECT {', '.join(COLUMNS['tasks'])}, rank FROM matches
+        WHERE :p_after_rank IS NULL OR (rank, task_id) < (:p_after_rank, :p_after_id)
+        ORDER BY rank DESC, task_id DESC
+        LIMIT COALESCE(:p_limit, -1)""",
+}
+
+_RPC_PARAMS = ('p_query', 'p_limit', 'p_after_rank', 'p_after_id', 'p_status', 'p_project',
+               'p_assigned_to', 'p_priority', 'p_from', 'p_to', 'p_today')
+
+
+def _epoch_or_none(value):
+    ts = to_epoch(value)
+    return None if ts == NO_DATE else ts
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _upsert_sql(table):
+    """INSERT ... ON CONFLICT DO UPDATE for every column, epoch shadows included
+
+    An upsert (not REPLACE) so the rollup triggers see updates as updates.
+    """
+    columns = COLUMNS[table] + tuple(_TIMESTAMPS[table].values())
+    updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != _KEYS[table])
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({_KEYS[table]}) DO UPDATE SET {updates}")
+
+
+def _row_values(table, row):
+    unknown = set(row) - set(COLUMNS[table])
+    if unknown:
+        raise ValueError(f"Unknown column '{sorted(unknown)[0]}' in table '{table}'")
+    row = dict(row)
+    for column in _NOW_DEFAULTS[table]:
+        if column not in row:
+            row[column] = _now_iso()
+    if table == 'users':
+        row['is_active'] = 1 if row.get('is_active', True) else 0
+    values = [row.get(c) for c in COLUMNS[table]]
+    values += [_epoch_or_none(row.get(c)) for c in _TIMESTAMPS[table]]
+    return values
+
+
+_OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def _split_terms(expression):
+    """Top-level comma-separated terms, keeping parentheses and quoted values intact"""
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(expression):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and char == ',' and depth == 0:
+            terms.append(expression[start:i])
+            start = i + 1
+    terms.append(expression[start:])
+    return [term.strip() for term in terms if term.strip()]
+
+
+def _as_dicts(columns, rows):
+    data = [dict(zip(columns, row)) for row in rows]
+    if 'is_active' in columns:
+        for row in data:
+            row['is_active'] = bool(row['is_active'])
+    return data
+
+
+class _Query:
+    """Table query with the supabase-py builder methods the handlers use"""
+
+    def __init__(self, store, table):
+        if table not in COLUMNS:
+            raise ValueError(f"Unknown table '{table}'")
+        self.store = store
+        self.table = table
+        self.columns = COLUMNS[table]
+        self.count = None
+        self.head = False
+        self.where = []
+        self.params = []
+        self.ordering = []
+        self.limit_rows = None
+        self.offset = 0
+        self.rows = None
+        self.deleting = False
+
+    def _column(self, column):
+        if column not in COLUMNS[self.table]:
+            raise ValueError(f"Unknown column '{column}' in table '{self.table}'")
+        return column
+
+    def _stored(self, column, value):
+        """(SQL column, parameter) a filter value is compared as: timestamps as epochs, booleans as 0/1"""
+        epoch_column = _TIMESTAMPS[self.table].get(self._column(column))
+        if epoch_column:
+            return epoch_column, _epoch_or_none(value)
+        if column == 'is_active':
+            return column, 1 if value in (True, 'true') else 0
+        return column, value
+
+    def _condition(self, column, op, value):
+        """(SQL, params) for one comparison"""
+        column, value = self._stored(column, value)
+        return f"{column} {op} ?", [value]
+
+    def _filter(self, column, op, value):
+        sql, params = self._condition(column, op, value)
+        self.where.append(sql)
+        self.params += params
+        return self
+
+    def _logic(self, expression, joiner):
+        """(SQL, params) for a PostgREST logic tree such as 'a.lt.1,and(a.eq.1,b.lt.2),a.is.null'"""
+        parts, params = [], []
+        for term in _split_terms(expression):
+            for nested, word in (('and(', 'AND'), ('or(', 'OR')):
+                if term.startswith(nested) and term.endswith(')'):
+                    sql, nested_params = self._logic(term[len(nested):-1], word)
+                    break
+            else:
+                column, op, value = term.split('.', 2)
+                if len(value) >= 2 and value[0] == value[-1] == '"':
+                    value = value[1:-1]
+                if op == 'is' and value == 'null':
+                    sql, nested_params = f"{self._stored(column, None)[0]} IS NULL", []
+                elif op in _OPERATORS:
+                    sql, nested_params = self._condition(column, _OPERATORS[op], value)
+                else:
+                    raise ValueError(f"Unsupported filter operator '{op}'")
+            parts.append(f"({sql})")
+            params += nested_params
+        return f" {joiner} ".join(parts), params
+
+    def select(self, columns='*', count=None, head=False):
+        if columns.strip() != '*':
+            self.columns = tuple(self._column(c.strip()) for c in columns.split(','))
+        self.count = count
+        self.head = head
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, '=', value)
+
+    def neq(self, column, value):
+        return self._filter(column, '!=', value)
+
+    def gt(self, column, value):
+        return self._filter(column, '>', value)
+
+    def gte(self, column, value):
+        return self._filter(column, '>=', value)
+
+    def lt(self, column, value):
+        return self._filter(column, '<', value)
+
+    def lte(self, column, value):
+        return self._filter(column, '<=', value)
+
+    def in_(self, column, values):
+        stored = [self._stored(column, value) for value in values]
+        if not stored:
+            self.where.append("0")  # matches nothing, like in.()
+            return self
+        self.where.append(f"{stored[0][0]} IN ({', '.join('?' * len(stored))})")
+        self.params += [value for _, value in stored]
+        return self
+
+    def or_(self, filters):
+        sql, params = self._logic(filters, 'OR')
+        self.where.append(f"({sql})")
+        self.params += params
+        return self
+
+    def ilike(self, column, pattern):
+        # LIKE is already case-insensitive for ASCII in SQLite
+        return self._filter(column, 'LIKE', pattern.replace('*', '%'))
+
+    def is_(self, column, value):
+        if value not in (None, 'null'):
+            raise ValueError("Only is_(column, 'null') is supported")
+        self.where.append(f"{self._stored(column, None)[0]} IS NULL")
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None):
+        column = self._stored(column, None)[0]
+        # Postgres puts NULLs first when descending, last when ascending
+        nulls_first = desc if nullsfirst is None else nullsfirst
+        self.ordering.append(f"{column} {'DESC' if desc else 'ASC'} NULLS {'FIRST' if nulls_first else 'LAST'}")
+        return self
+
+    def limit(self, count):
+        self.limit_rows = count
+        return self
+
+    def range(self, start, end):
+        self.offset = start
+        self.limit_rows = end - start + 1
+        return self
+
+    def insert(self, rows):
+        self.rows = [rows] if isinstance(rows, dict) else list(rows)
+        return self
+
+    def delete(self):
+        self.deleting = True
+        return self
+
+    def execute(self):
+        if self.rows is not None:
+            return self._insert()
+        where = f" WHERE {' AND '.join(self.where)}" if self.where else ''
+        if self.deleting:
+            return self._delete(where)
+        sql = f"SELECT {', '.join(self.columns)} FROM {self.table}{where}"
+        if self.ordering:
+            sql += f" ORDER BY {', '.join(self.ordering)}"
+        if self.limit_rows is not None or self.offset:
+            sql += f" LIMIT {-1 if self.limit_rows is None else int(self.limit_rows)} OFFSET {int(self.offset)}"
+
+        with self.store.lock:
+            count = None
+            if self.count:
+                count = self.store.conn.execute(f"SELECT COUNT(*) FROM {self.table}{where}", self.params).fetchone()[0]
+            rows = [] if self.head else self.store.conn.execute(sql, self.params).fetchall()
+
+        return SimpleNamespace(data=_as_dicts(self.columns, rows), count=count)
+
+    def _insert(self):
+        """Plain INSERT: an existing key fails, as it does through PostgREST"""
+        columns = COLUMNS[self.table] + tuple(_TIMESTAMPS[self.table].values())
+        sql = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self.store.lock, self.store.conn:
+            self.store.conn.executemany(sql, [_row_values(self.table, row) for row in self.rows])
+            keys = [row[_KEYS[self.table]] for row in self.rows]
+            data = self.store._rows(self.table, keys)
+        self.store._publish(self.table, 'INSERT', data)
+        return SimpleNamespace(data=data, count=None)
+
+    def _delete(self, where):
+        if not where:
+            raise ValueError("DELETE requires a filter")  # PostgREST refuses unfiltered deletes too
+        with self.store.lock, self.store.conn:
+            rows = self.store.conn.execute(f"SELECT {', '.join(COLUMNS[self.table])} FROM {self.table}{where}",
+                                           self.params).fetchall()
+            self.store.conn.execute(f"DELETE FROM {self.table}{where}", self.params)
+        data = _as_dicts(COLUMNS[self.table], rows)
+        self.store._publish(self.table, 'DELETE', data)
+        return SimpleNamespace(data=data, count=None)
+
+
+class _Call:
+    """Deferred RPC, executed like a supabase-py request builder"""
+
+    def __init__(self, store, sql, params, count=None, head=False):
+        self.store = store
+        self.sql = sql
+        self.params = params
+        self.count = count
+        self.head = head
+
+    def execute(self):
+        with self.store.lock:
+            count = None
+            if self.count:
+                count = self.store.conn.execute(f"SELECT COUNT(*) FROM ({self.sql})", self.params).fetchone()[0]
+            if self.head:
+                return SimpleNamespace(data=[], count=count)
+            cursor = self.store.conn.execute(self.sql, self.params)
+            columns = [col[0] for col in cursor.description]
+            data = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return SimpleNamespace(data=data, count=count)
+
+
+class LocalStore:
+    """In-process SQLite database exposing the Supabase tables and count RPCs"""
+
+    def __init__(self, path=':memory:', feed=None):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA + _TRIGGERS)
+        self.lock = threading.Lock()
+        # Optional changefeed.LocalChangeFeed, notified after every write
+        self.feed = feed
+
+    def _publish(self, table, type, rows):
+        if self.feed is not None and rows:
+            self.feed.publish(table, type)
+
+    def load(self, tasks=(), users=()):
+        """Insert or update task and user rows shaped like the Supabase tables"""
+        with self.lock, self.conn:
+            self.conn.executemany(_upsert_sql('users'), (_row_values('users', u) for u in users))
+            self.conn.executemany(_upsert_sql('tasks'), (_row_values('tasks', t) for t in tasks))
+        self._publish('users', 'UPSERT', users)
+        self._publish('tasks', 'UPSERT', tasks)
+
+    def delete(self, task_ids):
+        """Delete tasks by id"""
+        task_ids = list(task_ids)
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE task_id = ?", [(task_id,) for task_id in task_ids])
+        self._publish('tasks', 'DELETE', task_ids)
+
+    def table(self, name):
+        """Query builder for the users or tasks table"""
+        return _Query(self, name)
+
+    def rpc(self, name, params=None, count=None, head=False):
+        """Call one of the functions from supabase_schema.sql"""
+        if name not in _FUNCTIONS:
+            raise ValueError(f"Unknown function '{name}'")
+        params = params or {}
+        # Rollup bounds (p_from, p_to, p_today) are ISO dates, which compare correctly as text
+        values = {key: params.get(key) for key in _RPC_PARAMS}
+        values['p_start'] = _epoch_or_none(params.get('p_start'))
+        values['p_end'] = _epoch_or_none(params.get('p_end'))
+        return _Call(self, _FUNCTIONS[name], values, count, head)
+
+    def _rows(self, table, keys):
+        """Full rows for primary keys, in key order (call with the lock held)"""
+        rows = []
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows += self.conn.execute(
+                f"SELECT {', '.join(COLUMNS[table])} FROM {table} WHERE {_KEYS[table]} IN ({', '.join('?' * len(chunk))})",
+                chunk).fetchall()
+        by_key = {row[0]: row for row in rows}
+        return _as_dicts(COLUMNS[table], [by_key[key] for key in keys if key in by_key])
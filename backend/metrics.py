@@ -0,0 +1,263 @@
+"""
+Request metrics for PULSEVO, exposed in Prometheus text format at /api/metrics.
+
+Every request's latency is split into phases:
+
+- auth:       token verification in require_auth
+- fetch:      Supabase queries (any execute() on the instrumented client;
+              queries run side by side by fanout.gather() count once, as
+              the slowest of them)
+- llm:        waiting for the model in llm.generate()
+- serialize:  JSON encoding of the response body
+- aggregate:  everything else in the view (Python-side counting, grouping...)
+
+plus the number of rows fetched and the response size, all labelled by
+route, so the widget that burns the time under load is easy to spot.
+Work outside a request (snapshot refreshes, stream recomputes, background
+regenerations) is not attributed to any endpoint. Streamed responses are
+recorded when their body closes, so the latency covers the whole stream.
+
+Set METRICS_TOKEN to require `Authorization: Bearer <token>` on scrapes.
+"""
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTE_BUCKETS = (256, 1_024, 10_240, 102_400, 1_048_576, 10_485_760)
+
+PHASES = ('auth', 'fetch', 'llm', 'serialize')
+
+# Scrapes of the metrics endpoint itself are not recorded
+SKIP_ENDPOINTS = {'/api/metrics'}
+
+# Bearer token required to read /api/metrics (unset: open to anyone who can reach the server)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label tuple"""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, [list(counts), total, count]) for key, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_seconds = Histogram('pulsevo_request_duration_seconds', 'Request latency',
+                            ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+phase_seconds = Histogram('pulsevo_request_phase_seconds', 'Request latency by phase',
+                          ('endpoint', 'phase'), LATENCY_BUCKETS)
+rows_fetched = Histogram('pulsevo_rows_fetched', 'Rows returned by Supabase per request',
+                         ('endpoint',), ROW_BUCKETS)
+response_bytes = Histogram('pulsevo_response_bytes', 'Response body size',
+                           ('endpoint',), BYTE_BUCKETS)
+first_token_seconds = Histogram('pulsevo_chat_first_token_seconds', 'Time to the first streamed chat token',
+                                ('answered_by',), LATENCY_BUCKETS)
+query_seconds = Histogram('pulsevo_query_duration_seconds', 'Latency of each query run concurrently by fanout.gather()',
+                          ('endpoint', 'query'), LATENCY_BUCKETS)
+
+HISTOGRAMS = (request_seconds, phase_seconds, rows_fetched, response_bytes, first_token_seconds, query_seconds)
+
+# Queries run by fanout.gather() record into their own stats, merged into the request's by the caller
+_pool_thread = threading.local()
+
+
+def _current_phases():
+    """Phase totals to record into on this thread, or None"""
+    stats = getattr(_pool_thread, 'stats', None)
+    if stats is not None:
+        return stats['phases']
+    if has_request_context() and 'metrics_phases' in g:
+        return g.metrics_phases
+    return None
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to the current request's `name` phase"""
+    phases = _current_phases()
+    if phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def add_rows(count):
+    stats = getattr(_pool_thread, 'stats', None)
+    if stats is not None:
+        stats['rows'] += count
+    elif has_request_context() and 'metrics_rows' in g:
+        g.metrics_rows += count
+
+
+@contextmanager
+def collect():
+    """Record the phases and rows of the block into a fresh dict instead of the request's"""
+    stats = {'phases': {}, 'rows': 0}
+    outer = getattr(_pool_thread, 'stats', None)
+    _pool_thread.stats = stats
+    try:
+        yield stats
+    finally:
+        _pool_thread.stats = outer
+
+
+def add_phase(name, seconds):
+    """Add `seconds` to the current request's `name` phase (for time measured elsewhere)"""
+    if has_request_context() and 'metrics_phases' in g:
+        phases = g.metrics_phases
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+def observe_query(name, seconds):
+    """Record one fanned-out query's latency under the current endpoint"""
+    if has_request_context() and 'metrics_phases' in g:
+        query_seconds.observe(seconds, _endpoint(), name)
+
+
+class InstrumentedQuery:
+    """Wraps a Supabase client or query builder so every execute() counts as fetch time"""
+    __slots__ = ('_target',)
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name == 'execute':
+            return lambda *args, **kwargs: _timed_execute(attr, *args, **kwargs)
+        if callable(attr):
+            return lambda *args, **kwargs: _wrap(attr(*args, **kwargs))
+        return _wrap(attr)  # e.g. the `not_` property of a filter builder
+
+
+def _wrap(value):
+    """Keep wrapping builders (table(), select(), eq()...) so the final execute() is timed"""
+    if value is None or isinstance(value, (str, bytes, int, float, bool, list, dict, tuple)):
+        return value
+    return InstrumentedQuery(value)
+
+
+def _timed_execute(execute, *args, **kwargs):
+    with phase('fetch'):
+        response = execute(*args, **kwargs)
+    data = getattr(response, 'data', None)
+    if isinstance(data, list):
+        add_rows(len(data))
+    return response
+
+
+def instrument_client(client):
+    return InstrumentedQuery(client)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with encoding time recorded as the serialize phase"""
+
+    def dumps(self, obj, **kwargs):
+        with phase('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def _endpoint():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _start():
+    g.metrics_start = time.perf_counter()
+    g.metrics_phases = {}
+    g.metrics_rows = 0
+
+
+def _finish(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    endpoint = _endpoint()
+    if endpoint in SKIP_ENDPOINTS:
+        return response
+
+    method, status, phases = request.method, str(response.status_code), g.metrics_phases
+    if response.is_streamed:
+        # The body is generated after this hook returns: record once the server has sent all of it
+        rows = g.metrics_rows
+        response.call_on_close(lambda: _record(start, endpoint, method, status, phases, rows))
+    else:
+        _record(start, endpoint, method, status, phases, g.metrics_rows)
+        if response.content_length is not None:
+            response_bytes.observe(response.content_length, endpoint)
+    return response
+
+
+def _record(start, endpoint, method, status, phases, rows):
+    total = time.perf_counter() - start
+    request_seconds.observe(total, endpoint, method, status)
+    for name in PHASES:
+        phase_seconds.observe(phases.get(name, 0.0), endpoint, name)
+    phase_seconds.observe(max(0.0, total - sum(phases.values())), endpoint, 'aggregate')
+    rows_fetched.observe(rows, endpoint)
+
+
+def init_app(app):
+    """Time every request of `app`"""
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start)
+    app.after_request(_finish)
+
+
+def authorized(auth_header):
+    """Whether a scrape with this Authorization header may read the metrics"""
+    if METRICS_TOKEN is None:
+        return True
+    token = (auth_header or '').split(' ')[-1]
+    return hmac.compare_digest(token.encode(), METRICS_TOKEN.encode())
+
+
+def render():
+    """All metrics in Prometheus text exposition format"""
+    return '\n'.join(h.render() for h in HISTOGRAMS) + '\n'
@@ -0,0 +1,89 @@
+"""
+Keyset pagination and field projection helpers for /api/tasks.
+
+Pages are ordered by (created_date DESC, task_id DESC), or by
+(rank DESC, task_id DESC) for search results. The cursor is an opaque
+base64 token holding the sort key of the last row of the previous page, so
+fetching page N costs the same as page 1 (no OFFSET scan) and rows
+inserted meanwhile never shift or duplicate entries.
+"""
+import base64
+import json
+import re
+from datetime import datetime
+
+TASK_FIELDS = ('task_id', 'task_name', 'description', 'status', 'priority', 'project', 'assigned_to',
+               'created_date', 'due_date', 'start_date', 'completed_date', 'estimated_hours', 'tags',
+               'blocked_reason', 'comments', 'updated_at')
+
+# Columns every paginated query needs to build the next cursor
+KEYSET_FIELDS = ('created_date', 'task_id')
+
+# Cursor values end up inside PostgREST filter strings, so only well-formed ones are accepted
+TASK_ID_PATTERN = re.compile(r'TASK-\d+')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def parse_fields(value):
+    """Validated list of requested columns (None means every column)"""
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def parse_limit(value):
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(row, key='created_date'):
+    raw = json.dumps([row.get(key), row.get('task_id')], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value, ranked=False):
+    """(created_date, task_id) from a cursor token, or (rank, task_id) when ranked"""
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        sort_value, task_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(task_id, str) or not TASK_ID_PATTERN.fullmatch(task_id):
+        raise ValueError("Invalid cursor")
+    if ranked:
+        if not isinstance(sort_value, (int, float)) or isinstance(sort_value, bool):
+            raise ValueError("Invalid cursor")
+    elif sort_value is not None:
+        # Re-emitted in canonical form: nothing from the client reaches the or=() string verbatim
+        try:
+            sort_value = datetime.fromisoformat(sort_value).isoformat()
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+    return sort_value, task_id
+
+
+def after_cursor(query, cursor):
+    """Restrict a query ordered by (created_date DESC, task_id DESC) to rows after the cursor"""
+    created_date, task_id = cursor
+    if created_date is None:
+        # NULL created dates sort last; keep paging through them by task_id
+        return query.is_('created_date', 'null').lt('task_id', task_id)
+    # Values are quoted so timestamps survive PostgREST's or=() syntax
+    return query.or_(
+        f'created_date.lt."{created_date}",'
+        f'and(created_date.eq."{created_date}",task_id.lt."{task_id}"),'
+        f'created_date.is.null'
+    )
@@ -0,0 +1,67 @@
+"""
+Parse-once typed task records for PULSEVO.
+
+Supabase returns every timestamp as an ISO string. Instead of calling
+`datetime.fromisoformat` each time a field is compared, rows are normalized
+once into compact `__slots__` records holding epoch seconds and interned
+enum strings; every endpoint then works with plain integer comparisons.
+"""
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Epoch value stored for NULL timestamps (sorts before every real date)
+NO_DATE = -(1 << 62)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SECOND = timedelta(seconds=1)
+
+
+def to_epoch(value):
+    """Convert an ISO timestamp from Supabase to epoch seconds (NO_DATE if empty)"""
+    if not value:
+        return NO_DATE
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    # timedelta floor division stays in C and is cheaper than .timestamp()
+    return (parsed - _EPOCH) // _SECOND
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+class TaskRecord:
+    """One task with pre-parsed timestamps (epoch seconds, NO_DATE when missing)"""
+    __slots__ = ('task_id', 'task_name', 'status', 'priority', 'project', 'assigned_to',
+                 'tags', 'created', 'due', 'started', 'completed', 'updated', 'updated_at')
+
+    def __init__(self, row):
+        get = row.get
+        self.task_id = get('task_id')
+        self.task_name = get('task_name')
+        self.status = _intern(get('status'))
+        self.priority = _intern(get('priority'))
+        self.project = _intern(get('project'))
+        self.assigned_to = _intern(get('assigned_to'))
+        self.tags = get('tags')
+        self.created = to_epoch(get('created_date'))
+        self.due = to_epoch(get('due_date'))
+        self.started = to_epoch(get('start_date'))
+        self.completed = to_epoch(get('completed_date'))
+        # Raw string kept as the watermark for incremental snapshot refreshes
+        self.updated_at = get('updated_at')
+        self.updated = to_epoch(self.updated_at)
+
+    def __repr__(self):
+        return f"TaskRecord({self.task_id!r}, status={self.status!r})"
+
+
+def normalize_task(row):
+    """Turn one Supabase task row into a TaskRecord"""
+    return TaskRecord(row)
+
+
+def normalize_tasks(rows):
+    """Turn a list of Supabase task rows into TaskRecords"""
+    return [TaskRecord(row) for row in rows]
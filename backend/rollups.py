@@ -0,0 +1,101 @@
+"""
+Period metrics from the trigger-maintained task_daily_rollups table.
+
+Whole UTC days inside a window are summed in Postgres by
+task_rollup_totals() (a few hundred rollup rows at most). Only the partial
+days at either edge of the window are read as task rows, so a period
+comparison never scans the tasks table.
+"""
+from datetime import datetime, timezone
+
+from aggregations import STATUS_CODES
+from analytics import period_metrics as snapshot_period_metrics
+from bulk_reads import read_all
+from database import get_supabase
+from snapshot import BLOCKED, COMPLETED, IN_PROGRESS, OPEN, SECONDS_PER_DAY, SNAPSHOT_COLUMNS, TaskSnapshot
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _date(day):
+    return datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).date().isoformat()
+
+
+def _edge_rows(start, end, end_inclusive):
+    def where(query):
+        query = query.gte('created_date', _iso(start))
+        return query.lte('created_date', _iso(end)) if end_inclusive else query.lt('created_date', _iso(end))
+    return read_all('tasks', SNAPSHOT_COLUMNS, where)
+
+
+def _completed_since(hour_ago, first_day, last_day):
+    # Rollups only know the completed day, so the last-hour count is a head-only query
+    query = get_supabase().table('tasks').select('task_id', count='exact', head=True) \
+        .eq('status', 'Completed').gte('completed_date', _iso(hour_ago))
+    if first_day is not None:
+        query = query.gte('created_date', _iso(first_day * SECONDS_PER_DAY))
+    if last_day is not None:
+        query = query.lt('created_date', _iso(last_day * SECONDS_PER_DAY))
+    return query.execute().count or 0
+
+
+def period_metrics(window, today, hour_ago):
+    """analytics.period_metrics() for a (start, end, end_inclusive) window, read from the rollups"""
+    start, end, end_inclusive = window
+    # Whole days [first_day, last_day) come from the rollups, the rest from task rows
+    first_day = None if start is None else -(-start // SECONDS_PER_DAY)
+    last_day = None if end is None else end // SECONDS_PER_DAY
+
+    counts = [0] * len(STATUS_CODES)
+    total = completed_today = completed_this_hour = 0
+    edges = []
+    if first_day is not None and last_day is not None and first_day >= last_day:
+        # Window shorter than a day boundary to boundary: read it directly
+        edges.append((start, end, end_inclusive))
+    else:
+        rows = get_supabase().rpc('task_rollup_totals', {
+            'p_from': None if first_day is None else _date(first_day),
+            'p_to': None if last_day is None else _date(last_day),
+            'p_today': _date(today),
+        }).execute().data
+        for row in rows:
+            total += row['task_count']
+            code = STATUS_CODES.get(row['status'])
+            if code is not None:
+                counts[code] += row['task_count']
+            if code == COMPLETED:
+                completed_today += row['completed_today']
+        completed_this_hour = _completed_since(hour_ago, first_day, last_day)
+
+        if start is not None and start < first_day * SECONDS_PER_DAY:
+            edges.append((start, first_day * SECONDS_PER_DAY, False))
+        if end is not None and (end_inclusive or end > last_day * SECONDS_PER_DAY):
+            edges.append((last_day * SECONDS_PER_DAY, end, end_inclusive))
+
+    edge_rows = []
+    for edge in edges:
+        edge_rows.extend(_edge_rows(*edge))
+    if edge_rows:
+        snapshot = TaskSnapshot.from_rows(edge_rows)
+        edge = snapshot_period_metrics(snapshot, snapshot.window(), today, hour_ago)
+        total += edge['total']
+        counts[OPEN] += edge['open']
+        counts[IN_PROGRESS] += edge['in_progress']
+        counts[COMPLETED] += edge['completed']
+        counts[BLOCKED] += edge['blocked']
+        completed_today += edge['completed_today']
+        completed_this_hour += edge['completed_this_hour']
+
+    completed = counts[COMPLETED]
+    return {
+        'total': total,
+        'open': counts[OPEN],
+        'in_progress': counts[IN_PROGRESS],
+        'completed': completed,
+        'blocked': counts[BLOCKED],
+        'completed_today': completed_today,
+        'completed_this_hour': completed_this_hour,
+        'completion_rate': round((completed / total * 100), 1) if total > 0 else 0
+    }
@@ -3,6 +3,7 @@ Generate realistic sample data for PULSEVO dashboard using Supabase
 """
 import os
 import sys
+from bulk_reads import read_all
 from database import init_db, get_supabase
 from flask import Flask
 from datetime import datetime, timedelta
@@ -108,8 +109,7 @@ def generate_tasks():
     supabase = get_supabase()
     
     # Get all users
-    users_response = supabase.table('users').select('user_id').execute()
-    user_ids = [user['user_id'] for user in users_response.data]
+    user_ids = [user['user_id'] for user in read_all('users', 'user_id')]
     
     # Expanded task templates with more variety
     task_templates = [
@@ -283,8 +283,8 @@ def generate_tasks():
     print(f"✅ Created {len(tasks)} tasks with realistic time ranges")
     
     # Print statistics
-    tasks_response = supabase.table('tasks').select('status').execute()
-    all_tasks = tasks_response.data
+    # Read in pages: a single select stops at PostgREST's max-rows (1000 by default)
+    all_tasks = read_all('tasks', 'status')
     
     print("\n📊 Task Statistics:")
     print(f"   Open: {sum(1 for t in all_tasks if t['status'] == 'Open')}")
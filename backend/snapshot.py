@@ -0,0 +1,373 @@
+"""
+In-memory columnar snapshot of the tasks table for PULSEVO analytics.
+
+Dashboard endpoints read from one shared snapshot instead of pulling the
+whole tasks table from Supabase on every request. Low-cardinality fields
+(status, priority, project, assignee) are dictionary-encoded into small
+ints and timestamps are stored as epoch seconds, one array per column.
+
+The snapshot is immutable once published. Refreshes fetch only rows whose
+`updated_at` moved past the last watermark, build a new snapshot and swap
+it in with a single reference assignment, so readers never see a partial
+update.
+"""
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+from bulk_reads import iter_rows, read_all
+from database import get_supabase
+from records import NO_DATE, TaskRecord, normalize_tasks
+
+# Status / priority codes are fixed so analytics can compare against constants
+STATUSES = ('Open', 'In Progress', 'Completed', 'Blocked')
+PRIORITIES = ('High', 'Medium', 'Low')
+OPEN, IN_PROGRESS, COMPLETED, BLOCKED = range(len(STATUSES))
+
+SECONDS_PER_DAY = 86400
+
+REFRESH_INTERVAL = float(os.getenv('TASK_SNAPSHOT_REFRESH_SECONDS', '5'))
+# Refreshes re-read rows updated this long before the watermark: a transaction that started
+# earlier can commit an older updated_at after a newer one was already seen
+REFRESH_OVERLAP_SECONDS = int(os.getenv('TASK_SNAPSHOT_REFRESH_OVERLAP_SECONDS', '60'))
+
+# Disable to keep no shared copy of the table in memory (each request then reads Supabase)
+SNAPSHOT_ENABLED = os.getenv('TASK_SNAPSHOT_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+# Keep task names and tags in the snapshot for the typeahead index (task_search.py)
+SEARCH_INDEX_ENABLED = os.getenv('TASK_SEARCH_INDEX_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+SNAPSHOT_COLUMNS = ('task_id, status, priority, project, assigned_to, '
+                    'created_date, due_date, start_date, completed_date, updated_at'
+                    + (', task_name, tags' if SEARCH_INDEX_ENABLED else ''))
+
+# Per-task columns, and everything with_changes() shares with the previous snapshot until it changes
+COLUMNS = ('status', 'priority', 'project', 'assignee', 'created', 'due', 'started', 'completed', 'updated')
+SHARED_FIELDS = COLUMNS + ('task_ids', 'positions', 'names', 'tags', 'statuses', 'priorities', 'projects', 'assignees')
+
+
+class Dictionary:
+    """Maps repeated string values to dense integer codes"""
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def copy(self):
+        return Dictionary(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class TaskSnapshot:
+    """Column-oriented, read-only view of every task"""
+
+    def __init__(self):
+        self.task_ids = []
+        self.positions = {}
+        self.status = array('b')
+        self.priority = array('b')
+        self.project = array('i')
+        self.assignee = array('i')
+        self.created = array('q')
+        self.due = array('q')
+        self.started = array('q')
+        self.completed = array('q')
+        self.updated = array('q')
+        # Only filled when SEARCH_INDEX_ENABLED
+        self.names = []
+        self.tags = []
+
+        self.statuses = Dictionary(STATUSES)
+        self.priorities = Dictionary(PRIORITIES)
+        self.projects = Dictionary()
+        self.assignees = Dictionary()
+
+        # Positions ordered by created date, for bisecting date windows
+        self.by_created = array('i')
+        self.created_sorted = array('q')
+
+        self.watermark = None
+        self.watermark_epoch = NO_DATE
+        self.loaded_at = 0.0
+        self._search_index = None
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a snapshot from task rows (any iterable, consumed as it is read)"""
+        snapshot = cls()
+        for row in rows:
+            snapshot._upsert(TaskRecord(row))
+        snapshot._reindex()
+        return snapshot
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    def with_changes(self, rows):
+        """Return a new snapshot with changed rows applied (self is left untouched)
+
+        Rows whose updated_at already matches the snapshot are skipped, and
+        self comes back when nothing is left. Only the columns, dictionaries
+        and created-date index the changes touch are copied; everything else
+        is shared with self.
+        """
+        positions = self.positions
+        records = [record for record in normalize_tasks(rows)
+                   if record.task_id not in positions or self.updated[positions[record.task_id]] != record.updated]
+        if not records:
+            return self
+
+        touched = set()
+        for record in records:
+            pos = positions.get(record.task_id)
+            if pos is None:
+                touched.update(COLUMNS + ('task_ids', 'positions'))
+            for name, dictionary, value in self._fields(record):
+                if dictionary is not None:
+                    code = getattr(self, dictionary).codes.get(value)
+                    if code is None:
+                        touched.update((name, dictionary))
+                        continue
+                    value = code
+                if pos is None or getattr(self, name)[pos] != value:
+                    touched.add(name)
+            if SEARCH_INDEX_ENABLED and (pos is None or self.names[pos] != record.task_name
+                                         or self.tags[pos] != record.tags):
+                touched.update(('names', 'tags'))
+
+        snapshot = TaskSnapshot()
+        for name in SHARED_FIELDS:
+            value = getattr(self, name)
+            if name in touched:
+                value = value[:] if isinstance(value, array) else value.copy()
+            setattr(snapshot, name, value)
+        snapshot.watermark = self.watermark
+        snapshot.watermark_epoch = self.watermark_epoch
+
+        for record in records:
+            snapshot._upsert(record)
+        if 'created' in touched:
+            snapshot._reindex()
+        else:
+            snapshot.by_created = self.by_created
+            snapshot.created_sorted = self.created_sorted
+            snapshot.loaded_at = time.time()
+        return snapshot
+
+    def _fields(self, record):
+        """(column, dictionary or None, raw value) for each column of a record"""
+        return (
+            ('status', 'statuses', record.status),
+            ('priority', 'priorities', record.priority),
+            ('project', 'projects', record.project),
+            ('assignee', 'assignees', record.assigned_to),
+            ('created', None, record.created),
+            ('due', None, record.due),
+            ('started', None, record.started),
+            ('completed', None, record.completed),
+            ('updated', None, record.updated),
+        )
+
+    def _upsert(self, record):
+        values = (
+            self.statuses.encode(record.status),
+            self.priorities.encode(record.priority),
+            self.projects.encode(record.project),
+            self.assignees.encode(record.assigned_to),
+            record.created,
+            record.due,
+            record.started,
+            record.completed,
+            record.updated,
+        )
+        columns = (self.status, self.priority, self.project, self.assignee,
+                   self.created, self.due, self.started, self.completed, self.updated)
+
+        task_id = record.task_id
+        pos = self.positions.get(task_id)
+        if pos is None:
+            self.positions[task_id] = len(self.task_ids)
+            self.task_ids.append(task_id)
+            for column, value in zip(columns, values):
+                column.append(value)
+            if SEARCH_INDEX_ENABLED:
+                self.names.append(record.task_name)
+                self.tags.append(record.tags)
+        else:
+            for column, value in zip(columns, values):
+                column[pos] = value
+            if SEARCH_INDEX_ENABLED:
+                self.names[pos] = record.task_name
+                self.tags[pos] = record.tags
+
+        updated = values[-1]
+        if updated > self.watermark_epoch:
+            self.watermark_epoch = updated
+            self.watermark = record.updated_at
+
+    def _reindex(self):
+        created = self.created
+        order = sorted(range(len(created)), key=created.__getitem__)
+        self.by_created = array('i', order)
+        self.created_sorted = array('q', (created[pos] for pos in order))
+        self.loaded_at = time.time()
+
+    def records(self):
+        """Every task as a TaskRecord (task names and tags only when SEARCH_INDEX_ENABLED)"""
+        statuses, priorities = self.statuses.values, self.priorities.values
+        projects, assignees = self.projects.values, self.assignees.values
+        records = []
+        for pos, task_id in enumerate(self.task_ids):
+            record = TaskRecord.__new__(TaskRecord)
+            record.task_id = task_id
+            record.task_name = self.names[pos] if SEARCH_INDEX_ENABLED else None
+            record.tags = self.tags[pos] if SEARCH_INDEX_ENABLED else None
+            record.status = statuses[self.status[pos]]
+            record.priority = priorities[self.priority[pos]]
+            record.project = projects[self.project[pos]]
+            record.assigned_to = assignees[self.assignee[pos]]
+            record.created = self.created[pos]
+            record.due = self.due[pos]
+            record.started = self.started[pos]
+            record.completed = self.completed[pos]
+            record.updated = self.updated[pos]
+            record.updated_at = None
+            records.append(record)
+        return records
+
+    def search_index(self):
+        """Typeahead index over names and tags, built on first use"""
+        index = self._search_index
+        if index is None:
+            from task_search import TaskSearchIndex
+            index = self._search_index = TaskSearchIndex(self)
+        return index
+
+    def window(self, start=None, end=None, end_inclusive=True):
+        """Positions of tasks whose created date falls inside [start, end] (epoch seconds)"""
+        if start is None and end is None:
+            return range(len(self.task_ids))
+
+        lo = 0 if start is None else bisect_left(self.created_sorted, start)
+        if end is None:
+            hi = len(self.created_sorted)
+        elif end_inclusive:
+            hi = bisect_right(self.created_sorted, end)
+        else:
+            hi = bisect_left(self.created_sorted, end)
+
+        if start is None:
+            # Tasks without a created date never match a bounded window
+            lo = bisect_right(self.created_sorted, NO_DATE)
+        return self.by_created[lo:hi]
+
+
+class SnapshotStore:
+    """Holds the current snapshot and refreshes it incrementally from Supabase"""
+
+    def __init__(self, refresh_interval=REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        # Set by the change feed: the next reader waits for a refresh instead of serving old data
+        self._dirty = False
+
+    def get(self):
+        """Return the current snapshot, refreshing it if it has gone stale"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load_full()
+                return self._snapshot
+
+        if self._dirty:
+            with self._refresh_lock:
+                if self._dirty:
+                    self._dirty = False
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        print(f"⚠️  Task snapshot refresh failed: {e}")
+            return self._snapshot
+
+        if time.time() - snapshot.loaded_at >= self.refresh_interval:
+            # Only one request refreshes; the rest keep serving the current snapshot
+            if self._refresh_lock.acquire(blocking=False):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"⚠️  Task snapshot refresh failed: {e}")
+                finally:
+                    self._refresh_lock.release()
+        return self._snapshot
+
+    def refresh(self):
+        """Pull rows changed since the watermark and publish a new snapshot"""
+        current = self._snapshot
+        if current is None or current.watermark is None:
+            self._snapshot = self._load_full()
+            return self._snapshot
+
+        supabase = get_supabase()
+        since = datetime.fromtimestamp(current.watermark_epoch - REFRESH_OVERLAP_SECONDS, timezone.utc).isoformat()
+        changed = read_all('tasks', SNAPSHOT_COLUMNS, lambda query: query.gte('updated_at', since))
+        # Rows already in the snapshot are dropped, so usually this is `current` itself
+        updated = current.with_changes(changed)
+
+        # updated_at cannot reveal deletes, so compare the row count as well
+        count = supabase.table('tasks').select('task_id', count='exact', head=True).execute().count
+        if count is not None and count != len(updated):
+            updated = self._load_full()
+
+        if updated is current:
+            current.loaded_at = time.time()
+        self._snapshot = updated
+        return updated
+
+    def invalidate(self):
+        """Force the next get() to refresh"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            snapshot.loaded_at = 0.0
+
+    def attach(self, feed):
+        """Refresh before the next read whenever `feed` reports a task change"""
+        def on_change(change):
+            if change.table in (None, 'tasks') and self._snapshot is not None:
+                self._dirty = True
+        feed.subscribe(on_change)
+
+    def _load_full(self):
+        snapshot = load_snapshot()
+        print(f"✅ Task snapshot loaded ({len(snapshot)} tasks)")
+        return snapshot
+
+
+def load_snapshot():
+    """Fetch the tasks table and build a fresh snapshot from it"""
+    return TaskSnapshot.from_rows(iter_rows('tasks', SNAPSHOT_COLUMNS))
+
+
+task_snapshot = SnapshotStore()
+
+
+def get_task_snapshot():
+    """Get the shared task snapshot (a per-request one when sharing is disabled)"""
+    if not SNAPSHOT_ENABLED:
+        return load_snapshot()
+    return task_snapshot.get()
@@ -0,0 +1,260 @@
+"""
+Server-sent event fan-out for live dashboards.
+
+Subscribers with the same filter share one channel, and each channel is
+recomputed once per change no matter how many dashboards are listening.
+A background thread recomputes dirty channels when the change feed reports
+a task/user change (bursts are coalesced), and periodically for the
+time-relative numbers. Each subscriber first gets a full `snapshot` event,
+then `delta` events carrying only the sections whose JSON changed.
+
+events() is drained by a request thread; aevents() by a coroutine on the
+event loop of the async serving path (asgi.py), so an open dashboard there
+holds no thread. Thread-held streams are capped per process (reserve()),
+so open dashboards cannot take every request thread of a worker; clients
+turned away fall back to polling.
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+
+STREAM_REFRESH_SECONDS = float(os.getenv('STREAM_REFRESH_SECONDS', '10'))  # without a live change feed
+STREAM_IDLE_REFRESH_SECONDS = 60  # with a live feed: only time-relative metrics move
+STREAM_DEBOUNCE_SECONDS = 0.25
+KEEPALIVE_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 16
+# events() streams per process, each holding a request thread while open (0: no limit);
+# by default half of a gunicorn worker's WEB_THREADS
+STREAM_MAX_SUBSCRIBERS = int(os.getenv('STREAM_MAX_SUBSCRIBERS',
+                                       str(max(1, int(os.getenv('WEB_THREADS', '8')) // 2))))
+
+
+def sse_event(event, data):
+    """Format one server-sent event (data is already-serialized JSON)"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    """One open stream; the request thread drains `queue`"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.primed = False
+        self.closed = False
+
+    def send(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Too slow to keep up: end the stream, the client reconnects and gets a fresh snapshot
+            self.closed = True
+            self.queue = queue.Queue()
+            self.queue.put(None)
+
+
+class AsyncSubscriber(Subscriber):
+    """One open stream drained by a coroutine; the hub thread hands messages over to its loop"""
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def send(self, message):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.closed = True
+            self.queue = asyncio.Queue()
+            self.queue.put_nowait(None)
+
+
+class Channel:
+    """Latest payload for one filter, split into JSON-encoded sections"""
+
+    def __init__(self, key):
+        self.key = key
+        self.subscribers = set()
+        self.sections = None
+        self.dirty = True
+        self.computed_at = 0.0
+
+
+class StreamHub:
+    """Shares one computation per filter key among all subscribers"""
+
+    def __init__(self, compute, tables=('tasks', 'users')):
+        self.compute = compute
+        self.tables = tables
+        self.feed = None
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._threaded = 0
+
+    def attach(self, feed):
+        """Recompute channels whenever `feed` reports a change to one of our tables"""
+        self.feed = feed
+        feed.subscribe(self._on_change)
+
+    def _on_change(self, change):
+        if change.table is None or change.table in self.tables:
+            with self._lock:
+                for channel in self._channels.values():
+                    channel.dirty = True
+            self._wake.set()
+
+    def subscribe(self, key, subscriber_class=Subscriber):
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = Channel(key)
+            subscriber = subscriber_class(channel)
+            channel.subscribers.add(subscriber)
+            if channel.sections is not None:
+                subscriber.send(sse_event('snapshot', self._join(channel.sections)))
+                subscriber.primed = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stream-hub', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return subscriber
+
+    def reserve(self):
+        """Claim a slot for one events() stream; False when STREAM_MAX_SUBSCRIBERS are open"""
+        with self._lock:
+            if STREAM_MAX_SUBSCRIBERS and self._threaded >= STREAM_MAX_SUBSCRIBERS:
+                return False
+            self._threaded += 1
+            return True
+
+    def release(self):
+        """Give back a slot claimed by reserve()"""
+        with self._lock:
+            self._threaded -= 1
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            channel = subscriber.channel
+            channel.subscribers.discard(subscriber)
+            if not channel.subscribers and self._channels.get(channel.key) is channel:
+                del self._channels[channel.key]
+
+    def after_fork(self):
+        """A forked worker starts with no subscribers and no refresh thread"""
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._threaded = 0
+
+    def _refresh_interval(self):
+        live = self.feed is not None and self.feed.connected
+        return STREAM_IDLE_REFRESH_SECONDS if live else STREAM_REFRESH_SECONDS
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self._refresh_interval())
+            self._wake.clear()
+            # Coalesce a burst of changes into one recomputation
+            time.sleep(STREAM_DEBOUNCE_SECONDS)
+            with self._lock:
+                channels = list(self._channels.values())
+            for channel in channels:
+                try:
+                    self._update(channel)
+                except Exception as e:
+                    print(f"⚠️  Stream update failed for {channel.key}: {e}")
+                    self._fail(channel, e)
+
+    def _update(self, channel):
+        stale = time.monotonic() - channel.computed_at >= self._refresh_interval()
+        if not (channel.dirty or stale or channel.sections is None):
+            # Nothing new; just prime late joiners from the cached payload
+            self._broadcast(channel, sse_event('snapshot', self._join(channel.sections)), unprimed_only=True)
+            return
+
+        channel.dirty = False
+        payload = self.compute(channel.key)
+        sections = {name: json.dumps(value) for name, value in payload.items()}
+        previous = channel.sections or {}
+        changed = {name: data for name, data in sections.items() if previous.get(name) != data}
+        channel.sections = sections
+        channel.computed_at = time.monotonic()
+
+        snapshot = sse_event('snapshot', self._join(sections))
+        delta = sse_event('delta', self._join(changed)) if changed else None
+        with self._lock:
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            if not subscriber.primed:
+                subscriber.send(snapshot)
+                subscriber.primed = True
+            elif delta:
+                subscriber.send(delta)
+
+    def _broadcast(self, channel, message, unprimed_only=False):
+        with self._lock:
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            if unprimed_only and subscriber.primed:
+                continue
+            subscriber.send(message)
+            subscriber.primed = True
+
+    def _fail(self, channel, error):
+        """Report an error to subscribers still waiting for their first payload and end their streams"""
+        message = sse_event('error', json.dumps({'error': str(error)}))
+        with self._lock:
+            subscribers = [s for s in channel.subscribers if not s.primed]
+        for subscriber in subscribers:
+            subscriber.send(message)
+            subscriber.send(None)
+
+    @staticmethod
+    def _join(sections):
+        return '{' + ','.join(f'{json.dumps(name)}:{data}' for name, data in sections.items()) + '}'
+
+    def events(self, key):
+        """Generator of SSE text for one subscriber, ending when the client disconnects"""
+        subscriber = self.subscribe(key)
+        try:
+            yield f"retry: {KEEPALIVE_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    message = subscriber.queue.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def aevents(self, key):
+        """events() for a coroutine"""
+        subscriber = self.subscribe(key, AsyncSubscriber)
+        try:
+            yield f"retry: {KEEPALIVE_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
@@ -0,0 +1,103 @@
+"""
+Grouped task counts for the count-only endpoints.
+
+With the shared snapshot enabled the counts come from memory. Without it
+(TASK_SNAPSHOT_ENABLED=false, e.g. many small workers that should not each
+hold a copy of the table) the GROUP BY is pushed down to the Postgres
+functions in supabase_schema.sql, so only a few dozen count rows cross the
+wire instead of one row per task. Period metrics for the overview are
+summed from the task_daily_rollups table (see rollups.py).
+"""
+from datetime import datetime, timezone
+
+from aggregations import STATUS_CODES, empty_counts, group_by_assignee, group_by_project
+from analytics import filtered_rows, overview_windows, period_metrics as snapshot_period_metrics, status_counts
+from bulk_reads import iter_rows
+from database import get_supabase
+from fanout import gather
+from snapshot import SNAPSHOT_COLUMNS, SNAPSHOT_ENABLED, TaskSnapshot, get_task_snapshot, load_snapshot
+import rollups
+
+
+def _rpc(name, start_date=None, end_date=None):
+    # Same rule as the endpoints: the created_date filter needs both bounds
+    if not (start_date and end_date):
+        start_date = end_date = None
+    return get_supabase().rpc(name, {'p_start': start_date, 'p_end': end_date}).execute().data
+
+
+def _grouped(name, key, start_date, end_date):
+    groups = {}
+    for row in _rpc(name, start_date, end_date):
+        code = STATUS_CODES.get(row['status'])
+        if row[key] is None or code is None:
+            continue
+        counts = groups.get(row[key])
+        if counts is None:
+            counts = groups[row[key]] = empty_counts()
+        counts[code] += row['task_count']
+    return groups
+
+
+def by_status(start_date=None, end_date=None):
+    """Task counts per status code"""
+    if SNAPSHOT_ENABLED:
+        snapshot = get_task_snapshot()
+        return status_counts(snapshot, filtered_rows(snapshot, start_date, end_date))
+
+    counts = empty_counts()
+    for row in _rpc('task_status_counts', start_date, end_date):
+        code = STATUS_CODES.get(row['status'])
+        if code is not None:
+            counts[code] += row['task_count']
+    return counts
+
+
+def by_project(start_date=None, end_date=None):
+    """{project: status counts}"""
+    if SNAPSHOT_ENABLED:
+        snapshot = get_task_snapshot()
+        return group_by_project(snapshot, filtered_rows(snapshot, start_date, end_date))
+    return _grouped('task_project_status_counts', 'project', start_date, end_date)
+
+
+def by_assignee(start_date=None, end_date=None):
+    """{user_id: status counts}"""
+    if SNAPSHOT_ENABLED:
+        snapshot = get_task_snapshot()
+        return group_by_assignee(snapshot, filtered_rows(snapshot, start_date, end_date))
+    return _grouped('task_assignee_status_counts', 'assigned_to', start_date, end_date)
+
+
+def period_metrics(current_window, previous_window, today, hour_ago):
+    """Overview metrics for the current and previous (start, end, end_inclusive) windows"""
+    if SNAPSHOT_ENABLED:
+        snapshot = get_task_snapshot()
+        return (snapshot_period_metrics(snapshot, snapshot.window(*current_window), today, hour_ago),
+                snapshot_period_metrics(snapshot, snapshot.window(*previous_window), today, hour_ago))
+    # Independent rollup reads: fetch both periods at once
+    results = gather(current=lambda: rollups.period_metrics(current_window, today, hour_ago),
+                     previous=lambda: rollups.period_metrics(previous_window, today, hour_ago))
+    return results['current'], results['previous']
+
+
+def dashboard_snapshot(start_date=None, end_date=None):
+    """Snapshot holding every task the dashboard bundle needs, from one bulk read
+
+    That is the filtered window plus the equally long period before it (for
+    the overview comparison), or every task in "All" mode.
+    """
+    if SNAPSHOT_ENABLED:
+        return get_task_snapshot()
+
+    current, previous = overview_windows(start_date, end_date)
+    if current[0] is None:
+        return load_snapshot()
+    first = min(current[0], previous[0])
+    # Epochs are whole seconds, so include the whole last second of the window
+    last = current[1] + 1
+
+    def window(query):
+        return query.gte('created_date', datetime.fromtimestamp(first, timezone.utc).isoformat()) \
+            .lt('created_date', datetime.fromtimestamp(last, timezone.utc).isoformat())
+    return TaskSnapshot.from_rows(iter_rows('tasks', SNAPSHOT_COLUMNS, window))
@@ -0,0 +1,122 @@
+"""
+Task search for PULSEVO.
+
+Full searches go through the search_tasks() function in supabase_schema.sql:
+ranked full-text matching over task_name, tags, description and comments,
+plus trigram (fuzzy / substring) matching on task_name, all index-backed.
+
+For typeahead, an optional in-process inverted index is built over the task
+snapshot (TASK_SEARCH_INDEX_ENABLED=true): token -> positions, with a sorted
+token list so partially typed words are matched as prefixes.
+"""
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+
+from database import get_supabase
+from snapshot import SEARCH_INDEX_ENABLED, SNAPSHOT_ENABLED, get_task_snapshot
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Typeahead stops collecting candidates past this many matches
+MAX_CANDIDATES = 2000
+
+
+def _params(query, filters, start_date, end_date):
+    filters = filters or {}
+    params = {'p_query': query}
+    for name in ('status', 'project', 'assigned_to', 'priority'):
+        params[f'p_{name}'] = filters.get(name) or None
+    # Same rule as the endpoints: the created_date filter needs both bounds
+    if start_date and end_date:
+        params['p_start'] = start_date
+        params['p_end'] = end_date
+    return params
+
+
+def search_tasks(query, filters=None, start_date=None, end_date=None, limit=None, after=None):
+    """Ranked task rows (each with a 'rank') for a search query; `after` is a (rank, task_id) cursor"""
+    params = _params(query, filters, start_date, end_date)
+    params['p_limit'] = limit
+    if after is not None:
+        params['p_after_rank'], params['p_after_id'] = after
+    return get_supabase().rpc('search_tasks', params).execute().data
+
+
+def count_matches(query, filters=None, start_date=None, end_date=None):
+    """Number of tasks matching a search query"""
+    params = _params(query, filters, start_date, end_date)
+    return get_supabase().rpc('search_tasks', params, count='exact', head=True).execute().count
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class TaskSearchIndex:
+    """Inverted index over task names and tags of one snapshot"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        postings = {}
+        for pos, (name, tags) in enumerate(zip(snapshot.names, snapshot.tags)):
+            for token in set(tokenize(name)) | set(tokenize(tags)):
+                plist = postings.get(token)
+                if plist is None:
+                    plist = postings[token] = array('i')
+                plist.append(pos)
+        self.postings = postings
+        self.tokens = sorted(postings)
+
+    def _prefixed(self, prefix):
+        """Positions of tasks with a token starting with `prefix`"""
+        tokens = self.tokens
+        matches = set()
+        i = bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            matches.update(self.postings[tokens[i]])
+            if len(matches) >= MAX_CANDIDATES:
+                break
+            i += 1
+        return matches
+
+    def search(self, query, limit=10):
+        """Best matching positions: every word must prefix-match a token of the task"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        candidates = None
+        # Longest (most selective) words first, so the intersection shrinks quickly
+        for term in sorted(set(terms), key=len, reverse=True):
+            plist = self.postings.get(term)
+            matches = self._prefixed(term) if plist is None or term == terms[-1] else set(plist)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        names = self.snapshot.names
+        needle = query.strip().lower()
+
+        def score(pos):
+            name = (names[pos] or '').lower()
+            # Name starts with the query, then the query appears in the name, then shorter names
+            return (not name.startswith(needle), needle not in name, len(name), pos)
+
+        return heapq.nsmallest(limit, candidates, key=score)
+
+
+def suggest(query, limit=10):
+    """Typeahead suggestions as [{'task_id', 'task_name', 'status'}]"""
+    if SNAPSHOT_ENABLED and SEARCH_INDEX_ENABLED:
+        snapshot = get_task_snapshot()
+        statuses = snapshot.statuses.values
+        return [{
+            'task_id': snapshot.task_ids[pos],
+            'task_name': snapshot.names[pos],
+            'status': statuses[snapshot.status[pos]],
+        } for pos in snapshot.search_index().search(query, limit)]
+
+    rows = search_tasks(query, limit=limit)
+    return [{'task_id': row['task_id'], 'task_name': row['task_name'], 'status': row['status']} for row in rows]
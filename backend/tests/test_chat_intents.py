@@ -0,0 +1,88 @@
+"""
+chat_intents answers through app.local_chat_answer() on the embedded data
+source, with more tasks than the chat context holds (CHAT_TASK_LIMIT).
+
+    cd backend && python -m pytest tests
+"""
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+import jwt
+import pytest
+
+SECRET = 'test-secret-with-at-least-32-bytes-long'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update({
+    'DATA_SOURCE': 'local',
+    'LOCAL_STORE_PATH': ':memory:',
+    'SUPABASE_JWT_SECRET': SECRET,
+    'GEMINI_API_KEY': '',
+    'CHANGE_FEED': 'off',
+    'RESPONSE_CACHE_ENABLED': 'false',
+})
+
+import app  # noqa: E402
+import database  # noqa: E402
+from benchmarks.synthetic import generate_tasks, generate_users  # noqa: E402
+from snapshot import get_task_snapshot  # noqa: E402
+
+TASK_COUNT = 3001
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    users = generate_users()
+    tasks = generate_tasks(TASK_COUNT, users)
+    database.local_store.load(tasks=tasks, users=users)
+    get_task_snapshot()
+    return tasks, users
+
+
+def _count(reply):
+    return int(re.search(r'\d[\d,]*', reply).group().replace(',', ''))
+
+
+def test_dataset_is_larger_than_the_chat_context():
+    assert TASK_COUNT > app.CHAT_TASK_LIMIT
+
+
+def test_count_covers_every_task(dataset):
+    tasks, _ = dataset
+    blocked = sum(1 for task in tasks if task['status'] == 'Blocked')
+    reply = app.local_chat_answer('how many blocked tasks are there?')[0]
+    assert _count(reply) == blocked
+
+
+def test_list_covers_every_task(dataset):
+    tasks, _ = dataset
+    now = datetime.now(timezone.utc).isoformat()
+    overdue = [task for task in tasks if task['priority'] == 'High' and task['status'] != 'Completed'
+               and task.get('due_date') and task['due_date'] < now]
+    assert overdue
+    reply = app.local_chat_answer('show overdue high priority tasks')[0]
+    assert _count(reply) == len(overdue)
+    listed = re.findall(r'^• (\S+) (.*) \(', reply, re.MULTILINE)
+    names = {task['task_id']: task['task_name'] for task in tasks}
+    assert listed and all(name == names[task_id] for task_id, name in listed)
+
+
+def test_open_ended_questions_go_to_the_model(dataset):
+    assert app.local_chat_answer('why are Mobile App tasks getting blocked?') == (None, None)
+
+
+@pytest.mark.parametrize('path', ['/api/chat', '/api/chat/stream'])
+def test_local_answers_skip_the_chat_context(dataset, monkeypatch, path):
+    def load_chat_data(users=None):
+        raise AssertionError('chat context loaded for a local answer')
+    monkeypatch.setattr(app, 'load_chat_data', load_chat_data)
+
+    token = jwt.encode({'sub': 'USER-001', 'aud': 'authenticated', 'exp': int(time.time()) + 3600},
+                       SECRET, algorithm='HS256')
+    response = app.app.test_client().post(path, json={'query': 'how many blocked tasks are there?'},
+                                          headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert 'local' in response.get_data(as_text=True)
@@ -0,0 +1,48 @@
+"""
+Cursor decoding in pagination.py: only well-formed values reach the
+PostgREST filter string.
+
+    cd backend && python -m pytest tests
+"""
+import base64
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import decode_cursor, encode_cursor  # noqa: E402
+
+
+def _token(sort_value, task_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_value, task_id]).encode()).decode().rstrip('=')
+
+
+def test_round_trip():
+    row = {'created_date': '2026-01-02T03:04:05.123456+00:00', 'task_id': 'TASK-0001'}
+    assert decode_cursor(encode_cursor(row)) == (row['created_date'], row['task_id'])
+    assert decode_cursor(_token(None, 'TASK-0001')) == (None, 'TASK-0001')
+    assert decode_cursor(_token(0.75, 'TASK-0001'), ranked=True) == (0.75, 'TASK-0001')
+
+
+def test_dates_are_canonical():
+    assert decode_cursor(_token('2026-01-02T03:04:05Z', 'TASK-0001'))[0] == '2026-01-02T03:04:05+00:00'
+
+
+@pytest.mark.parametrize('token', [
+    _token('2026-01-01",task_id.gt.0,created_date.eq."', 'TASK-0001'),
+    _token('2026-01-01', 'TASK-0001",status.eq.Open'),
+    _token('2026-01-01', 'TASK-0001)'),
+    _token(5, 'TASK-0001'),
+    'not-a-cursor',
+])
+def test_rejects_crafted_cursors(token):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(token)
+
+
+def test_ranked_needs_a_number():
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(_token(True, 'TASK-0001'), ranked=True)
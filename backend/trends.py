@@ -0,0 +1,135 @@
+"""
+Single-pass bucketed trend engine for /api/trends.
+
+Every task is binned once into its hourly / daily / weekly / monthly bucket
+(a histogram over the snapshot columns) instead of rescanning the task list
+for each bucket. The "in progress" series for hourly and daily views is
+cumulative ("started on or before this bucket"), which is a prefix sum over
+the per-bucket start counts.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from records import NO_DATE
+from snapshot import COMPLETED, IN_PROGRESS, SECONDS_PER_DAY
+
+SECONDS_PER_HOUR = 3600
+
+GRANULARITIES = ('hourly', 'daily', 'weekly', 'monthly')
+
+# Cumulative in-progress series for fine buckets, per-bucket starts for coarse ones
+CUMULATIVE_GRANULARITIES = ('hourly', 'daily')
+
+# Upper bound on buckets per response (e.g. hourly over several months)
+MAX_BUCKETS = 5000
+
+
+def _utc(ts):
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+def _day_label(ts):
+    return _utc(ts).strftime('%b %d')
+
+
+def auto_granularity(first_ts, last_ts):
+    """Daily buckets up to 30 days, weekly beyond (the dashboard default)"""
+    days_diff = last_ts // SECONDS_PER_DAY - first_ts // SECONDS_PER_DAY
+    return 'weekly' if days_diff > 30 else 'daily'
+
+
+def bucket_bounds(first_ts, last_ts, granularity):
+    """Bucket start times, labels and the exclusive end of the last bucket"""
+    first_day = first_ts // SECONDS_PER_DAY * SECONDS_PER_DAY
+    last_day = last_ts // SECONDS_PER_DAY * SECONDS_PER_DAY
+
+    if granularity == 'hourly':
+        first_hour = first_ts // SECONDS_PER_HOUR * SECONDS_PER_HOUR
+        end = last_ts // SECONDS_PER_HOUR * SECONDS_PER_HOUR + SECONDS_PER_HOUR
+        starts = list(range(first_hour, end, SECONDS_PER_HOUR))
+        labels = [_utc(ts).strftime('%b %d %H:00') for ts in starts]
+    elif granularity == 'daily':
+        end = last_day + SECONDS_PER_DAY
+        starts = list(range(first_day, end, SECONDS_PER_DAY))
+        labels = [_day_label(ts) for ts in starts]
+    elif granularity == 'weekly':
+        end = last_day + SECONDS_PER_DAY
+        starts = list(range(first_day, end, 7 * SECONDS_PER_DAY))
+        # Last week is clipped to the end of the range
+        labels = [f"{_day_label(ts)} - {_day_label(min(ts + 6 * SECONDS_PER_DAY, last_day))}"
+                  for ts in starts]
+    elif granularity == 'monthly':
+        end = last_day + SECONDS_PER_DAY
+        starts = [first_day]
+        month = _utc(first_day).date().replace(day=1)
+        while True:
+            month = (month + timedelta(days=32)).replace(day=1)
+            ts = int(datetime(month.year, month.month, 1, tzinfo=timezone.utc).timestamp())
+            if ts >= end:
+                break
+            starts.append(ts)
+        labels = [_utc(ts).strftime('%b %Y') for ts in starts]
+    else:
+        raise ValueError(f"Unknown granularity '{granularity}' (expected one of {', '.join(GRANULARITIES)})")
+
+    if len(starts) > MAX_BUCKETS:
+        raise ValueError(f"Too many {granularity} buckets ({len(starts)}) for this range")
+    return starts, labels, end
+
+
+def compute_trends(snapshot, rows, first_ts, last_ts, granularity=None):
+    """Created / completed / in-progress counts per bucket between first_ts and last_ts"""
+    granularity = granularity or auto_granularity(first_ts, last_ts)
+    starts, labels, end = bucket_bounds(first_ts, last_ts, granularity)
+    n = len(starts)
+    origin = starts[0]
+
+    if granularity == 'monthly':
+        def bucket(ts):
+            return bisect_right(starts, ts) - 1
+    else:
+        width = starts[1] - origin if n > 1 else end - origin
+
+        def bucket(ts):
+            return (ts - origin) // width
+
+    created_counts = [0] * n
+    completed_counts = [0] * n
+    started_counts = [0] * n
+    cumulative = granularity in CUMULATIVE_GRANULARITIES
+
+    status = snapshot.status
+    created = snapshot.created
+    completed = snapshot.completed
+    started = snapshot.started
+    for pos in rows:
+        ts = created[pos]
+        if origin <= ts < end:
+            created_counts[bucket(ts)] += 1
+
+        code = status[pos]
+        if code == COMPLETED:
+            ts = completed[pos]
+            if origin <= ts < end:
+                completed_counts[bucket(ts)] += 1
+        elif code == IN_PROGRESS:
+            ts = started[pos]
+            if ts != NO_DATE and ts < end:
+                if ts >= origin:
+                    started_counts[bucket(ts)] += 1
+                elif cumulative:
+                    # Started before the range: in progress for every bucket
+                    started_counts[0] += 1
+
+    in_progress = list(accumulate(started_counts)) if cumulative else started_counts
+
+    return [
+        {
+            'date': labels[i],
+            'created': created_counts[i],
+            'completed': completed_counts[i],
+            'in_progress': in_progress[i]
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,59 @@
+"""
+Production entry point for the PULSEVO backend.
+
+`python app.py` runs Flask's single-process development server (debugger
+and reloader on). In production run gunicorn with gunicorn.conf.py, which
+imports this module once in the master process and forks the workers
+from it:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module builds everything that is expensive to set up - the
+Supabase client, the Gemini model, the in-memory task snapshot - before
+the fork, so every worker starts warm and shares those pages with the
+master copy-on-write instead of loading its own. Everything that cannot
+cross a fork is rebuilt in the worker: connection and thread pools
+(database.py, bulk_reads.py, fanout.py, llm.py register their own fork
+hooks) and the change feed and stream threads (post_fork below).
+"""
+import gc
+import os
+import time
+
+# Objects created while warming up stay in the permanent generation (gc.freeze below)
+gc.disable()
+
+import app as pulsevo
+import llm
+from snapshot import SNAPSHOT_ENABLED, task_snapshot
+
+application = pulsevo.app
+
+
+def warm_up():
+    """Load the shared state the workers should inherit"""
+    started = time.perf_counter()
+    if SNAPSHOT_ENABLED:
+        task_snapshot.get()
+    print(f"✅ Warmed up in {time.perf_counter() - started:.1f}s "
+          f"(model: {'ready' if llm.available() else 'fallbacks only'}, pid {os.getpid()})")
+
+
+def pre_fork():
+    """Called in the master before the workers are forked"""
+    # The master only supervises; each worker subscribes to the change feed itself
+    pulsevo.change_feed.stop()
+    # Keep the collector from touching (and so copying) the inherited objects in every worker
+    gc.freeze()
+
+
+def post_fork():
+    """Called in each worker right after the fork"""
+    gc.enable()
+    # The hub's locks first: the feed's after_fork() can already publish changes to it
+    pulsevo.overview_hub.after_fork()
+    pulsevo.change_feed.after_fork()
+    pulsevo.change_feed.start()
+
+
+warm_up()
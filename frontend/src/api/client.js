@@ -16,6 +16,8 @@ const apiClient = axios.create({
   headers: {
     'Content-Type': 'application/json',
   },
+  // 304 Not Modified is answered from the validator cache below
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
 // Add auth token to all requests
@@ -27,6 +29,51 @@ apiClient.interceptors.request.use(async (config) => {
   return config;
 });
 
+// ==================== CONDITIONAL GET (ETag) ====================
+
+// Last ETag and body per GET URL; polls send If-None-Match and reuse the body on 304
+const MAX_VALIDATED_RESPONSES = 100;
+const validatedResponses = new Map();
+
+const validatorKey = (config) => apiClient.getUri(config);
+
+apiClient.interceptors.request.use((config) => {
+  if ((config.method || 'get').toLowerCase() === 'get') {
+    const cached = validatedResponses.get(validatorKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
+  }
+  return config;
+});
+
+apiClient.interceptors.response.use((response) => {
+  const { config } = response;
+  if ((config.method || 'get').toLowerCase() !== 'get') {
+    return response;
+  }
+
+  const key = validatorKey(config);
+  if (response.status === 304) {
+    const cached = validatedResponses.get(key);
+    if (cached) {
+      return { ...response, status: 200, data: cached.data };
+    }
+    // Nothing to reuse (e.g. evicted): refetch without the validator
+    return apiClient.get(config.url, { params: config.params });
+  }
+
+  const etag = response.headers?.etag;
+  if (etag) {
+    validatedResponses.delete(key);
+    validatedResponses.set(key, { etag, data: response.data });
+    if (validatedResponses.size > MAX_VALIDATED_RESPONSES) {
+      validatedResponses.delete(validatedResponses.keys().next().value);
+    }
+  }
+  return response;
+});
+
 // ==================== SUPABASE REAL-TIME SUBSCRIPTIONS ====================
 
 /**
@@ -242,14 +289,104 @@ export const getDistribution = (dateFilter = 'all') => {
   return apiClient.get('/distribution', { params });
 };
 
-export const getTrends = (dateFilter = 'all') => {
+export const getTrends = (dateFilter = 'all', granularity = null) => {
   const dateRange = getDateRange(dateFilter);
   const params = dateRange ? { start_date: dateRange.start_date, end_date: dateRange.end_date } : {};
+  if (granularity) {
+    params.granularity = granularity; // 'hourly' | 'daily' | 'weekly' | 'monthly'
+  }
   return apiClient.get('/trends', { params });
 };
 
 export const getTeams = () => apiClient.get('/teams');
 
+/**
+ * Read a text/event-stream response, calling onEvent(event, data) with the
+ * parsed JSON data of every event until the server closes the stream.
+ */
+const readEventStream = async (response, onEvent) => {
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value;
+
+    let end;
+    while ((end = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data)); // skips keep-alive comments and retry hints
+    }
+  }
+};
+
+const dashboardParams = (dateFilter, teamFilter) => {
+  const dateRange = getDateRange(dateFilter);
+  const params = {};
+  if (dateRange) {
+    params.start_date = dateRange.start_date;
+    params.end_date = dateRange.end_date;
+  }
+  if (teamFilter && teamFilter !== 'all') {
+    params.team = teamFilter;
+  }
+  return params;
+};
+
+// Overview + distribution + trends + team performance in one request
+export const getDashboardBundle = (dateFilter = 'all', teamFilter = 'all') => {
+  return apiClient.get('/dashboard/bundle', { params: dashboardParams(dateFilter, teamFilter) });
+};
+
+/**
+ * Stream the dashboard bundle over server-sent events.
+ * The server sends the full bundle first, then only the sections that changed
+ * whenever tasks or users change. Uses fetch (not EventSource) so the auth
+ * header can be sent.
+ * @param {Function} onUpdate - Called with the merged bundle after every event
+ * @param {Function} onError - Called once if the stream fails or closes
+ * @returns {Function} Stop function
+ */
+export const streamDashboard = (dateFilter = 'all', teamFilter = 'all', onUpdate, onError) => {
+  const controller = new AbortController();
+
+  const run = async () => {
+    const { data: { session } } = await supabase.auth.getSession();
+    const query = new URLSearchParams(dashboardParams(dateFilter, teamFilter));
+    const response = await fetch(`${API_BASE_URL}/stream/overview?${query}`, {
+      headers: {
+        Accept: 'text/event-stream',
+        ...(session?.access_token && { Authorization: `Bearer ${session.access_token}` }),
+      },
+      signal: controller.signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Overview stream failed with status ${response.status}`);
+    }
+
+    let bundle = {};
+    await readEventStream(response, (event, payload) => {
+      if (event === 'error') throw new Error(payload.error);
+      bundle = event === 'snapshot' ? payload : { ...bundle, ...payload };
+      onUpdate(bundle);
+    });
+    throw new Error('Overview stream closed');
+  };
+
+  run().catch((error) => {
+    if (!controller.signal.aborted) onError(error);
+  });
+  return () => controller.abort();
+};
+
 export const getTeamPerformance = (dateFilter = 'all', teamFilter = 'all') => {
   const dateRange = getDateRange(dateFilter);
   const params = {};
@@ -279,6 +416,53 @@ export const getTasks = (filters = {}, dateFilter = 'all') => {
   return apiClient.get(`/tasks${params ? '?' + params : ''}`);
 };
 
+/**
+ * Get one page of tasks from the backend (keyset pagination, newest first)
+ * @param {Object} options - { limit, cursor, fields: [...], includeTotal }
+ * @returns {Promise} Resolves to { data: { tasks, next_cursor, total? } }
+ */
+export const getTasksPage = (filters = {}, dateFilter = 'all', options = {}) => {
+  const dateRange = getDateRange(dateFilter);
+  const params = { ...filters, limit: options.limit || 100 };
+  if (dateRange) {
+    params.start_date = dateRange.start_date;
+    params.end_date = dateRange.end_date;
+  }
+  if (options.cursor) params.cursor = options.cursor;
+  if (options.fields) params.fields = options.fields.join(',');
+  if (options.includeTotal) params.include_total = true;
+  return apiClient.get('/tasks', { params });
+};
+
+/**
+ * Load every matching task page by page, calling onPage(tasks, total) as pages arrive
+ * @returns {Function} Cancel function (stops fetching further pages)
+ */
+export const streamTasks = (filters, dateFilter, onPage, options = {}) => {
+  let cancelled = false;
+  const load = async () => {
+    let cursor = null;
+    let total = null;
+    do {
+      const response = await getTasksPage(filters, dateFilter, {
+        ...options,
+        cursor,
+        includeTotal: cursor === null,
+      });
+      if (cancelled) return;
+      if (total === null) total = response.data.total;
+      onPage(response.data.tasks, total);
+      cursor = response.data.next_cursor;
+    } while (cursor && !cancelled);
+  };
+  const done = load();
+  const cancel = () => {
+    cancelled = true;
+  };
+  cancel.done = done;
+  return cancel;
+};
+
 export const getTask = (taskId) => {
   return getTaskFromSupabase(taskId).then(result => ({ data: result.data }));
 };
@@ -348,6 +532,35 @@ export const getAIDashboard = (dateFilter = 'all') => {
 // Chat endpoint
 export const sendChatQuery = (query) => apiClient.post('/chat', { query });
 
+/**
+ * Stream a chat answer as it is generated.
+ * @param {Function} onToken - Called with each new piece of text
+ * @returns {Promise} Resolves with { timestamp, first_token_ms, total_ms, fallback }
+ */
+export const streamChatQuery = async (query, onToken) => {
+  const { data: { session } } = await supabase.auth.getSession();
+  const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+      ...(session?.access_token && { Authorization: `Bearer ${session.access_token}` }),
+    },
+    body: JSON.stringify({ query }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed with status ${response.status}`);
+  }
+
+  let result = null;
+  await readEventStream(response, (event, payload) => {
+    if (event === 'token') onToken(payload.text);
+    else if (event === 'done') result = payload;
+  });
+  if (!result) throw new Error('Chat stream closed early');
+  return result;
+};
+
 // Settings endpoints
 export const getSettings = () => apiClient.get('/settings');
 export const saveSettings = (settings) => apiClient.post('/settings', settings);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useContext } from 'react';
 import './Overview.css';
-import { getOverview, getDistribution, getTrends, getTeamPerformance, getTeams } from '../api/client';
+import { getDashboardBundle, getTeams, streamDashboard } from '../api/client';
 import { PieChart, Pie, Cell, LineChart, Line, BarChart, Bar, XAxis, YAxis, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { TrendingUp, TrendingDown, Clock } from 'lucide-react';
 import { DateFilterContext } from '../App';
@@ -20,10 +20,17 @@ function Overview() {
   }, []);
 
   useEffect(() => {
-    fetchData();
-    // Auto-refresh every 10 seconds
-    const interval = setInterval(fetchData, 10000);
-    return () => clearInterval(interval);
+    let interval = null;
+    // Live updates pushed by the server; poll every 10 seconds if the stream is unavailable
+    const stopStream = streamDashboard(dateFilter, selectedTeam, applyBundle, (error) => {
+      console.error('Overview stream unavailable, polling instead:', error);
+      fetchData();
+      interval = setInterval(fetchData, 10000);
+    });
+    return () => {
+      stopStream();
+      if (interval) clearInterval(interval);
+    };
   }, [dateFilter, selectedTeam]);
 
   const fetchTeams = async () => {
@@ -35,20 +42,19 @@ function Overview() {
     }
   };
 
+  const applyBundle = (data) => {
+    setMetrics(data.overview);
+    setDistribution(data.distribution);
+    setTrends(data.trends);
+    setTeamPerformance(data.team_performance);
+    setLoading(false);
+  };
+
   const fetchData = async () => {
     try {
-      const [metricsRes, distRes, trendsRes, teamRes] = await Promise.all([
-        getOverview(dateFilter),
-        getDistribution(dateFilter),
-        getTrends(dateFilter),
-        getTeamPerformance(dateFilter, selectedTeam)
-      ]);
-      
-      setMetrics(metricsRes.data);
-      setDistribution(distRes.data);
-      setTrends(trendsRes.data);
-      setTeamPerformance(teamRes.data);
-      setLoading(false);
+      // One request for all four panels
+      const { data } = await getDashboardBundle(dateFilter, selectedTeam);
+      applyBundle(data);
     } catch (error) {
       console.error('Error fetching overview data:', error);
       // Set default empty data to prevent crashes
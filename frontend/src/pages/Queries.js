@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import './Queries.css';
-import { sendChatQuery } from '../api/client';
+import { sendChatQuery, streamChatQuery } from '../api/client';
 import { Send, Sparkles } from 'lucide-react';
 
 function Queries() {
@@ -27,22 +27,47 @@ function Queries() {
     setInput('');
     setLoading(true);
 
+    // Bot reply is appended on the first token and grows as the answer streams in
+    const botId = Date.now();
+    let streamed = false;
+    const appendText = (text) => {
+      setLoading(false);
+      if (!streamed) {
+        streamed = true;
+        setMessages(prev => [...prev, { id: botId, type: 'bot', text, timestamp: '' }]);
+      } else {
+        setMessages(prev => prev.map(message => (
+          message.id === botId ? { ...message, text: message.text + text } : message
+        )));
+      }
+    };
+
     try {
-      const response = await sendChatQuery(input);
-      const botMessage = {
-        type: 'bot',
-        text: response.data.response,
-        timestamp: response.data.timestamp
-      };
-      setMessages(prev => [...prev, botMessage]);
-    } catch (error) {
-      console.error('Error sending query:', error);
-      const errorMessage = {
-        type: 'bot',
-        text: "Sorry, I'm having trouble processing that request. Please try again.",
-        timestamp: new Date().toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' })
-      };
-      setMessages(prev => [...prev, errorMessage]);
+      const result = await streamChatQuery(input, appendText);
+      console.log(`Chat: first token ${result.first_token_ms} ms, total ${result.total_ms} ms`);
+      setMessages(prev => prev.map(message => (
+        message.id === botId ? { ...message, timestamp: result.timestamp } : message
+      )));
+    } catch (streamError) {
+      try {
+        if (streamed) throw streamError;
+        // Streaming unavailable: fall back to the one-shot endpoint
+        const response = await sendChatQuery(input);
+        const botMessage = {
+          type: 'bot',
+          text: response.data.response,
+          timestamp: response.data.timestamp
+        };
+        setMessages(prev => [...prev, botMessage]);
+      } catch (error) {
+        console.error('Error sending query:', error);
+        const errorMessage = {
+          type: 'bot',
+          text: "Sorry, I'm having trouble processing that request. Please try again.",
+          timestamp: new Date().toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' })
+        };
+        setMessages(prev => [...prev, errorMessage]);
+      }
     } finally {
       setLoading(false);
     }
@@ -1,10 +1,14 @@
-import React, { useState, useEffect, useCallback, useContext } from 'react';
+import React, { useState, useEffect, useCallback, useContext, useRef } from 'react';
 import './Tasks.css';
-import { getTasks, getUsers, getProjectStats } from '../api/client';
+import { streamTasks, getUsers, getProjectStats } from '../api/client';
 import { Search, Upload, TrendingUp, TrendingDown } from 'lucide-react';
 import { PieChart, Pie, Cell, ResponsiveContainer, Tooltip } from 'recharts';
 import { DateFilterContext } from '../App';
 
+// Columns rendered by the task table (skips description, comments, ...)
+const TASK_LIST_FIELDS = ['task_id', 'task_name', 'status', 'priority', 'assigned_to', 'due_date'];
+const TASK_PAGE_SIZE = 200;
+
 function Tasks() {
   const { dateFilter } = useContext(DateFilterContext);
   const [tasks, setTasks] = useState([]);
@@ -19,6 +23,7 @@ function Tasks() {
   // Pagination state
   const [currentPage, setCurrentPage] = useState(1);
   const tasksPerPage = 10;
+  const cancelTaskStream = useRef(null);
 
   const fetchData = useCallback(async () => {
     try {
@@ -27,17 +32,30 @@ function Tasks() {
       if (assigneeFilter !== 'all') filters.assigned_to = assigneeFilter;
       if (searchTerm) filters.search = searchTerm;
       
-      const [tasksRes, usersRes, statsRes] = await Promise.all([
-        getTasks(filters, dateFilter),
+      // Render the first page as soon as it arrives, then append the rest
+      if (cancelTaskStream.current) cancelTaskStream.current();
+      let firstPage = true;
+      const cancel = streamTasks(filters, dateFilter, (pageTasks) => {
+        if (firstPage) {
+          firstPage = false;
+          setTasks(pageTasks);
+          setCurrentPage(1); // Reset to first page when filters change
+          setLoading(false);
+        } else {
+          setTasks((previous) => previous.concat(pageTasks));
+        }
+      }, { fields: TASK_LIST_FIELDS, limit: TASK_PAGE_SIZE });
+      cancelTaskStream.current = cancel;
+      
+      const [usersRes, statsRes] = await Promise.all([
         getUsers(),
-        getProjectStats()
+        getProjectStats(),
+        cancel.done
       ]);
       
-      setTasks(tasksRes.data);
       setUsers(usersRes.data);
       setProjectStats(statsRes.data);
       setLoading(false);
-      setCurrentPage(1); // Reset to first page when filters change
     } catch (error) {
       console.error('Error fetching tasks:', error);
       setLoading(false);
@@ -48,6 +66,10 @@ function Tasks() {
     fetchData();
   }, [fetchData]);
 
+  useEffect(() => () => {
+    if (cancelTaskStream.current) cancelTaskStream.current();
+  }, []);
+
   // Pagination calculations
   const totalPages = Math.ceil(tasks.length / tasksPerPage);
   const indexOfLastTask = currentPage * tasksPerPage;
@@ -4,6 +4,9 @@
 -- Enable UUID extension (if not already enabled)
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Trigram matching for fuzzy / substring search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ==================== USERS TABLE ====================
 CREATE TABLE IF NOT EXISTS users (
     user_id VARCHAR(50) PRIMARY KEY,
@@ -59,6 +62,13 @@ CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
 CREATE INDEX IF NOT EXISTS idx_tasks_status_project ON tasks(status, project);
 CREATE INDEX IF NOT EXISTS idx_tasks_assigned_status ON tasks(assigned_to, status);
 
+-- Keyset pagination order for /api/tasks (newest first, task_id as tie-breaker)
+CREATE INDEX IF NOT EXISTS idx_tasks_created_task ON tasks(created_date DESC NULLS LAST, task_id DESC);
+
+-- Search indexes: trigram indexes also serve ILIKE '%term%'
+CREATE INDEX IF NOT EXISTS idx_tasks_task_name_trgm ON tasks USING GIN (task_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm ON users USING GIN (name gin_trgm_ops);
+
 -- ==================== FUNCTIONS ====================
 -- Function to automatically update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -76,10 +86,231 @@ CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
 CREATE TRIGGER update_tasks_updated_at BEFORE UPDATE ON tasks
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- ==================== AGGREGATION FUNCTIONS ====================
+-- Grouped task counts, called by the backend through supabase.rpc() so only
+-- a few dozen count rows cross the wire instead of one row per task.
+-- p_start / p_end filter on created_date (inclusive); NULL means unbounded.
+
+CREATE OR REPLACE FUNCTION task_status_counts(
+    p_start TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_end TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (status VARCHAR, task_count BIGINT) AS $$
+    SELECT t.status, COUNT(*)
+    FROM tasks t
+    WHERE (p_start IS NULL OR t.created_date >= p_start)
+      AND (p_end IS NULL OR t.created_date <= p_end)
+    GROUP BY t.status;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION task_project_status_counts(
+    p_start TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_end TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (project VARCHAR, status VARCHAR, task_count BIGINT) AS $$
+    SELECT t.project, t.status, COUNT(*)
+    FROM tasks t
+    WHERE (p_start IS NULL OR t.created_date >= p_start)
+      AND (p_end IS NULL OR t.created_date <= p_end)
+    GROUP BY t.project, t.status;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION task_assignee_status_counts(
+    p_start TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_end TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (assigned_to VARCHAR, status VARCHAR, task_count BIGINT) AS $$
+    SELECT t.assigned_to, t.status, COUNT(*)
+    FROM tasks t
+    WHERE (p_start IS NULL OR t.created_date >= p_start)
+      AND (p_end IS NULL OR t.created_date <= p_end)
+    GROUP BY t.assigned_to, t.status;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION task_daily_status_counts(
+    p_start TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_end TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (created_day DATE, status VARCHAR, task_count BIGINT) AS $$
+    SELECT (t.created_date AT TIME ZONE 'UTC')::DATE, t.status, COUNT(*)
+    FROM tasks t
+    WHERE (p_start IS NULL OR t.created_date >= p_start)
+      AND (p_end IS NULL OR t.created_date <= p_end)
+    GROUP BY 1, t.status;
+$$ LANGUAGE sql STABLE;
+
+-- ==================== SEARCH ====================
+-- Weighted document for full-text search: name > tags > description > comments.
+-- IMMUTABLE so it can back the expression index below; queries must call it
+-- with the same arguments for the index to be used.
+CREATE OR REPLACE FUNCTION task_search_vector(
+    p_task_name TEXT,
+    p_tags TEXT,
+    p_description TEXT,
+    p_comments TEXT
+)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(p_task_name, '')), 'A')
+        || setweight(to_tsvector('english', replace(coalesce(p_tags, ''), ',', ' ')), 'B')
+        || setweight(to_tsvector('english', coalesce(p_description, '')), 'C')
+        || setweight(to_tsvector('english', coalesce(p_comments, '')), 'D');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks
+    USING GIN (task_search_vector(task_name, tags, description, comments));
+
+-- Ranked multi-field task search. Matches full-text terms (websearch syntax)
+-- across all four fields, plus fuzzy and substring matches on task_name.
+-- Results are ordered by (rank DESC, task_id DESC); pass the last row's rank
+-- and task_id as p_after_rank / p_after_id to fetch the next page.
+CREATE OR REPLACE FUNCTION search_tasks(
+    p_query TEXT,
+    p_limit INTEGER DEFAULT NULL,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_id VARCHAR DEFAULT NULL,
+    p_status VARCHAR DEFAULT NULL,
+    p_project VARCHAR DEFAULT NULL,
+    p_assigned_to VARCHAR DEFAULT NULL,
+    p_priority VARCHAR DEFAULT NULL,
+    p_start TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_end TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (
+    task_id VARCHAR, task_name VARCHAR, description TEXT, status VARCHAR, priority VARCHAR,
+    project VARCHAR, assigned_to VARCHAR, created_date TIMESTAMP WITH TIME ZONE,
+    due_date TIMESTAMP WITH TIME ZONE, start_date TIMESTAMP WITH TIME ZONE,
+    completed_date TIMESTAMP WITH TIME ZONE, estimated_hours FLOAT, tags VARCHAR,
+    blocked_reason VARCHAR, comments TEXT, updated_at TIMESTAMP WITH TIME ZONE, rank REAL
+) AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', p_query) AS ts
+    ),
+    matches AS (
+        SELECT t.*,
+               (ts_rank(task_search_vector(t.task_name, t.tags, t.description, t.comments), query.ts)
+                + similarity(t.task_name, p_query))::REAL AS rank
+        FROM tasks t, query
+        WHERE (task_search_vector(t.task_name, t.tags, t.description, t.comments) @@ query.ts
+               OR t.task_name % p_query
+               OR t.task_name ILIKE '%' || p_query || '%')
+          AND (p_status IS NULL OR t.status = p_status)
+          AND (p_project IS NULL OR t.project = p_project)
+          AND (p_assigned_to IS NULL OR t.assigned_to = p_assigned_to)
+          AND (p_priority IS NULL OR t.priority = p_priority)
+          AND (p_start IS NULL OR t.created_date >= p_start)
+          AND (p_end IS NULL OR t.created_date <= p_end)
+    )
+    SELECT m.task_id, m.task_name, m.description, m.status, m.priority, m.project, m.assigned_to,
+           m.created_date, m.due_date, m.start_date, m.completed_date, m.estimated_hours, m.tags,
+           m.blocked_reason, m.comments, m.updated_at, m.rank
+    FROM matches m
+    WHERE p_after_rank IS NULL OR (m.rank, m.task_id) < (p_after_rank, p_after_id)
+    ORDER BY m.rank DESC, m.task_id DESC
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- ==================== DAILY ROLLUPS ====================
+-- One task count per (created day, status, project, assignee, completed day),
+-- kept in step with tasks by the trigger below. Period-over-period metrics sum
+-- these rows for whole UTC days instead of counting the tasks table.
+-- completed_day is only set for Completed tasks. Requires Postgres 15+
+-- (NULLS NOT DISTINCT) so NULL keys share one row.
+CREATE TABLE IF NOT EXISTS task_daily_rollups (
+    created_day DATE,
+    status VARCHAR(20) NOT NULL,
+    project VARCHAR(100),
+    assigned_to VARCHAR(50),
+    completed_day DATE,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT task_daily_rollups_key UNIQUE NULLS NOT DISTINCT
+        (created_day, status, project, assigned_to, completed_day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_daily_rollups_day ON task_daily_rollups(created_day);
+
+-- SECURITY DEFINER: runs as the function's owner (whoever runs this script, which also owns
+-- task_daily_rollups), so writes to tasks by roles that may only read the rollups still update them
+CREATE OR REPLACE FUNCTION maintain_task_daily_rollups()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.created_date IS NOT DISTINCT FROM NEW.created_date
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.project IS NOT DISTINCT FROM NEW.project
+       AND OLD.assigned_to IS NOT DISTINCT FROM NEW.assigned_to
+       AND OLD.completed_date IS NOT DISTINCT FROM NEW.completed_date THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE task_daily_rollups r
+        SET task_count = r.task_count - 1
+        WHERE r.created_day IS NOT DISTINCT FROM (OLD.created_date AT TIME ZONE 'UTC')::DATE
+          AND r.status = OLD.status
+          AND r.project IS NOT DISTINCT FROM OLD.project
+          AND r.assigned_to IS NOT DISTINCT FROM OLD.assigned_to
+          AND r.completed_day IS NOT DISTINCT FROM
+              CASE WHEN OLD.status = 'Completed' THEN (OLD.completed_date AT TIME ZONE 'UTC')::DATE END;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO task_daily_rollups (created_day, status, project, assigned_to, completed_day, task_count)
+        VALUES (
+            (NEW.created_date AT TIME ZONE 'UTC')::DATE,
+            NEW.status,
+            NEW.project,
+            NEW.assigned_to,
+            CASE WHEN NEW.status = 'Completed' THEN (NEW.completed_date AT TIME ZONE 'UTC')::DATE END,
+            1
+        )
+        ON CONFLICT ON CONSTRAINT task_daily_rollups_key
+        DO UPDATE SET task_count = task_daily_rollups.task_count + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_task_daily_rollups AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION maintain_task_daily_rollups();
+
+-- Backfill for tables that already hold tasks (no-op on a fresh database)
+INSERT INTO task_daily_rollups (created_day, status, project, assigned_to, completed_day, task_count)
+SELECT (created_date AT TIME ZONE 'UTC')::DATE,
+       status,
+       project,
+       assigned_to,
+       CASE WHEN status = 'Completed' THEN (completed_date AT TIME ZONE 'UTC')::DATE END,
+       COUNT(*)
+FROM tasks
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT ON CONSTRAINT task_daily_rollups_key DO NOTHING;
+
+-- Per-status totals over whole days [p_from, p_to); NULL means unbounded.
+-- completed_today counts Completed tasks whose completed_day is p_today.
+CREATE OR REPLACE FUNCTION task_rollup_totals(
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_today DATE DEFAULT NULL
+)
+RETURNS TABLE (status VARCHAR, task_count BIGINT, completed_today BIGINT) AS $$
+    SELECT r.status,
+           SUM(r.task_count)::BIGINT,
+           COALESCE(SUM(r.task_count) FILTER (WHERE r.completed_day = p_today), 0)::BIGINT
+    FROM task_daily_rollups r
+    WHERE (p_from IS NULL OR r.created_day >= p_from)
+      AND (p_to IS NULL OR r.created_day < p_to)
+    GROUP BY r.status;
+$$ LANGUAGE sql STABLE;
+
 -- ==================== ROW LEVEL SECURITY (RLS) ====================
 -- Enable RLS on tables
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE tasks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE task_daily_rollups ENABLE ROW LEVEL SECURITY;
 
 -- Policy: Allow all operations for authenticated users (adjust as needed)
 -- For hackathon, we'll allow all operations. In production, you'd want more restrictive policies.
@@ -92,6 +323,10 @@ CREATE POLICY "Allow all operations on users" ON users
 CREATE POLICY "Allow all operations on tasks" ON tasks
     FOR ALL USING (true) WITH CHECK (true);
 
+-- Rollups are written only by the trigger (SECURITY DEFINER, so no write policy is needed)
+CREATE POLICY "Allow read on task_daily_rollups" ON task_daily_rollups
+    FOR SELECT USING (true);
+
 -- ==================== REAL-TIME SUBSCRIPTIONS ====================
 -- Enable real-time for both tables
 ALTER PUBLICATION supabase_realtime ADD TABLE users;
@@ -100,6 +335,7 @@ ALTER PUBLICATION supabase_realtime ADD TABLE tasks;
 -- ==================== COMMENTS ====================
 COMMENT ON TABLE users IS 'Stores team member information';
 COMMENT ON TABLE tasks IS 'Stores all task information with status, priority, and assignment details';
+COMMENT ON TABLE task_daily_rollups IS 'Trigger-maintained task counts per created day, status, project and assignee';
 
 COMMENT ON COLUMN users.user_id IS 'Primary key: Unique user identifier (e.g., USER-001)';
 COMMENT ON COLUMN users.team IS 'Team name (e.g., Your Team, Alpha Team)';